@@ -0,0 +1,152 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         adaptiveBandwidth.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from functions import *
+from tracing import tracer
+from networkAnalyzer import TRIGGER_DELAY
+# Standard libraries
+import time
+
+# Installed libraries
+
+# IF bandwidth settings of the E5071C (Hz)
+IFBW_STEPS = (10, 15, 20, 30, 40, 50, 70, 100, 150, 200, 300, 400, 500, 700,
+              1e3, 1.5e3, 2e3, 3e3, 4e3, 5e3, 7e3, 10e3, 15e3, 20e3, 30e3,
+              40e3, 50e3, 70e3, 100e3, 150e3, 200e3, 300e3, 400e3, 500e3)
+
+
+# ==============================================================================
+# Noise power of each point of repeated sweeps (dB)
+#
+def noise_db(sweeps):
+    # Variance of the complex values, mean |x - mean|^2
+    power = np.var(np.asarray(sweeps), axis=0, ddof=1)
+    return 10 * np.log10(np.maximum(power, 1e-30))
+
+
+#
+# End noise db
+# ==============================================================================
+
+
+# ==============================================================================
+# Widest IF bandwidth step with noise at or below the target
+#
+# Noise power is proportional to the IF bandwidth, noise measured at ref_ifbw
+# rises by 10*log10(ifbw / ref_ifbw) dB at ifbw.
+#
+def widest_bandwidth(noise, ref_ifbw, target=ADAPTIVE_NOISE_FLOOR,
+                     lo=ADAPTIVE_IFBW_MIN, hi=ADAPTIVE_IFBW_MAX):
+    limit = min(hi, ref_ifbw * 10 ** ((target - noise) / 10.0))
+    steps = [b for b in IFBW_STEPS if lo <= b <= limit]
+    return steps[-1] if steps else lo
+
+
+#
+# End widest bandwidth
+# ==============================================================================
+
+
+# ==============================================================================
+# Choose the IF bandwidth of each segment
+#
+# Sweeps the segments a few times at ADAPTIVE_IFBW_MAX and estimates the
+# noise floor of each segment from the spread between the sweeps. The
+# receiver noise floor does not depend on the stand angle, so one estimate
+# at the start position covers the whole scan. The chosen table is left
+# loaded. Returns the segments and the values for the dataset metadata.
+#
+def choose_bandwidths(log, analyzer, channel, segments,
+                      target=ADAPTIVE_NOISE_FLOOR,
+                      presweeps=ADAPTIVE_PRESWEEPS):
+    ref = ADAPTIVE_IFBW_MAX
+    t0 = time.time()
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # Sweep time with the fixed bandwidths, for the savings
+    #
+    analyzer.set_segments(channel, segments)
+    fixed_time = analyzer.get_sweep_time(channel)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # Noise pre-sweep
+    #
+    with tracer.span("noise pre-sweep"):
+        analyzer.set_segments(channel, [s._replace(ifbw=ref)
+                                        for s in segments])
+        sweeps = []
+        for i in range(presweeps):
+            analyzer.trigger()
+            sweeps.append(analyzer.get_corr_values(channel))
+        noise = noise_db(sweeps)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # Widest bandwidth of each segment
+    #
+    chosen = []
+    rows = []
+    k = 0
+    for s in segments:
+        part = noise[k:k + s.points]
+        k += s.points
+        if not len(part):
+            # Table clamped by the analyzer, keep the fixed bandwidth
+            log.warning("No noise estimate for segment %g-%g Hz",
+                        s.start, s.stop)
+            chosen.append(s)
+            continue
+        # Mean noise power over the segment
+        floor = 10 * np.log10(np.mean(10 ** (part / 10.0)))
+        ifbw = widest_bandwidth(floor, ref, target)
+        chosen.append(s._replace(ifbw=ifbw))
+        rows.append({"start": s.start, "stop": s.stop, "points": s.points,
+                     "if_bandwidth": ifbw,
+                     "noise_db": floor + 10 * np.log10(float(ifbw) / ref)})
+        log.info("Segment %g-%g GHz: noise %.1f dB at %g Hz, using %g Hz",
+                 s.start / 1e9, s.stop / 1e9, floor, ref, ifbw)
+
+    analyzer.set_segments(channel, chosen)
+    sweep_time = analyzer.get_sweep_time(channel)
+    return chosen, {"mode": "adaptive", "target_noise_db": target,
+                    "reference_if_bandwidth": ref, "presweeps": presweeps,
+                    "presweep_s": time.time() - t0, "segments": rows,
+                    "fixed_sweep_time_s": fixed_time,
+                    "sweep_time_s": sweep_time}
+
+
+#
+# End choose bandwidths
+# ==============================================================================
+
+
+# ==============================================================================
+# Add the time saved over a scan to the metadata and log it
+#
+# A sweep started with trigger() takes at least TRIGGER_DELAY, so it only
+# saves the part of the sweep time above the delay. bus_sweeps is the number
+# of sweeps started with trigger(), all of them by default.
+#
+def report_savings(log, metadata, sweeps, bus_sweeps=None):
+    fixed = metadata["fixed_sweep_time_s"]
+    adaptive = metadata["sweep_time_s"]
+    if bus_sweeps is None:
+        bus_sweeps = sweeps
+    saved = ((max(fixed, TRIGGER_DELAY) - max(adaptive, TRIGGER_DELAY))
+             * bus_sweeps + (fixed - adaptive) * (sweeps - bus_sweeps)
+             - metadata["presweep_s"])
+    metadata.update(sweeps=sweeps, saved_s=saved)
+    log.info("Adaptive IF bandwidth: %.3f s per sweep instead of %.3f s, "
+             "%.1f s saved over %d sweeps including the pre-sweep",
+             metadata["sweep_time_s"], metadata["fixed_sweep_time_s"], saved,
+             sweeps)
+    return saved
+
+
+#
+# End report savings
+# ==============================================================================
@@ -7,18 +7,19 @@
 
 # Local files
 from functions import *
+from configStore import open_config_store
+from transport import write_job_metrics
+from jobRecords import JobRecord
+from logSetup import get_logger
 # Standard libraries
 import sys
-import logging
-from datetime import datetime
 
 # Installed libraries
 
 motorSet = []  # Motor controller, contains motor objects
 mc = None
 
-db = None
-mycursor = None
+db = None  # Config option store
 
 
 # ==============================================================================
@@ -115,23 +116,8 @@ def align_motors(argv):
     # --------------------------------------------------------------------------
     # Set up log file
     #
-    logging.basicConfig(level=logging.DEBUG)
-    log = logging.getLogger("alignMotors.py")  # Get local logger
-    # Create and format handler to write to file "log_[MONTH]_[YEAR].log"
-    handler = logging.FileHandler(
-            'log_' + datetime.today().strftime('%m_%Y') + '.log')
-    handler.setLevel(LOG_LEVEL)
-    formatter = logging.Formatter(
-            fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S')
-    handler.setFormatter(formatter)
-    # Add handler to logger and specify properties
-    log.addHandler(handler)
-    log.setLevel(LOG_LEVEL)
-    # Get logger for pyvisa module and set level to log warnings and errors
-    requests_log = logging.getLogger('pyvisa')
-    requests_log.setLevel(IMPORT_LOG_LEVEL)
-    requests_log.addHandler(handler)
+    # Queued handlers write "log_[MONTH]_[YEAR].log" off the test thread
+    log = get_logger("alignMotors.py")  # Get local logger
     log.info("")
     log.info("")
     #
@@ -148,6 +134,14 @@ def align_motors(argv):
     #
     # End check for command line arguments
 
+    # --------------------------------------------------------------------------
+    # Start job record
+    #
+    job = JobRecord("alignMotors")
+    #
+    # End start job record
+    # --------------------------------------------------------------------------
+
     # --------------------------------------------------------------------------
     # Attempt alignment
     #
@@ -165,9 +159,9 @@ def align_motors(argv):
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         # Connect to database
         #
-        global db, mycursor
+        global db
         log.info("Attempting connection to database")
-        db, mycursor = db_init()
+        db = open_config_store(log)
         if db.is_connected():
             log.info("Successfully connected to database")
         else:
@@ -189,19 +183,9 @@ def align_motors(argv):
         # Update database
         #
         if db.is_connected():
-            rowcount = mycursor.rowcount
-
-            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-            # Antenna polarization
-            #
             log.info("Updating tpolar and cpolar in sql database")
-            update_config_db(log, mycursor, 0, "'antenna_polarization'")
-            update_config_db(log, mycursor, 0, "'chamber_polarization'")
-
-            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-            # Commit changes
-            db.commit()
-            if rowcount == mycursor.rowcount:
+            if not db.set_options({"antenna_polarization": 0,
+                                   "chamber_polarization": 0}):
                 log.warning("Failed to store updated antenna polarization data")
 
     #
@@ -215,6 +199,7 @@ def align_motors(argv):
         # log exception
         log.exception('Error from alignMotors.main():')
         # Set return value to 1 (error)
+        job.fail()
         rv = 1
     #
     # End handle exceptions/errors
@@ -245,6 +230,19 @@ def align_motors(argv):
                 log.info("Closing database connection")
                 db.close()
 
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Write job record
+        #
+        job.finish(log, rv)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Write instrument I/O metrics
+        #
+        try:
+            write_job_metrics(log, "alignMotors")
+        except BaseException:
+            log.exception("Failed to write instrument I/O metrics")
+
         return rv  # Return 1 if error, 0 else
     #
     # End close instruments and return
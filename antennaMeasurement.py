@@ -8,12 +8,19 @@
 # Local files
 from networkAnalyzer import NetworkAnalyzer
 from functions import *
-from process import S21Normalize
+from configStore import open_config_store
+from transport import write_job_metrics
+from jobRecords import JobRecord, JobPhase, add_job_steps
+from catalog import record_experiment
+from adaptiveBandwidth import choose_bandwidths, report_savings
+from scanEstimate import scan_steps, estimate_sweep, ScanEta
+from settle import SettlePolicy
+from tracing import tracer, write_job_trace, ANALYZER, MOTOR, FILE, SETTLE, \
+    PROCESS
+from logSetup import get_logger
 # Standard libraries
 import sys
-import logging
 from datetime import datetime
-import numpy
 import time
 
 # Installed libraries
@@ -22,8 +29,7 @@ import time
 motorSet = []  # Motor controller, contains motor objects
 mc = None
 
-db = None
-mycursor = None
+db = None  # Config option store
 
 analyzer = None
 
@@ -34,16 +40,21 @@ spos_default = True
 # Test routine
 #
 def sweep(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar,
-          spos=spos_default):
+          spos=spos_default, segments=None, adaptive=ADAPTIVE_IFBW,
+          hardware_trigger=HARDWARE_TRIGGER, settle_mode=SETTLE_MODE):
     print('starting sweep')
     # --------------------------------------------------------------------------
     # Initialize values
     #
-    ant_no = int(
-            numpy.floor((rstop - rstart) / angle) + 1)  # Number of degree steps
-    # If meas 0-360, don't take measurement at 360
-    if (rstop == 360) and (rstart == 0):
-        ant_no = ant_no - 1
+    # Number of degree steps, a 0-360 scan does not measure 360
+    ant_no = scan_steps(rstart, angle, rstop)
+    # The stand starts where the last job left it
+    position = motorSet[STAND_ROTATION].get_position()
+    log.info("Estimated test time %.0f s", estimate_sweep(
+            motorSet, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar,
+            spos, segments, analyzer.ifBandwidth,
+            hardware_trigger=hardware_trigger, position=position,
+            settle_mode=settle_mode)["total_s"])
     #
     # End initialize values
     # --------------------------------------------------------------------------
@@ -51,19 +62,21 @@ def sweep(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar,
     # --------------------------------------------------------------------------
     # Set motor start positions
     #
-    motorSet[STAND_ROTATION].goto_zero()
-    if spos:  # Stand translation
-        motorSet[S_TRANSLATION].rot_deg(STAND_OFFSET)
-    set_polarization(log, motorSet, tpolar, cpolar, mycursor)
+    with tracer.span("set start positions"), JobPhase(MOTOR):
+        if spos:  # Stand translation
+            motorSet[S_TRANSLATION].rot_deg(STAND_OFFSET)
+        set_polarization(log, motorSet, tpolar, cpolar, db)
     #
     # End set motor start positions
     # --------------------------------------------------------------------------
 
     # --------------------------------------------------------------------------
-    # Move test antenna to start degree position
+    # Move test antenna to start degree position, the shorter way around from
+    # where the last test left it
     #
-    log.info("Start Position: " + str(rstart))
-    motorSet[M1].rot_deg(rstart)
+    with tracer.span("move to start angle"), JobPhase(MOTOR):
+        log.info("Start Position: " + str(rstart))
+        motorSet[STAND_ROTATION].goto_angle(rstart, rstop - rstart)
     log.info("Motor setup complete")
     #
     # End move test antenna to start position
@@ -72,7 +85,8 @@ def sweep(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar,
     # --------------------------------------------------------------------------
     # Load state
     #
-    analyzer.load_state()
+    with tracer.span("load state"):
+        analyzer.load_state()
     #
     # End load state
     # --------------------------------------------------------------------------
@@ -80,32 +94,52 @@ def sweep(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar,
     # --------------------------------------------------------------------------
     # Set network analyzer parameters
     #
-    channel = 1
-    trace = 1
-    analyzer.setup(channel, trace)
-    # analyzer.enable_display(False)
-
-    # Set start frequency
-    start = float(analyzer.set_start(channel, f1))
-    if f1 != start:
-        log.warning("WARNING: Invalid start frequency, using " + str(start))
-        # f1_old = f1
-        f1 = start
-
-    # Set stop frequency
-    stop = float(analyzer.set_stop(channel, f2))
-    if f2 != stop:
-        log.warning("WARNING: Invalid stop frequency, using " + str(stop))
-        # f2_old = f2
-        f2 = stop
-
-    # Set number of points
-    points = int(analyzer.set_points(channel, nums))
-    if nums != points:
-        log.warning(
-                "WARNING: Invalid number of freq steps, using " + str(points))
-        # nums_old = nums
-        nums = points
+    with tracer.span("analyzer setup"):
+        channel = 1
+        trace = 1
+        analyzer.setup(channel, trace)
+
+        ifbw = {"mode": "fixed", "if_bandwidth": analyzer.ifBandwidth}
+        if adaptive:
+            # Noise pre-sweep on S21 picks the IF bandwidth of each segment, a
+            # linear sweep is one segment
+            analyzer.set_measurement(channel, trace, 2, 1)
+            segments, ifbw = choose_bandwidths(
+                    log, analyzer, channel,
+                    segments or [Segment(f1, f2, nums)])
+
+        if segments:
+            # Segment sweep, only the listed bands are measured. The
+            # frequency axis read back with get_x() is not uniform.
+            nums = int(float(analyzer.set_segments(channel, segments)))
+            f1 = segments[0].start
+            f2 = segments[-1].stop
+            log.info("Segment sweep: " + str(len(segments)) + " segments, "
+                     + str(nums) + " points")
+        else:
+            # Set start frequency
+            start = float(analyzer.set_start(channel, f1))
+            if f1 != start:
+                log.warning("WARNING: Invalid start frequency, using "
+                            + str(start))
+                # f1_old = f1
+                f1 = start
+
+            # Set stop frequency
+            stop = float(analyzer.set_stop(channel, f2))
+            if f2 != stop:
+                log.warning("WARNING: Invalid stop frequency, using "
+                            + str(stop))
+                # f2_old = f2
+                f2 = stop
+
+            # Set number of points
+            points = int(analyzer.set_points(channel, nums))
+            if nums != points:
+                log.warning("WARNING: Invalid number of freq steps, using "
+                            + str(points))
+                # nums_old = nums
+                nums = points
 
     # Create csv files
     d = datetime.today()
@@ -120,13 +154,15 @@ def sweep(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar,
 
     # --------------------------------------------------------------------------
     # Check for network analyzer errors
-    log.debug("Checking network analyzer error queue")
-    err_nums, err_msgs = analyzer.get_errors()
-    if len(err_nums) > 0:
-        log.warning("Error in setting network analyzer parameters")
-    else:
-        # No errors
-        log.debug("No network analyzer errors detected")
+    # Intermediate check, skipped by the fast acquisition profile
+    if analyzer.profile.errorPolls:
+        log.debug("Checking network analyzer error queue")
+        err_nums, err_msgs = analyzer.get_errors()
+        if len(err_nums) > 0:
+            log.warning("Error in setting network analyzer parameters")
+        else:
+            # No errors
+            log.debug("No network analyzer errors detected")
     #
     # --------------------------------------------------------------------------
 
@@ -134,29 +170,33 @@ def sweep(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar,
     # Measure S11 (actually S22)
     #
     log.info("Measuring S11")
-    analyzer.set_measurement(channel, trace, 2, 2)
-    analyzer.trigger()
-    analyzer.update_display()
-    analyzer.auto_scale(channel, trace)
-    s11Freq = analyzer.get_x(channel)
-    s11Data = analyzer.get_corr_data(channel)
-    # s11Data = analyzer.get_form_data(channel)
-    # Write to csv file
-    log.debug("Writing s11 data to file")
-    s11File.write(s11Freq)
-    s11File.write(s11Data)
+    with tracer.span("measure s11"), JobPhase(ANALYZER):
+        analyzer.set_measurement(channel, trace, 2, 2)
+        analyzer.trigger()
+        analyzer.show_sweep(channel, trace)
+        s11Freq = analyzer.get_x(channel)
+        t0 = time.time()
+        s11Data = analyzer.get_corr_data(channel)
+        transfer_s = time.time() - t0  # For the scan estimate
+        # s11Data = analyzer.get_form_data(channel)
+        # Write to csv file
+        log.debug("Writing s11 data to file")
+        s11File.write(s11Freq)
+        s11File.write(s11Data)
     #
     # --------------------------------------------------------------------------
 
     # --------------------------------------------------------------------------
     # Check for network analyzer errors
-    log.debug("Checking network analyzer error queue")
-    err_nums, err_msgs = analyzer.get_errors()
-    if len(err_nums) > 0:
-        log.warning("Error measuring s11")
-    else:
-        # No errors
-        log.debug("No network analyzer errors detected")
+    # Intermediate check, skipped by the fast acquisition profile
+    if analyzer.profile.errorPolls:
+        log.debug("Checking network analyzer error queue")
+        err_nums, err_msgs = analyzer.get_errors()
+        if len(err_nums) > 0:
+            log.warning("Error measuring s11")
+        else:
+            # No errors
+            log.debug("No network analyzer errors detected")
     #
     # --------------------------------------------------------------------------
 
@@ -166,54 +206,99 @@ def sweep(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar,
     log.debug("Number of angle steps: " + str(int(ant_no)))
     analyzer.set_measurement(channel, trace, 2, 1)
     log.info("Measuring S21")
-    for k in range(1, ant_no + 1):
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # Get current angle
-        #
-        pos = motorSet[M1].get_position()
-        # Convert to string to print to file
-        if pos > 180:
-            angles = str(pos - 360)
+    # Scan estimate from the measured sweep and data read times, the ETA
+    # follows the measured step times
+    estimate = estimate_sweep(motorSet, f1, f2, nums, rstart, angle, rstop,
+                              tpolar, cpolar, spos, segments,
+                              analyzer.ifBandwidth,
+                              float(analyzer.get_sweep_time(channel)),
+                              transfer_s, hardware_trigger, position,
+                              settle_mode)
+    settle = SettlePolicy(log, motorSet[STAND_ROTATION], analyzer,
+                          settle_mode)
+    # The stand step is stored on the motor controller once, each step only
+    # runs it
+    with motorSet[STAND_ROTATION].scan_program(angle) as scan, \
+            ScanEta(log, estimate) as eta, settle:
+        if hardware_trigger:
+            # The motor controller triggers each sweep and the analyzer's
+            # trigger output releases the step, which runs while the host
+            # reads the data. The next sweep is triggered after the read.
+            analyzer.set_external_trigger()
+            scan.start_triggered(ant_no, settle.delay(angle))
         else:
-            angles = str(pos)
-
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # Complete frequency sweep
-        #
-        analyzer.trigger()
-        analyzer.update_display()
-        analyzer.auto_scale(channel, trace)
-
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # Retrieve and store data
-        #
-        # If first position, get frequency data
-        if k == 1:
-            s21Freq = analyzer.get_x(channel)
-            s21File.write("Angle," + s21Freq)
-        # Get s21 data and write to file
-        s21Data = analyzer.get_corr_data(channel)
-        # s21Data = analyzer.get_form_data(channel)
-        s21File.write(str(angles) + "," + s21Data)
-        # If position == 180, write duplicate data for +/- 180
-        if pos == 180:
-            s21File.write(str(-180) + "," + s21Data)
-
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # Calculate next rotation angle
-        #
-        if k != ant_no:  # If not the last step
-            rot_angle = angle
-        else:  # If the last step
-            rot_angle = rstop - rstart - ((ant_no - 1) * angle)
-
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # Rotate motor
-        #
-        log.debug("Step %d. Current angle %.2f. Rotate %.2f degrees" % (
-            k, pos, rot_angle))
-        motorSet[STAND_ROTATION].rot_deg(rot_angle)
-        time.sleep(0.25)
+            settle.start_probe(channel, f1, f2)
+        for k in range(1, ant_no + 1):
+            with tracer.span("angle step", step=k):
+                # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+                # Get current angle, tracked by the scan program
+                #
+                pos = normalize_angle(scan.position)
+                # Convert to string to print to file
+                angles = str(pos)
+
+                # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+                # Complete frequency sweep
+                #
+                with tracer.span("frequency sweep"), JobPhase(ANALYZER):
+                    if hardware_trigger:
+                        analyzer.wait_sweep_end()
+                    else:
+                        analyzer.trigger()
+                    analyzer.show_sweep(channel, trace)
+
+                # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+                # Retrieve and store data
+                #
+                # If first position, get frequency data
+                if k == 1:
+                    s21Freq = analyzer.get_x(channel)
+                    with tracer.span("write s21", FILE), JobPhase(FILE):
+                        s21File.write("Angle," + s21Freq)
+                # Get s21 data and write to file
+                with tracer.span("read s21"), JobPhase(ANALYZER):
+                    s21Data = analyzer.get_corr_data(channel)
+                # s21Data = analyzer.get_form_data(channel)
+                with tracer.span("write s21", FILE), JobPhase(FILE):
+                    s21File.write(str(angles) + "," + s21Data)
+                    # If position == 180, write duplicate data for +/- 180
+                    if pos == 180:
+                        s21File.write(str(-180) + "," + s21Data)
+                eta.update(k)
+                add_job_steps()
+
+                # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+                # Calculate next rotation angle
+                #
+                if k != ant_no:  # If not the last step
+                    rot_angle = angle
+                else:  # If the last step
+                    rot_angle = rstop - rstart - ((ant_no - 1) * angle)
+
+                # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+                # Rotate motor
+                #
+                if hardware_trigger:
+                    # Stepped and settled by the controller program, wait
+                    # for it and trigger the next sweep. The last step is
+                    # run after the program.
+                    if k != ant_no:
+                        with JobPhase(MOTOR):
+                            scan.advance()
+                    continue
+                log.debug("Step %d. Current angle %.2f. Rotate %.2f degrees",
+                          k, pos, rot_angle)
+                with tracer.span("rotate stand"), JobPhase(MOTOR):
+                    scan.step(rot_angle)
+                with tracer.span("settle", SETTLE), JobPhase(SETTLE):
+                    settle.wait(rot_angle)
+
+        if hardware_trigger:
+            with tracer.span("finish scan program"), JobPhase(MOTOR):
+                scan.finish()
+            analyzer.set_trig()  # Back to bus trigger
+            with tracer.span("rotate stand"), JobPhase(MOTOR):
+                scan.step(rot_angle)
 
     #
     # End test loop
@@ -232,11 +317,13 @@ def sweep(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar,
     # --------------------------------------------------------------------------
 
     # --------------------------------------------------------------------------
-    # Reset motor positions to zero index
+    # Reset motor positions to zero angle, by the shorter way around for the
+    # stand instead of unwinding a full turn
     #
-    motorSet[STAND_ROTATION].goto_zero()
-    if spos:
-        motorSet[S_TRANSLATION].rot_deg(-STAND_OFFSET)
+    with tracer.span("reset positions"), JobPhase(MOTOR):
+        motorSet[STAND_ROTATION].goto_angle(0)
+        if spos:
+            motorSet[S_TRANSLATION].rot_deg(-STAND_OFFSET)
     #
     # End reset motor positions
     # --------------------------------------------------------------------------
@@ -252,50 +339,78 @@ def sweep(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar,
     # --------------------------------------------------------------------------
     # Update database
     #
-    if db.is_connected():
-        tpolar = motorSet[T_POLARIZATION].get_position()
-        cpolar = motorSet[C_POLARIZATION].get_position()
-        fstart = f1 / 1e9
-        fstop = f2 / 1e9
-        rowcount = mycursor.rowcount
-
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # Antenna polarization
-        #
-        log.debug("Updating tpolar and cpolar in sql database")
-        update_config_db(log, mycursor, tpolar, "'antenna_polarization'")
-        update_config_db(log, mycursor, cpolar, "'chamber_polarization'")
-
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # Network analyzer parameters
-        #
-        log.debug("Updating fstart, fstop, and nums in sql database")
-        update_config_db(log, mycursor, fstart, "'frequency_start'")
-        update_config_db(log, mycursor, fstop, "'frequency_stop'")
-        update_config_db(log, mycursor, nums, "'num_steps'")
-
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # Commit changes
-        log.debug("Committing changes")
-        db.commit()
-        if rowcount == mycursor.rowcount:
-            log.warning("Failed to store updated antenna polarization data")
+    with tracer.span("update database"):
+        if db.is_connected():
+            tpolar = motorSet[T_POLARIZATION].get_position()
+            cpolar = motorSet[C_POLARIZATION].get_position()
+            fstart = f1 / 1e9
+            fstop = f2 / 1e9
+            log.debug("Updating tpolar, cpolar, fstart, fstop, and nums in "
+                      "sql database")
+            if not db.set_options({"antenna_polarization": tpolar,
+                                   "chamber_polarization": cpolar,
+                                   "frequency_start": fstart,
+                                   "frequency_stop": fstop,
+                                   "num_steps": nums}):
+                log.warning("Failed to store updated antenna polarization "
+                            "data")
 
     #
     # End update database
     # --------------------------------------------------------------------------
 
+    # --------------------------------------------------------------------------
+    # Write dataset metadata
+    #
+    if adaptive:
+        # S11 and one S21 sweep per angle step, only S11 is triggered by
+        # the host with hardware triggering
+        report_savings(log, ifbw, ant_no + 1,
+                       1 if hardware_trigger else None)
+    meta_filename = write_metadata(file_name, {
+        "name": os.path.basename(file_name),
+        "created": d.isoformat(" ", "seconds"),
+        "fstart": f1, "fstop": f2, "points": nums,
+        "segments": [dict(s._asdict()) for s in segments or []],
+        "if_bandwidth": ifbw})
+    #
+    # End write dataset metadata
+    # --------------------------------------------------------------------------
+
     # --------------------------------------------------------------------------
     # Call normalization function and write files to zip
     #
-    log.info("Normalized data written to file: " + S21Normalize(
-            os.path.basename(s21_filename)))
-    file_paths = [s11_filename, s21_filename]
-    create_zip(file_name, file_paths)
+    with tracer.span("normalize", PROCESS), JobPhase(PROCESS):
+        from process import S21Normalize
+        log.info("Normalized data written to file: " + S21Normalize(
+                os.path.basename(s21_filename)))
+    file_paths = [s11_filename, s21_filename, meta_filename]
+    with tracer.span("zip", PROCESS), JobPhase(PROCESS):
+        create_zip(file_name, file_paths)
     #
     # End normalization
     # --------------------------------------------------------------------------
 
+    # --------------------------------------------------------------------------
+    # Record experiment in catalog
+    #
+    try:
+        with tracer.span("catalog", PROCESS), JobPhase(PROCESS):
+            record_experiment(os.path.basename(file_name), kind="pattern",
+                              created=d, fstart=f1, fstop=f2, points=nums,
+                              rstart=rstart, rstep=angle, rstop=rstop,
+                              tpolar=tpolar, cpolar=cpolar,
+                              s11_file=s11_filename, s21_file=s21_filename,
+                              zip_file=file_name + ".zip",
+                              cal_factor_file=os.path.join(DATA_PATH,
+                                                           "CalFactor.csv"))
+    except BaseException:
+        # Data is already saved, a catalog failure should not fail the test
+        log.exception("Failed to record experiment in catalog")
+    #
+    # End record experiment
+    # --------------------------------------------------------------------------
+
 
 #
 # End test routine
@@ -312,26 +427,8 @@ def antenna_measurement(args):
     # --------------------------------------------------------------------------
     # Set up log file
     #
-    logging.basicConfig(level=logging.DEBUG)
-    log = logging.getLogger("antennaMeasurement")  # Get local logger
-    # Create and format handler to write to file "log_[MONTH]_[YEAR].log"
-    handler = logging.FileHandler(
-            'log_' + datetime.today().strftime('%m_%Y') + '.log')
-    handler.setLevel(LOG_LEVEL)
-    formatter = logging.Formatter(
-            fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S')
-    handler.setFormatter(formatter)
-    # Add handler to logger and specify properties
-    log.addHandler(handler)
-    log.setLevel(LOG_LEVEL)
-    # Get logger for pyvisa module and set level to log warnings and errors
-    visa_log = logging.getLogger('pyvisa')
-    visa_log.setLevel(IMPORT_LOG_LEVEL)
-    visa_log.addHandler(handler)
-    sql_log = logging.getLogger('mysql.connector')
-    sql_log.setLevel(IMPORT_LOG_LEVEL)
-    sql_log.addHandler(handler)
+    # Queued handlers write "log_[MONTH]_[YEAR].log" off the test thread
+    log = get_logger("antennaMeasurement")  # Get local logger
     log.info("")
     log.info("")
     #
@@ -350,7 +447,10 @@ def antenna_measurement(args):
         rstop = float(args[5])
         tpolar = float(args[6])
         cpolar = float(args[7])
-        spos = bool(float(args[8])) if len(args) == 9 else spos_default
+        spos = bool(float(args[8])) if len(args) >= 9 else spos_default
+        # Optional segment table "f1:f2:n[:ifbw[:power]];..." (GHz), replaces
+        # the f1, f2 and nums sweep
+        segments = parse_segments(args[9]) if len(args) >= 10 else None
     except ValueError:
         log.exception(
                 "ERROR: Could not parse command line arguments " + str(args))
@@ -358,7 +458,7 @@ def antenna_measurement(args):
     except IndexError:
         log.exception(
                 "ERROR: Invalid number of command line arguments. "
-                "Expected 9, Received " + str(len(args)))
+                "Expected 8 to 10, Received " + str(len(args)))
         return 1
     #
     # End parse CL arguments
@@ -367,12 +467,26 @@ def antenna_measurement(args):
     # --------------------------------------------------------------------------
     # Validate parameters
     #
+    if segments:
+        f1 = segments[0].start
+        f2 = segments[-1].stop
+        nums = sum(s.points for s in segments)
     (f1, f2, nums, rstart, angle, rstop, tpolar, cpolar) = validate_parameters(
             log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar)
     #
     # End validate parameters
     # --------------------------------------------------------------------------
 
+    # --------------------------------------------------------------------------
+    # Start job record
+    #
+    job = JobRecord("antennaMeasurement", fstart=f1, fstop=f2, points=nums,
+                    rstart=rstart, rstep=angle, rstop=rstop, tpolar=tpolar,
+                    cpolar=cpolar, segments=segments)
+    #
+    # End start job record
+    # --------------------------------------------------------------------------
+
     # --------------------------------------------------------------------------
     # Attempt test
     #
@@ -398,9 +512,9 @@ def antenna_measurement(args):
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         # Connect to database
         #
-        global db, mycursor
+        global db
         log.debug("Attempting connection to database")
-        db, mycursor = db_init()
+        db = open_config_store(log)
         if db.is_connected():
             log.debug("Successfully connected to database")
         else:
@@ -416,7 +530,9 @@ def antenna_measurement(args):
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         # Run test routine
         #
-        sweep(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar, spos)
+        with tracer.span("sweep"):
+            sweep(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar,
+                  spos, segments)
 
     #
     # End attempt alignment
@@ -427,6 +543,7 @@ def antenna_measurement(args):
     #
     except BaseException:
         log.exception("Error from calibrateS21:")
+        job.fail()
         rv = 1
 
     # --------------------------------------------------------------------------
@@ -459,6 +576,27 @@ def antenna_measurement(args):
                 log.debug("Closing database connection")
                 db.close()
 
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Write trace and timing summary (only when tracing is enabled)
+        #
+        try:
+            write_job_trace(log, "antennaMeasurement")
+        except BaseException:
+            log.exception("Failed to write trace")
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Write job record
+        #
+        job.finish(log, rv)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Write instrument I/O metrics
+        #
+        try:
+            write_job_metrics(log, "antennaMeasurement")
+        except BaseException:
+            log.exception("Failed to write instrument I/O metrics")
+
         return rv  # Return 1 if error, 0 else
     #
     # End close instruments and return
@@ -7,16 +7,18 @@
 
 # Local files
 from functions import *
+from configStore import open_config_store
+from transport import write_job_metrics
+from jobRecords import JobRecord
 from networkAnalyzer import NetworkAnalyzer
+from logSetup import get_logger
 # Standard libraries
 import sys
-from datetime import datetime
 
 # Installed libraries
 
 # Global variables
-db = None
-mycursor = None
+db = None  # Config option store
 analyzer = None
 
 
@@ -64,16 +66,10 @@ def run_s11_calibration(log, f1, f2, nums):
     if db.is_connected():
         fstart = f1 / 1e9
         fstop = f2 / 1e9
-        rowcount = mycursor.rowcount
-
         log.info("Updating fstart, fstop, and nums in sql database")
-        update_config_db(log, mycursor, fstart, "'frequency_start'")
-        update_config_db(log, mycursor, fstop, "'frequency_stop'")
-        update_config_db(log, mycursor, nums, "'num_steps'")
-
-        log.info("Committing changes")
-        db.commit()
-        if rowcount == mycursor.rowcount:
+        if not db.set_options({"frequency_start": fstart,
+                               "frequency_stop": fstop,
+                               "num_steps": nums}):
             log.warning("Failed to store updated data")
     #
     # End set parameters
@@ -153,26 +149,8 @@ def calibrate_s11(args):
     # --------------------------------------------------------------------------
     # Set up log file
     #
-    logging.basicConfig(level=logging.DEBUG)
-    log = logging.getLogger("calibrateS11")  # Get local logger
-    # Create and format handler to write to file "log_[MONTH]_[YEAR].log"
-    handler = logging.FileHandler(
-            'log_' + datetime.today().strftime('%m_%Y') + '.log')
-    handler.setLevel(LOG_LEVEL)
-    formatter = logging.Formatter(
-            fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S')
-    handler.setFormatter(formatter)
-    # Add handler to logger and specify properties
-    log.addHandler(handler)
-    log.setLevel(LOG_LEVEL)
-    # Get logger for pyvisa module and set level to log warnings and errors
-    visa_log = logging.getLogger('pyvisa')
-    visa_log.setLevel(IMPORT_LOG_LEVEL)
-    visa_log.addHandler(handler)
-    sql_log = logging.getLogger('mysql.connector')
-    sql_log.setLevel(IMPORT_LOG_LEVEL)
-    sql_log.addHandler(handler)
+    # Queued handlers write "log_[MONTH]_[YEAR].log" off the test thread
+    log = get_logger("calibrateS11")  # Get local logger
     log.info("")
     log.info("")
     #
@@ -204,6 +182,14 @@ def calibrate_s11(args):
     # End parse CL arguments
     # --------------------------------------------------------------------------
 
+    # --------------------------------------------------------------------------
+    # Start job record
+    #
+    job = JobRecord("calibrateS11", fstart=f1, fstop=f2, points=nums)
+    #
+    # End start job record
+    # --------------------------------------------------------------------------
+
     # --------------------------------------------------------------------------
     # Attempt calibration
     #
@@ -219,9 +205,9 @@ def calibrate_s11(args):
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         # Connect to database
         #
-        global db, mycursor
+        global db
         log.info("Attempting connection to database")
-        db, mycursor = db_init()
+        db = open_config_store(log)
         if db.is_connected():
             log.info("Successfully connected to database")
         else:
@@ -237,6 +223,7 @@ def calibrate_s11(args):
         # print("Error calibrating S11. Check log file for details.")
         print(e)
         log.exception("Error from calibrateS11:")
+        job.fail()
         rv = 1
     finally:
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -254,6 +241,19 @@ def calibrate_s11(args):
                 log.info("Closing database connection")
                 db.close()
 
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Write job record
+        #
+        job.finish(log, rv)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Write instrument I/O metrics
+        #
+        try:
+            write_job_metrics(log, "calibrateS11")
+        except BaseException:
+            log.exception("Failed to write instrument I/O metrics")
+
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         # Return error flag (0 if no error, 1 if error)
         #
@@ -8,17 +8,17 @@
 # Local files
 from networkAnalyzer import NetworkAnalyzer
 from functions import *
-from process import CalCalFactor
+from configStore import open_config_store
+from transport import write_job_metrics
+from jobRecords import JobRecord
+from logSetup import get_logger
 # Standard libraries
 import sys
-import logging
-from datetime import datetime
 
 # Installed libraries
 
 # Global variables
-db = None
-mycursor = None
+db = None  # Config option store
 analyzer = None
 
 
@@ -77,16 +77,10 @@ def run_s21_calibration(log, f1, f2, nums):
     if db.is_connected():
         fstart = f1 / 1e9
         fstop = f2 / 1e9
-        rowcount = mycursor.rowcount
-
         log.info("Updating fstart, fstop, and nums in sql database")
-        update_config_db(log, mycursor, fstart, "'frequency_start'")
-        update_config_db(log, mycursor, fstop, "'frequency_stop'")
-        update_config_db(log, mycursor, nums, "'num_steps'")
-
-        log.info("Committing changes")
-        db.commit()
-        if rowcount == mycursor.rowcount:
+        if not db.set_options({"frequency_start": fstart,
+                               "frequency_stop": fstop,
+                               "num_steps": nums}):
             log.warning("Failed to store updated data")
     #
     # End set parameters
@@ -128,6 +122,7 @@ def run_s21_calibration(log, f1, f2, nums):
     s21File.write(s21Data)
     s21File.close()
 
+    from process import CalCalFactor
     CalCalFactor()
     log.info("S21 calibration complete")
     #
@@ -171,26 +166,8 @@ def calibrate_s21(args):
     # --------------------------------------------------------------------------
     # Set up log file
     #
-    logging.basicConfig(level=logging.DEBUG)
-    log = logging.getLogger("calibrateS21")  # Get local logger
-    # Create and format handler to write to file "log_[MONTH]_[YEAR].log"
-    handler = logging.FileHandler(
-            'log_' + datetime.today().strftime('%m_%Y') + '.log')
-    handler.setLevel(LOG_LEVEL)
-    formatter = logging.Formatter(
-            fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S')
-    handler.setFormatter(formatter)
-    # Add handler to logger and specify properties
-    log.addHandler(handler)
-    log.setLevel(LOG_LEVEL)
-    # Get logger for pyvisa module and set level to log warnings and errors
-    visa_log = logging.getLogger('pyvisa')
-    visa_log.setLevel(IMPORT_LOG_LEVEL)
-    visa_log.addHandler(handler)
-    sql_log = logging.getLogger('mysql.connector')
-    sql_log.setLevel(IMPORT_LOG_LEVEL)
-    sql_log.addHandler(handler)
+    # Queued handlers write "log_[MONTH]_[YEAR].log" off the test thread
+    log = get_logger("calibrateS21")  # Get local logger
     log.info("")
     log.info("")
     #
@@ -222,6 +199,14 @@ def calibrate_s21(args):
     # End parse CL arguments
     # --------------------------------------------------------------------------
 
+    # --------------------------------------------------------------------------
+    # Start job record
+    #
+    job = JobRecord("calibrateS21", fstart=f1, fstop=f2, points=nums)
+    #
+    # End start job record
+    # --------------------------------------------------------------------------
+
     # --------------------------------------------------------------------------
     # Attempt calibration
     #
@@ -237,9 +222,9 @@ def calibrate_s21(args):
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         # Connect to database
         #
-        global db, mycursor
+        global db
         log.info("Attempting connection to database")
-        db, mycursor = db_init()
+        db = open_config_store(log)
         if db.is_connected():
             log.info("Successfully connected to database")
         else:
@@ -255,6 +240,7 @@ def calibrate_s21(args):
         # print("Error calibrating S21. Check log file for details.")
         print(e)
         log.exception("Error from calibrateS21:")
+        job.fail()
         rv = 1
     finally:
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -272,6 +258,19 @@ def calibrate_s21(args):
                 log.info("Closing database connection")
                 db.close()
 
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Write job record
+        #
+        job.finish(log, rv)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Write instrument I/O metrics
+        #
+        try:
+            write_job_metrics(log, "calibrateS21")
+        except BaseException:
+            log.exception("Failed to write instrument I/O metrics")
+
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         # Return error flag (0 if no error, 1 if error)
         #
@@ -0,0 +1,300 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         catalog.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from serverInfo import *
+# Standard libraries
+import sys
+import argparse
+import hashlib
+import sqlite3
+from datetime import datetime
+
+# Installed libraries
+
+# Catalog columns, in table order
+COLUMNS = ("name", "kind", "created", "fstart", "fstop", "points", "rstart",
+           "rstep", "rstop", "tpolar", "cpolar", "s11_file", "s21_file",
+           "zip_file", "cal_factor_file", "cal_factor_sha1", "user_id",
+           "experiment_id")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS experiments (
+    name TEXT PRIMARY KEY,      -- Data file base name (YYYYmmddHHMMSS)
+    kind TEXT NOT NULL,         -- Measurement type, e.g. 'pattern'
+    created TEXT NOT NULL,      -- ISO 8601 local time
+    fstart REAL, fstop REAL,    -- Hz
+    points INTEGER,
+    rstart REAL, rstep REAL, rstop REAL,    -- Stand angles (degrees)
+    tpolar REAL, cpolar REAL,   -- Polarizations (degrees)
+    s11_file TEXT, s21_file TEXT, zip_file TEXT,
+    cal_factor_file TEXT, cal_factor_sha1 TEXT,
+    user_id TEXT, experiment_id TEXT    -- Set once moved to RESULTS_PATH
+);
+CREATE INDEX IF NOT EXISTS experiments_created ON experiments (created);
+CREATE INDEX IF NOT EXISTS experiments_freq ON experiments (fstart, fstop);
+CREATE INDEX IF NOT EXISTS experiments_owner ON experiments (user_id,
+                                                            experiment_id);
+"""
+
+
+# ==============================================================================
+# Open catalog, creating it if needed
+#
+def open_catalog(filename=CATALOG_FILE):
+    db = sqlite3.connect(filename, timeout=10)
+    db.row_factory = sqlite3.Row
+    db.executescript(SCHEMA)
+    return db
+
+
+#
+# End open catalog
+# ==============================================================================
+
+
+# ==============================================================================
+# Hash a file, returns None if it cannot be read
+#
+def file_sha1(filename):
+    sha = hashlib.sha1()
+    try:
+        with open(filename, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+    except (IOError, OSError):
+        return None
+    return sha.hexdigest()
+
+
+#
+# End file sha1
+# ==============================================================================
+
+
+# ==============================================================================
+# Add or replace an experiment record
+#
+def record_experiment(name, kind="pattern", created=None, filename=None,
+                      **fields):
+    unknown = set(fields) - set(COLUMNS)
+    if unknown:
+        raise ValueError("Unknown catalog fields: "
+                         + ", ".join(sorted(unknown)))
+
+    row = dict(fields, name=name, kind=kind)
+    row["created"] = (created or datetime.today()).isoformat(" ", "seconds")
+    # Identify the cal factor by content, it is overwritten by each calibration
+    if row.get("cal_factor_file") and ("cal_factor_sha1" not in row):
+        row["cal_factor_sha1"] = file_sha1(row["cal_factor_file"])
+
+    names = sorted(row)
+    sql = ("INSERT OR REPLACE INTO experiments (" + ", ".join(names)
+           + ") VALUES (" + ", ".join(["?"] * len(names)) + ")")
+    db = open_catalog(filename or CATALOG_FILE)
+    try:
+        with db:
+            db.execute(sql, [row[n] for n in names])
+    finally:
+        db.close()
+
+
+#
+# End record experiment
+# ==============================================================================
+
+
+# ==============================================================================
+# Record where the web server moved an experiment's data
+#
+def link_experiment(name, user_id, experiment_id, filename=None):
+    db = open_catalog(filename or CATALOG_FILE)
+    try:
+        with db:
+            cur = db.execute("UPDATE experiments SET user_id = ?, "
+                             "experiment_id = ? WHERE name = ?",
+                             (str(user_id), str(experiment_id), name))
+        return cur.rowcount > 0
+    finally:
+        db.close()
+
+
+#
+# End link experiment
+# ==============================================================================
+
+
+# ==============================================================================
+# Dataset paths for a catalog record
+#
+def dataset_paths(record):
+    # Once moved, the data lives where Plotting() looks for it
+    if record["user_id"] and record["experiment_id"]:
+        path = os.path.join(RESULTS_PATH, record["user_id"],
+                            record["experiment_id"])
+        return {"s11": os.path.join(path, "data_S11.csv"),
+                "s21": os.path.join(path, "data_S21.csv")}
+    return {"s11": record["s11_file"], "s21": record["s21_file"]}
+
+
+#
+# End dataset paths
+# ==============================================================================
+
+
+# ==============================================================================
+# Find experiments, returns a list of dicts with a "paths" entry
+#
+def find_experiments(frequency=None, fmin=None, fmax=None, tpolar=None,
+                     cpolar=None, since=None, until=None, kind=None,
+                     user_id=None, name=None, tolerance=0.5, filename=None):
+    where = []
+    params = []
+
+    # Sweep contains the frequency / overlaps the range (Hz)
+    if frequency is not None:
+        where.append("fstart <= ? AND fstop >= ?")
+        params += [frequency, frequency]
+    if fmin is not None:
+        where.append("fstop >= ?")
+        params.append(fmin)
+    if fmax is not None:
+        where.append("fstart <= ?")
+        params.append(fmax)
+
+    # Polarizations (degrees) within tolerance
+    for column, value in (("tpolar", tpolar), ("cpolar", cpolar)):
+        if value is not None:
+            where.append(column + " BETWEEN ? AND ?")
+            params += [value - tolerance, value + tolerance]
+
+    # Date range, datetimes or ISO strings
+    if since is not None:
+        where.append("created >= ?")
+        params.append(str(since))
+    if until is not None:
+        where.append("created < ?")
+        params.append(str(until))
+
+    for column, value in (("kind", kind), ("user_id", user_id),
+                          ("name", name)):
+        if value is not None:
+            where.append(column + " = ?")
+            params.append(str(value))
+
+    sql = "SELECT * FROM experiments"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY created DESC"
+
+    db = open_catalog(filename or CATALOG_FILE)
+    try:
+        results = []
+        for record in db.execute(sql, params):
+            entry = dict(zip(record.keys(), record))
+            entry["paths"] = dataset_paths(record)
+            results.append(entry)
+        return results
+    finally:
+        db.close()
+
+
+#
+# End find experiments
+# ==============================================================================
+
+
+# ==============================================================================
+# Main function
+#
+def catalog(args):
+    parser = argparse.ArgumentParser(
+            prog="catalog.py", description="Query the experiment catalog")
+    parser.add_argument("--file", default=CATALOG_FILE,
+                        help="catalog database file")
+    commands = parser.add_subparsers(dest="command")
+
+    find = commands.add_parser("find", help="list matching experiments")
+    find.add_argument("--freq", type=float, help="contains frequency (GHz)")
+    find.add_argument("--fmin", type=float, help="overlaps from (GHz)")
+    find.add_argument("--fmax", type=float, help="overlaps to (GHz)")
+    find.add_argument("--tpolar", type=float, help="test polarization (deg)")
+    find.add_argument("--cpolar", type=float,
+                      help="chamber polarization (deg)")
+    find.add_argument("--since", help="created on/after (YYYY-MM-DD)")
+    find.add_argument("--until", help="created before (YYYY-MM-DD)")
+    find.add_argument("--kind")
+    find.add_argument("--user")
+    find.add_argument("--paths", action="store_true",
+                      help="print dataset paths only")
+
+    link = commands.add_parser("link", help="record results location")
+    link.add_argument("name")
+    link.add_argument("user_id")
+    link.add_argument("experiment_id")
+
+    opts = parser.parse_args(args)
+
+    # --------------------------------------------------------------------------
+    # Link experiment to its results folder
+    #
+    if opts.command == "link":
+        if not link_experiment(opts.name, opts.user_id, opts.experiment_id,
+                               opts.file):
+            print("No experiment named " + opts.name)
+            return 1
+        return 0
+
+    # --------------------------------------------------------------------------
+    # Find experiments
+    #
+    if opts.command != "find":
+        parser.print_help()
+        return 1
+
+    def ghz(value):
+        return None if value is None else value * 1e9
+
+    results = find_experiments(frequency=ghz(opts.freq), fmin=ghz(opts.fmin),
+                               fmax=ghz(opts.fmax), tpolar=opts.tpolar,
+                               cpolar=opts.cpolar, since=opts.since,
+                               until=opts.until, kind=opts.kind,
+                               user_id=opts.user, filename=opts.file)
+    def show(value, spec="%g", scale=1):
+        # Settings columns may be NULL
+        return "-" if value is None else spec % (value / scale)
+
+    for r in results:
+        if opts.paths:
+            print(r["paths"]["s21"])
+            continue
+        print("%s  %-8s %s  %s-%s GHz %4s pts  %s:%s:%s deg  "
+              "tpolar %s cpolar %s  %s" % (
+                  r["name"], r["kind"], r["created"],
+                  show(r["fstart"], "%.3f", 1e9),
+                  show(r["fstop"], "%.3f", 1e9), show(r["points"], "%d"),
+                  show(r["rstart"]), show(r["rstep"]), show(r["rstop"]),
+                  show(r["tpolar"]), show(r["cpolar"]), r["paths"]["s21"]))
+    return 0
+
+
+#
+# End main function
+# ==============================================================================
+
+
+# ==============================================================================
+# Enter from command line
+#
+if __name__ == "__main__":
+    argv = sys.argv  # Store command line arguments
+    argv.pop(0)  # Remove file name
+    # Call main function and pass return status to system
+    sys.exit(catalog(argv))
+#
+# End enter from command line
+# ==============================================================================
@@ -0,0 +1,274 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         configStore.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from functions import *
+from dbConfig import connection_settings
+# Standard libraries
+from abc import ABC, abstractmethod
+
+# Installed libraries
+# mysql.connector is imported when the first MySQL store is opened
+
+# Option names in the config_options table
+POLARIZATION_OPTIONS = ("antenna_polarization", "chamber_polarization")
+FREQUENCY_OPTIONS = ("frequency_start", "frequency_stop", "num_steps")
+CONFIG_OPTIONS = POLARIZATION_OPTIONS + FREQUENCY_OPTIONS
+
+# Initial values for a new SQLite config_options table
+SQLITE_DEFAULTS = {"antenna_polarization": 0,
+                   "chamber_polarization": 0,
+                   "frequency_start": 1,  # GHz
+                   "frequency_stop": 18,  # GHz
+                   "num_steps": 201}
+
+# Connection pool, created once per process
+_pool = None
+
+
+# ==============================================================================
+# Get the shared MySQL connection pool
+#
+def connection_pool():
+    global _pool
+    if _pool is None:
+        import mysql.connector.pooling
+        from mysql.connector.constants import ClientFlag
+        # FOUND_ROWS makes rowcount count matched rows, so an UPDATE that
+        # writes an unchanged value is not reported as a failure
+        _pool = mysql.connector.pooling.MySQLConnectionPool(
+                pool_name=DB_POOL_NAME, pool_size=DB_POOL_SIZE,
+                autocommit=True, client_flags=[ClientFlag.FOUND_ROWS],
+                **connection_settings())
+    return _pool
+
+
+#
+# End connection pool
+# ==============================================================================
+
+
+# ==============================================================================
+# Config option store
+#
+# Reads and writes the config_options table. Values read are remembered so
+# unchanged options are not written back. Subclasses provide the connection,
+# the parameter placeholder, and how a transaction is started.
+#
+class ConfigStore(ABC):
+
+    placeholder = "%s"
+
+    # --------------------------------------------------------------------------
+    # Initialize store object
+    #
+    def __init__(self, log):
+        self.log = log
+        self.values = {}
+        self.db = None
+        self.cursor = None
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Check connection
+    #
+    def is_connected(self):
+        return self.db is not None
+
+    #
+    # End is_connected
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Start a transaction
+    #
+    @abstractmethod
+    def begin(self):
+        pass
+
+    #
+    # End begin
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Read options, returns {name: value} for the names found
+    #
+    def get_options(self, names):
+        names = list(names)
+        sql = ("SELECT name, value FROM config_options WHERE name IN ("
+               + ", ".join([self.placeholder] * len(names)) + ")")
+        self.log.debug("Executing query: " + sql + " " + str(names))
+        self.cursor.execute(sql, names)
+        values = {}
+        for name, value in self.cursor.fetchall():
+            if isinstance(name, (bytes, bytearray)):
+                name = name.decode()
+            values[name] = float(value)
+        self.values.update(values)
+        return values
+
+    #
+    # End get_options
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Write options in one transaction, returns False if a row was not found
+    #
+    def set_options(self, options):
+        # Values are stored with two decimal places
+        rows = [(round(float(val), 2), name)
+                for name, val in sorted(options.items())
+                if self.values.get(name) != round(float(val), 2)]
+        if not rows:
+            self.log.debug("Config options unchanged, nothing to write")
+            return True
+
+        sql = ("UPDATE config_options SET value = " + self.placeholder
+               + " WHERE name = " + self.placeholder)
+        self.log.debug("Executing query: " + sql + " " + str(rows))
+        self.begin()
+        try:
+            self.cursor.executemany(sql, rows)
+            matched = self.cursor.rowcount
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+
+        for val, name in rows:
+            self.values[name] = val
+        return matched >= len(rows)
+
+    #
+    # End set_options
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Close connection
+    #
+    def close(self):
+        if self.db is not None:
+            self.cursor.close()
+            self.db.close()
+            self.db = None
+
+    #
+    # End close
+    # --------------------------------------------------------------------------
+
+
+#
+# End ConfigStore
+# ==============================================================================
+
+
+# ==============================================================================
+# MySQL config store, the lab server's database
+#
+class MySQLConfigStore(ConfigStore):
+
+    # --------------------------------------------------------------------------
+    # Initialize store object
+    #
+    def __init__(self, log):
+        ConfigStore.__init__(self, log)
+        self.db = connection_pool().get_connection()
+        self.cursor = self.db.cursor(prepared=True)
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Check connection
+    #
+    def is_connected(self):
+        return (self.db is not None) and self.db.is_connected()
+
+    #
+    # End is_connected
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Start a transaction
+    #
+    def begin(self):
+        self.db.start_transaction()
+
+    #
+    # End begin
+    # --------------------------------------------------------------------------
+
+
+#
+# End MySQLConfigStore
+# ==============================================================================
+
+
+# ==============================================================================
+# SQLite config store, for running without the lab server
+#
+class SQLiteConfigStore(ConfigStore):
+
+    placeholder = "?"
+
+    # --------------------------------------------------------------------------
+    # Initialize store object
+    #
+    def __init__(self, log, filename=CONFIG_SQLITE_FILE):
+        import sqlite3
+        ConfigStore.__init__(self, log)
+        # Autocommit mode, transactions are started explicitly by begin()
+        self.db = sqlite3.connect(filename, timeout=10, isolation_level=None)
+        self.cursor = self.db.cursor()
+
+        # Create and fill the table on first use
+        self.cursor.execute("CREATE TABLE IF NOT EXISTS config_options "
+                            "(name TEXT PRIMARY KEY, value REAL NOT NULL)")
+        self.cursor.executemany("INSERT OR IGNORE INTO config_options "
+                                "(name, value) VALUES (?, ?)",
+                                sorted(SQLITE_DEFAULTS.items()))
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Start a transaction
+    #
+    def begin(self):
+        # Take the write lock up front so concurrent jobs serialize here
+        self.cursor.execute("BEGIN IMMEDIATE")
+
+    #
+    # End begin
+    # --------------------------------------------------------------------------
+
+
+#
+# End SQLiteConfigStore
+# ==============================================================================
+
+
+# ==============================================================================
+# Open the config store selected in serverInfo
+#
+def open_config_store(log, backend=CONFIG_BACKEND):
+    if backend == "mysql":
+        return MySQLConfigStore(log)
+    elif backend == "sqlite":
+        return SQLiteConfigStore(log)
+    else:
+        raise ValueError("Unknown config store backend: " + str(backend))
+
+
+#
+# End open config store
+# ==============================================================================
@@ -0,0 +1,180 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         dataset.py
+# Author(s):    Matthew Kesselring
+#               Mitchell Costa
+# Date:         October 2026
+################################################################################
+
+# Local files
+from functions import *
+# Standard libraries
+
+# Installed libraries
+import numpy as np
+
+
+# ==============================================================================
+# Measurement dataset class
+#
+# Holds complex S-parameter data over frequency (S11) or angle x frequency
+# (S21). Derived views are computed on first use and kept until the data is
+# replaced.
+#
+class Dataset(object):
+
+    # --------------------------------------------------------------------------
+    # Initialize dataset object
+    #
+    def __init__(self, freq, data, angles=None):
+        self.freq = np.asarray(freq, dtype=float)  # Hz, last axis of data
+        self.angles = None if angles is None else np.asarray(angles,
+                                                             dtype=float)
+        self._views = {}
+        self.data = data
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Load S21 (angle x frequency) CSV file
+    #
+    @classmethod
+    def from_s21_csv(cls, filename):
+        angles, freq, data = S21csv_to_matrix(filename)
+        return cls(freq, data, angles)
+
+    #
+    # End from_s21_csv
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Load S11 (frequency row, data row) CSV file
+    #
+    @classmethod
+    def from_s11_csv(cls, filename):
+        freq, data = S11csv_to_dataframe(filename).values
+        return cls([float(i) for i in freq], parse_complex(data))
+
+    #
+    # End from_s11_csv
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Complex data
+    #
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        data = np.array(data, dtype=complex)
+        # Read-only so in-place edits cannot bypass view invalidation
+        data.flags.writeable = False
+        self._data = data
+        self.invalidate()
+
+    #
+    # End data
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Discard all memoized views
+    #
+    def invalidate(self):
+        self._views.clear()
+
+    #
+    # End invalidate
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Return memoized view, computing it on first use
+    #
+    def _view(self, name, compute):
+        view = self._views.get(name)
+        if view is None:
+            with np.errstate(divide='ignore'):
+                view = compute()
+            view.flags.writeable = False
+            self._views[name] = view
+        return view
+
+    #
+    # End _view
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Linear magnitude
+    #
+    @property
+    def mag(self):
+        return self._view("mag", lambda: np.abs(self._data))
+
+    #
+    # End mag
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Magnitude in dB
+    #
+    @property
+    def mag_db(self):
+        return self._view("mag_db", lambda: 20 * np.log10(self.mag))
+
+    #
+    # End mag_db
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Wrapped phase (degrees)
+    #
+    @property
+    def phase(self):
+        return self._view("phase", lambda: np.angle(self._data, deg=True))
+
+    #
+    # End phase
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Phase unwrapped along frequency (degrees)
+    #
+    @property
+    def unwrapped_phase(self):
+        return self._view("unwrapped_phase", lambda: np.degrees(
+                np.unwrap(np.angle(self._data), axis=-1)))
+
+    #
+    # End unwrapped_phase
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Group delay (seconds), -d(phase)/d(omega)
+    #
+    @property
+    def group_delay(self):
+        return self._view("group_delay", lambda: -np.gradient(
+                np.radians(self.unwrapped_phase), 2 * np.pi * self.freq,
+                axis=-1))
+
+    #
+    # End group_delay
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Index of the frequency point nearest to the requested frequency
+    #
+    def freq_index(self, frequency):
+        return int(np.abs(self.freq - frequency).argmin())
+
+    #
+    # End freq_index
+    # --------------------------------------------------------------------------
+
+
+#
+# End Dataset
+# ==============================================================================
@@ -0,0 +1,224 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         dbConfig.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from serverInfo import *
+# Standard libraries
+import re
+import json
+
+# Installed libraries
+
+# PHP tokens: comments, strings, arrow, brackets, commas, bare words/numbers
+TOKEN_RE = re.compile(r"""
+      (?P<comment>//[^\n]*|\#[^\n]*|/\*.*?\*/)
+    | '(?P<sq>(?:[^'\\]|\\.)*)'
+    | "(?P<dq>(?:[^"\\]|\\.)*)"
+    | (?P<op>=>|[()\[\],;=])
+    | (?P<word>[^\s()\[\],;='"]+)
+    """, re.S | re.X)
+
+# Parsed settings for this process, keyed by (mtime, size) of the source file
+_loaded = {}
+
+
+# ==============================================================================
+# Split PHP source into tokens
+#
+def tokenize(source):
+    source = source.replace("<?php", "").replace("?>", "")
+    tokens = []
+    pos = 0
+    while pos < len(source):
+        if source[pos].isspace():
+            pos += 1
+            continue
+        m = TOKEN_RE.match(source, pos)
+        if not m:
+            raise ValueError("Unexpected character in DB config file: "
+                             + repr(source[pos:pos + 20]))
+        pos = m.end()
+        if m.group("comment") is not None:
+            continue
+        elif m.group("sq") is not None:
+            tokens.append(("str", re.sub(r"\\([\\'])", r"\1", m.group("sq"))))
+        elif m.group("dq") is not None:
+            tokens.append(("str", re.sub(r'\\([\\"$])', r"\1", m.group("dq"))))
+        elif m.group("op") is not None:
+            tokens.append(("op", m.group("op")))
+        else:
+            tokens.append(("word", m.group("word")))
+    return tokens
+
+
+#
+# End tokenize
+# ==============================================================================
+
+
+# ==============================================================================
+# Parse a PHP value starting at token i, returns (value, next index)
+#
+def parse_value(tokens, i):
+    kind, text = tokens[i]
+    if kind == "str":
+        return text, i + 1
+
+    # array( ... ) or [ ... ]
+    if (kind == "word") and (text.lower() == "array"):
+        i += 1
+        if tokens[i] != ("op", "("):
+            raise ValueError("Expected '(' after array in DB config file")
+        return parse_array(tokens, i + 1, ")")
+    if (kind, text) == ("op", "["):
+        return parse_array(tokens, i + 1, "]")
+
+    if kind == "word":
+        word = text.lower()
+        if word in ("true", "false"):
+            return word == "true", i + 1
+        if word == "null":
+            return None, i + 1
+        try:
+            return int(text), i + 1
+        except ValueError:
+            try:
+                return float(text), i + 1
+            except ValueError:
+                pass
+
+    raise ValueError("Unexpected token in DB config file: " + repr(text))
+
+
+#
+# End parse value
+# ==============================================================================
+
+
+# ==============================================================================
+# Parse array elements up to the closing bracket
+#
+def parse_array(tokens, i, close):
+    result = {}
+    index = 0  # Next key for elements without an explicit key
+    while tokens[i] != ("op", close):
+        value, i = parse_value(tokens, i)
+        if tokens[i] == ("op", "=>"):
+            key = value
+            value, i = parse_value(tokens, i + 1)
+        else:
+            key = index
+        result[key] = value
+        if isinstance(key, int):
+            index = max(index, key + 1)
+
+        if tokens[i] == ("op", ","):
+            i += 1
+        elif tokens[i] != ("op", close):
+            raise ValueError("Expected ',' or '" + close
+                             + "' in DB config file")
+
+    # Lists without keys stay lists
+    if list(result.keys()) == list(range(len(result))):
+        result = [result[k] for k in range(len(result))]
+    return result, i + 1
+
+
+#
+# End parse array
+# ==============================================================================
+
+
+# ==============================================================================
+# Parse PHP config source, returns {variable name: value}
+#
+def parse_php_config(source):
+    tokens = tokenize(source)
+    variables = {}
+    i = 0
+    while i < len(tokens):
+        kind, text = tokens[i]
+        if (kind == "word") and text.startswith("$") \
+                and (tokens[i + 1] == ("op", "=")):
+            value, i = parse_value(tokens, i + 2)
+            variables[text[1:]] = value
+        else:
+            i += 1
+    return variables
+
+
+#
+# End parse PHP config
+# ==============================================================================
+
+
+# ==============================================================================
+# Load DB config, using the sidecar cache while the source is unchanged
+#
+def load_db_config(filename=DB_CONFIG_FILE, cache_file=DB_CONFIG_CACHE):
+    st = os.stat(filename)
+    stamp = [st.st_mtime, st.st_size]
+    if tuple(stamp) in _loaded:
+        return _loaded[tuple(stamp)]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # Read sidecar
+    #
+    variables = None
+    try:
+        with open(cache_file) as f:
+            cached = json.load(f)
+        if (cached["source"] == os.path.abspath(filename)) \
+                and (cached["stamp"] == stamp):
+            variables = cached["variables"]
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        pass
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # Parse source and rewrite sidecar
+    #
+    if variables is None:
+        with open(filename) as f:
+            variables = parse_php_config(f.read())
+        try:
+            # Sidecar holds credentials, only the owner may read it
+            tmp = cache_file + ".tmp" + str(os.getpid())
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump({"source": os.path.abspath(filename),
+                           "stamp": stamp, "variables": variables}, f)
+            os.replace(tmp, cache_file)
+        except (IOError, OSError):
+            pass  # Cache is optional, parse again next time
+
+    _loaded.clear()
+    _loaded[tuple(stamp)] = variables
+    return variables
+
+
+#
+# End load DB config
+# ==============================================================================
+
+
+# ==============================================================================
+# Connection settings for the named database
+#
+def connection_settings(name=DB):
+    info = load_db_config()["connectionSettings"][name]
+    settings = {"host": info["host"],
+                "user": info["user"],
+                "password": info["password"],
+                "database": info["db"]}
+    if "port" in info:
+        settings["port"] = int(info["port"])
+    return settings
+
+
+#
+# End connection settings
+# ==============================================================================
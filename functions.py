@@ -9,16 +9,19 @@
 # Local files
 import motors
 from serverInfo import *
+from transport import InstrumentedResource, vxm_mnemonic
+from motorProtocol import ControllerProtocol
+from resourceRegistry import open_instrument
 # Standard libraries
 import re
 from math import floor
 from zipfile import ZipFile
+from collections import namedtuple
 import json
 # Installed libraries
-import mysql.connector
-import visa
-import pandas as pd
 import numpy as np
+# visa and pandas are imported where they are used so scripts
+# that do not need them (e.g. alignMotors.py) start without loading them
 
 
 # ==============================================================================
@@ -26,7 +29,7 @@ import numpy as np
 #
 def create_zip(archive_name, file_list):
     # Write file name to FileName.txt
-    filename_txt = open(TMP_PATH + "\FileName.txt", "w")
+    filename_txt = open(os.path.join(TMP_PATH, "FileName.txt"), "w")
     filename_txt.write(os.path.basename(archive_name))
     filename_txt.close()
     # Create zip
@@ -38,6 +41,21 @@ def create_zip(archive_name, file_list):
 # ==============================================================================
 
 
+# ==============================================================================
+# Write dataset metadata, "<file name>_meta.json", returns the file name
+#
+def write_metadata(file_name, metadata):
+    filename = file_name + "_meta.json"
+    with open(filename, "w") as f:
+        json.dump(metadata, f, indent=1, sort_keys=True)
+    return filename
+
+
+#
+# End write metadata
+# ==============================================================================
+
+
 # ==============================================================================
 # Validate parameters
 #
@@ -102,6 +120,43 @@ def validate_parameters(log, f1, f2, nums, rstart, angle, rstop,
 # ==============================================================================
 
 
+# ==============================================================================
+# Frequency segments
+#
+# One row of the analyzer's segment table. Frequencies in Hz, IF bandwidth in
+# Hz and power in dBm, None uses the channel setting.
+#
+Segment = namedtuple("Segment", "start stop points ifbw power")
+Segment.__new__.__defaults__ = (None, None)
+
+
+# Parse "f1:f2:n[:ifbw[:power]];..." (GHz, as the f1 and f2 arguments)
+def parse_segments(text):
+    segments = []
+    for item in text.replace(" ", "").strip(";").split(";"):
+        fields = item.split(":")
+        if not 3 <= len(fields) <= 5:
+            raise ValueError("Invalid segment " + repr(item)
+                             + ", expected f1:f2:n[:ifbw[:power]]")
+        segment = Segment(float(fields[0]) * 1e9, float(fields[1]) * 1e9,
+                          int(fields[2]),
+                          float(fields[3]) if len(fields) > 3 else None,
+                          float(fields[4]) if len(fields) > 4 else None)
+        if segment.points < 1 or segment.stop < segment.start:
+            raise ValueError("Invalid segment " + repr(item))
+        # Repeated frequencies would give duplicate CSV columns
+        if segments and segment.start <= segments[-1].stop:
+            raise ValueError("Segments must be in increasing frequency and "
+                             "not overlap: " + repr(item))
+        segments.append(segment)
+    return segments
+
+
+#
+# End frequency segments
+# ==============================================================================
+
+
 # ==============================================================================
 # Initialize motors
 #
@@ -136,6 +191,8 @@ def motors_init(mc):
     for m in motorSet:
         m.set_acceleration(MOTOR_ACCELERATION)
     motorSet[STAND_ROTATION].set_speed(STAND_SPEED)
+    motorSet[STAND_ROTATION].wrapRange = (STAND_WRAP_MIN, STAND_WRAP_MAX)
+    motorSet[STAND_ROTATION].tolerance = STAND_ANGLE_TOLERANCE
     motorSet[S_TRANSLATION].set_speed(TRANSLATION_SPEED)
     for m in (motorSet[T_POLARIZATION], motorSet[C_POLARIZATION]):
         m.set_speed(POLARIZATION_SPEED)
@@ -154,10 +211,15 @@ def motors_init(mc):
 # ==============================================================================
 # Set polarization
 #
-def set_polarization(log, motorSet, tpolar, cpolar, mycursor):
+def set_polarization(log, motorSet, tpolar, cpolar, db):
     try:
-        tpolar_old = get_config_option(log, mycursor, "'antenna_polarization'")
-        cpolar_old = get_config_option(log, mycursor, "'chamber_polarization'")
+        # Polarizations and frequency plan are read together, the frequency
+        # plan is kept so unchanged values are not written back after the test
+        options = db.get_options(("antenna_polarization",
+                                  "chamber_polarization", "frequency_start",
+                                  "frequency_stop", "num_steps"))
+        tpolar_old = options["antenna_polarization"]
+        cpolar_old = options["chamber_polarization"]
 
         motorSet[T_POLARIZATION].rot_deg(tpolar - tpolar_old)
         motorSet[C_POLARIZATION].rot_deg(cpolar - cpolar_old)
@@ -173,6 +235,22 @@ def set_polarization(log, motorSet, tpolar, cpolar, mycursor):
 # ==============================================================================
 
 
+# ==============================================================================
+# Angle in (-180, 180] degrees, for positions of a continuously rotating motor
+#
+def normalize_angle(degrees):
+    angle = degrees % 360.0
+    if angle > 180:
+        angle -= 360
+    # Step positions are not exact in binary, 5.000000000000057 is 5.0
+    return round(angle, 9)
+
+
+#
+# End normalize angle
+# ==============================================================================
+
+
 # ==============================================================================
 # Convert scientific notation to float
 #
@@ -270,14 +348,23 @@ def format_string(data):
 # Initialize motor controller
 #
 def motor_control_init(log):
+    import visa
     rm = visa.ResourceManager()  # Create resource manager object
 
     log.info("Attempting connection to motor controller")
-    controller = rm.open_resource("Com3")
+    # Cached address (default MOTOR_CONTROLLER_ADDRESS), serial ports are
+    # enumerated if it fails
+    resource, fingerprint = open_instrument(log, rm, "motor controller")
+    if resource is None:
+        return None
+    controller = InstrumentedResource(resource, "motor controller",
+                                      vxm_mnemonic)
     controller.write_termination = '\r'
     controller.read_termination = '\r'
     controller.timeout = 30000  # 30 second timeout
-    return controller  # If loop finds valid object, return object
+    # Replies and '^' completions are framed by the protocol, not by the
+    # read termination
+    return ControllerProtocol(controller)
 
 
 #
@@ -286,85 +373,80 @@ def motor_control_init(log):
 
 
 # ==============================================================================
-# Initialize database
+# Convert S11 CSV to Dataframe
 #
-def db_init():
-    config = open(DB_CONFIG_FILE)
-    data = config.read()
-    config.close()
-    data = data.replace("<?php", "").replace("?>", "").replace("$", "").replace(
-            " ", "").replace("=>", ":").replace("=array(", "{").replace(
-            "array(", "{").replace(")", "}").replace("'", '"').replace(
-            "connectionSettings", "").replace("};", "}")
-    db_info = json.loads(data)
-
-    db = mysql.connector.connect(host=db_info[DB]["host"],
-                                 user=db_info[DB]["user"],
-                                 password=db_info[DB]["password"],
-                                 database=db_info[DB]["db"])
-    mycursor = db.cursor()
-    return db, mycursor
+def S11csv_to_dataframe(filename):
+    import pandas as pd
+    df1 = pd.read_csv(filename, sep=',', header=None)
+    return df1
 
 
 #
-# End initialize database
+# End Convert S11 CSV to Dataframe
 # ==============================================================================
 
 
 # ==============================================================================
-# Update sql database
+# Convert S21 CSV to Dataframe
 #
-def update_config_db(log, mycursor, val, name):
-    sql = "UPDATE config_options SET value = {0:.2f} WHERE name = {1}"
-    log.debug("Executing query: " + sql.format(val, name))
-    mycursor.execute(sql.format(val, name))
-
-
+def S21orCFcsv_to_dataframe(filename):
+    import pandas as pd
+    df1 = pd.read_csv(filename, sep=',',index_col = False)
+    return df1
 #
-# End update sql database
+# End Convert S11 CSV to Dataframe
 # ==============================================================================
 
 
 # ==============================================================================
-# Get config option
+# Convert array of "a+bi" strings to complex numbers
 #
-def get_config_option(log, mycursor, name):
-    sql = "SELECT value FROM config_options WHERE name = {1}"
-    log.debug("Executing query: " + sql.format(name))
-    for val in mycursor.execute(sql.format(name)):
-        return float(val[0])
+def parse_complex(values):
+    values = np.asarray(values, dtype=str)
+    # Strip spaces and any parentheses left by str(complex)
+    values = np.char.strip(np.char.replace(values, ' ', ''), '()')
+    # Python's complex type uses 'j' for the imaginary unit
+    return np.char.replace(values, 'i', 'j').astype(complex)
+
+
 #
-# End get config option
+# End convert complex strings
 # ==============================================================================
 
 
 # ==============================================================================
-# Convert S11 CSV to Dataframe
+# Convert S21 CSV to angle, frequency, and complex data arrays
 #
-def S11csv_to_dataframe(filename):
-    df1 = pd.read_csv(filename, sep=',', header=None)
-    S11_data = df1.as_matrix()
-    count_row = df1.shape[0]
+def S21csv_to_matrix(filename):
+    df1 = S21orCFcsv_to_dataframe(filename)
+    angles = df1.iloc[:, 0].values.astype(float)
+    freq = np.asarray([float(i) for i in list(df1)[1:]])
+    data = parse_complex(df1.iloc[:, 1:].values)
 
-    return df1
+    # Sort rows by angle, keeping duplicate +/-180 rows in file order
+    order = np.argsort(angles, kind='mergesort')
+    return angles[order], freq, data[order]
 
 
 #
-# End Convert S11 CSV to Dataframe
+# End convert S21 CSV to matrix
 # ==============================================================================
 
 
 # ==============================================================================
-# Convert S21 CSV to Dataframe
+# Write angle x frequency matrix to CSV in the S21 file layout
 #
-def S21orCFcsv_to_dataframe(filename):
-    df1 = pd.read_csv(filename, sep=',',index_col = False)
-    S21_data = df1.as_matrix()
-    count_row = df1.shape[0]
+def matrix_to_csv(filename, angles, freq, values):
+    import pandas as pd
+    df1 = pd.DataFrame(np.asarray(values),
+                       columns=[int(round(i)) for i in freq])
+    df1.insert(0, 'Angle', angles)
+    df1.to_csv(filename, sep=',', encoding='utf-8', index=False)
+    return filename
+
 
-    return df1
 #
-# End Convert S11 CSV to Dataframe
+# End write matrix to CSV
 # ==============================================================================
 
 
@@ -0,0 +1,198 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         jobRecords.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from serverInfo import *
+from tracing import tracer
+# Standard libraries
+import sys
+import time
+import json
+from datetime import datetime
+
+# Installed libraries
+
+_active = None  # Record of the job running in this process
+
+
+# ==============================================================================
+# Job records file for a date, one per month like the log files
+#
+def job_records_file(date=None):
+    date = date or datetime.today()
+    return os.path.join(JOB_RECORDS_PATH,
+                        "jobs_" + date.strftime("%m_%Y") + ".jsonl")
+
+
+#
+# End job records file
+# ==============================================================================
+
+
+# ==============================================================================
+# Structured record of one entry point run
+#
+# Written as one JSON line when the job finishes:
+#   {"job", "params", "start", "end", "duration_s", "phases", "angle_steps",
+#    "outcome", "error"}
+# The test routines add their angle steps and the time of their phases by
+# tracer category (motor, settle, analyzer, file, process) themselves, so the
+# record does not need the tracer to be enabled.
+#
+class JobRecord(object):
+
+    # --------------------------------------------------------------------------
+    # Initialize record object, marks the job start
+    #
+    def __init__(self, job, **params):
+        self.job = job
+        self.params = params
+        self.start = datetime.today()
+        self.t0 = time.time()
+        self.error = None
+        self.steps = 0
+        self.phases = {}  # Seconds per tracer category
+        # Traces only cover this job
+        tracer.reset()
+        global _active
+        _active = self
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Count angle steps and phase time
+    #
+    def add_steps(self, count=1):
+        self.steps += count
+
+    def add_time(self, category, seconds):
+        self.phases[category] = self.phases.get(category, 0.0) + seconds
+
+    #
+    # End count steps and time
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Mark job as failed, call from an except block
+    #
+    def fail(self, error=None):
+        if error is None:
+            exc = sys.exc_info()[1]
+            error = (type(exc).__name__ + ": " + str(exc)) if exc else "error"
+        self.error = error
+
+    #
+    # End fail
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Record as a dict
+    #
+    def as_dict(self, rv=0):
+        ok = (rv == 0) and (self.error is None)
+        return {"job": self.job,
+                "params": self.params,
+                "start": self.start.isoformat(" ", "seconds"),
+                "end": datetime.today().isoformat(" ", "seconds"),
+                "duration_s": round(time.time() - self.t0, 3),
+                "phases": dict((k, round(v, 3)) for k, v in
+                               self.phases.items()),
+                "angle_steps": self.steps,
+                "outcome": "ok" if ok else "error",
+                "error": None if ok else (self.error or "returned " + str(rv))}
+
+    #
+    # End as_dict
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Append record to this month's job records file
+    #
+    def finish(self, log, rv=0):
+        try:
+            if not os.path.isdir(JOB_RECORDS_PATH):
+                os.makedirs(JOB_RECORDS_PATH)
+            line = json.dumps(self.as_dict(rv), sort_keys=True) + "\n"
+            # Single append so concurrent jobs do not interleave lines
+            with open(job_records_file(self.start), "a") as f:
+                f.write(line)
+        except (IOError, OSError, TypeError, ValueError):
+            log.exception("Failed to write job record")
+
+    #
+    # End finish
+    # --------------------------------------------------------------------------
+
+
+#
+# End JobRecord
+# ==============================================================================
+
+
+# ==============================================================================
+# Count angle steps of the running job, if any
+#
+def add_job_steps(count=1):
+    if _active is not None:
+        _active.add_steps(count)
+
+
+#
+# End add job steps
+# ==============================================================================
+
+
+# ==============================================================================
+# Time a phase of the running job, if any
+#
+#   with JobPhase(MOTOR):
+#       motor.rot_deg(angle)
+#
+class JobPhase(object):
+
+    def __init__(self, category):
+        self.category = category
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, *exc):
+        if _active is not None:
+            _active.add_time(self.category, time.time() - self.start)
+        return False
+
+
+#
+# End JobPhase
+# ==============================================================================
+
+
+# ==============================================================================
+# Read job records, skipping damaged lines
+#
+def read_job_records(filenames):
+    records = []
+    for filename in filenames:
+        try:
+            with open(filename) as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except (IOError, OSError):
+            continue
+    return records
+
+
+#
+# End read job records
+# ==============================================================================
@@ -0,0 +1,136 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         logSetup.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from serverInfo import *
+# Standard libraries
+import queue
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime
+
+# Installed libraries
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Argument types that cannot change between the log call and the listener
+# formatting the record
+IMMUTABLE_ARGS = (str, bytes, int, float, bool, type(None))
+
+# Listener thread writing records for this process, None until set up
+_listener = None
+
+
+# ==============================================================================
+# Log file for a date, "log_[MONTH]_[YEAR].log"
+#
+def log_file_name(date=None):
+    date = date or datetime.today()
+    return 'log_' + date.strftime('%m_%Y') + '.log'
+
+
+#
+# End log file name
+# ==============================================================================
+
+
+# ==============================================================================
+# File handler with the standard format
+#
+def file_handler(filename=None):
+    handler = logging.FileHandler(filename or log_file_name())
+    handler.setLevel(LOG_LEVEL)
+    handler.setFormatter(logging.Formatter(fmt=LOG_FORMAT,
+                                           datefmt=LOG_DATE_FORMAT))
+    return handler
+
+
+#
+# End file handler
+# ==============================================================================
+
+
+# ==============================================================================
+# Queue handler that leaves message formatting to the listener thread
+#
+# The stock QueueHandler formats every record on the calling thread. Records
+# only cross threads here (no pickling), so they are passed on as they are.
+# Arguments that could still change (lists, numpy arrays, ...) are rendered
+# now so the message shows the values at the time of the call.
+#
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+
+    def prepare(self, record):
+        args = record.args
+        if isinstance(args, dict):
+            args = args.values()
+        if args and not all(isinstance(a, IMMUTABLE_ARGS) for a in args):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+#
+# End DeferredQueueHandler
+# ==============================================================================
+
+
+# ==============================================================================
+# Set up process wide logging, returns the named logger
+#
+# Every logger propagates to one queue handler on the root logger. A listener
+# thread writes the records to the monthly log file and the console, so disk
+# writes never hold up instrument I/O. Safe to call more than once, handlers
+# are only attached the first time.
+#
+def get_logger(name):
+    global _listener
+    if _listener is None:
+        q = queue.Queue(-1)
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter(fmt=LOG_FORMAT,
+                                               datefmt=LOG_DATE_FORMAT))
+        _listener = logging.handlers.QueueListener(
+                q, file_handler(), console, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+
+        root = logging.getLogger()
+        root.addHandler(DeferredQueueHandler(q))
+        # Third party modules only log warnings and errors
+        root.setLevel(IMPORT_LOG_LEVEL)
+        logging.getLogger('pyvisa').setLevel(IMPORT_LOG_LEVEL)
+        logging.getLogger('mysql.connector').setLevel(IMPORT_LOG_LEVEL)
+
+    log = logging.getLogger(name)
+    log.setLevel(LOG_LEVEL)
+    return log
+
+
+#
+# End get logger
+# ==============================================================================
+
+
+# ==============================================================================
+# Write out queued records and stop the listener thread
+#
+def stop_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        for handler in logging.getLogger().handlers[:]:
+            if isinstance(handler, DeferredQueueHandler):
+                logging.getLogger().removeHandler(handler)
+
+
+#
+# End stop logging
+# ==============================================================================
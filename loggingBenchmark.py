@@ -0,0 +1,149 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         loggingBenchmark.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from serverInfo import *
+from logSetup import file_handler, DeferredQueueHandler
+# Standard libraries
+import sys
+import time
+import queue
+import shutil
+import logging
+import logging.handlers
+import tempfile
+from statistics import median
+
+# Installed libraries
+
+# Log calls made per angle step of a pattern measurement: motor commands for
+# get_position() and rot_deg() at DEBUG, one message that reaches the file
+COMMANDS_PER_STEP = ("X", "C", "I1M-40,R", "C")
+INFO_PER_STEP = 1
+
+
+# ==============================================================================
+# Logger as set up before logSetup.py, file handler on the calling thread
+#
+def legacy_logger(filename):
+    log = logging.getLogger("benchmark.legacy")
+    log.propagate = False
+    log.addHandler(file_handler(filename))
+    log.setLevel(LOG_LEVEL)
+    return log, None
+
+
+def legacy_step(log, k, port=1):
+    for command in COMMANDS_PER_STEP:
+        log.debug("Sending " + command + " to motor " + str(port))
+    log.debug("Step %d. Current angle %.2f. Rotate %.2f degrees" % (
+        k, k * 5.0, 5.0))
+    for i in range(INFO_PER_STEP):
+        log.info("Step " + str(k) + " complete")
+
+
+#
+# End legacy logger
+# ==============================================================================
+
+
+# ==============================================================================
+# Logger as set up by logSetup.py, file handler on a listener thread
+#
+def queued_logger(filename):
+    q = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(q, file_handler(filename),
+                                              respect_handler_level=True)
+    listener.start()
+    log = logging.getLogger("benchmark.queued")
+    log.propagate = False
+    log.addHandler(DeferredQueueHandler(q))
+    log.setLevel(LOG_LEVEL)
+    return log, listener
+
+
+def queued_step(log, k, port=1):
+    for command in COMMANDS_PER_STEP:
+        log.debug("Sending %s to motor %d", command, port)
+    log.debug("Step %d. Current angle %.2f. Rotate %.2f degrees",
+              k, k * 5.0, 5.0)
+    for i in range(INFO_PER_STEP):
+        log.info("Step %d complete", k)
+
+
+#
+# End queued logger
+# ==============================================================================
+
+
+# ==============================================================================
+# Time the logging done on the acquisition thread per step (seconds)
+#
+def time_steps(setup, step, steps, path):
+    log, listener = setup(os.path.join(path, setup.__name__ + ".log"))
+    times = []
+    try:
+        for k in range(steps):
+            t0 = time.perf_counter()
+            step(log, k)
+            times.append(time.perf_counter() - t0)
+    finally:
+        # Time left for the listener to catch up after the last step
+        t0 = time.perf_counter()
+        if listener is not None:
+            listener.stop()
+        drain = time.perf_counter() - t0
+        for handler in log.handlers[:]:
+            log.removeHandler(handler)
+            handler.close()
+    times.sort()
+    return median(times), times[int(0.99 * (len(times) - 1))], drain
+
+
+#
+# End time steps
+# ==============================================================================
+
+
+# ==============================================================================
+# Main function
+#
+def loggingBenchmark(args):
+    steps = int(args[0]) if len(args) > 0 else 2000
+    path = tempfile.mkdtemp(prefix="logbench")
+    try:
+        print("%d steps, %d debug + %d info calls per step, level %s" % (
+            steps, len(COMMANDS_PER_STEP) + 1, INFO_PER_STEP,
+            logging.getLevelName(LOG_LEVEL)))
+        print("%-8s %12s %12s %10s" % ("logging", "median us", "p99 us",
+                                       "drain ms"))
+        for name, setup, step in (("legacy", legacy_logger, legacy_step),
+                                  ("queued", queued_logger, queued_step)):
+            med, p99, drain = time_steps(setup, step, steps, path)
+            print("%-8s %12.2f %12.2f %10.2f" % (name, med * 1e6, p99 * 1e6,
+                                                 drain * 1e3))
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+    return 0
+
+
+#
+# End main function
+# ==============================================================================
+
+
+# ==============================================================================
+# Enter from command line
+#
+if __name__ == "__main__":
+    argv = sys.argv  # Store command line arguments
+    argv.pop(0)  # Remove file name
+    # Call main function and pass return status to system
+    sys.exit(loggingBenchmark(argv))
+#
+# End enter from command line
+# ==============================================================================
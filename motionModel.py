@@ -0,0 +1,38 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         motionModel.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from serverInfo import *
+# Standard libraries
+import math
+
+# Installed libraries
+
+
+# ==============================================================================
+# Time to move a number of steps (seconds)
+#
+# Trapezoidal velocity profile: the controller ramps up to speed at a constant
+# acceleration, runs at speed and ramps down again. Moves shorter than the two
+# ramps (speed^2 / acceleration steps) never reach speed and are triangular.
+# The acceleration is the controller setting (1-127), ACCELERATION_SCALE
+# converts it to steps/second^2.
+#
+def move_time(steps, speed, acceleration=MOTOR_ACCELERATION):
+    steps = abs(steps)
+    if steps == 0:
+        return 0.0
+    a = float(acceleration) * ACCELERATION_SCALE
+    speed = float(speed)
+    if steps * a < speed ** 2:
+        return 2 * math.sqrt(steps / a)
+    return steps / speed + speed / a
+
+
+#
+# End move time
+# ==============================================================================
@@ -0,0 +1,342 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         motorProtocol.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from serverInfo import *
+from logSetup import get_logger
+# Standard libraries
+import time
+import threading
+from collections import deque
+
+# Installed libraries
+
+COMPLETION = "^"  # Sent by the controller when a program has run
+REPLY_END = "\r"  # Ends position and status replies
+READER_RETRY = 0.1  # seconds, reader thread wait after a failed read
+
+
+# ==============================================================================
+# Pending command
+#
+# A command waiting for its completion marker or its reply. wait() returns
+# the reply ("^" for a completion). The callback is called with the reply when
+# it arrives, from the reader thread if there is one. A single character reply
+# (status) ends with that character instead of a carriage return.
+#
+class Pending(object):
+
+    # --------------------------------------------------------------------------
+    # Initialize pending object
+    #
+    def __init__(self, protocol, command, callback=None, single=False):
+        self.protocol = protocol
+        self.command = command
+        self.callback = callback
+        self.single = single
+        self.reply = None
+        self.done = False
+        self.cancelled = False
+        self.event = threading.Event()
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Reply received
+    #
+    def resolve(self, reply):
+        self.reply = reply
+        self.done = True
+        self.event.set()
+        if self.callback:
+            self.callback(reply)
+
+    #
+    # End resolve
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # No reply will come, e.g. the program was killed
+    #
+    def cancel(self):
+        self.cancelled = True
+        self.done = True
+        self.event.set()
+
+    #
+    # End cancel
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Wait for the reply
+    #
+    def wait(self):
+        self.protocol.wait_for(self)
+        if self.cancelled:
+            raise IOError("Motor controller: " + self.command + " cancelled")
+        return self.reply
+
+    #
+    # End wait
+    # --------------------------------------------------------------------------
+
+
+#
+# End Pending
+# ==============================================================================
+
+
+# ==============================================================================
+# Motor controller protocol
+#
+# Wraps the controller resource and reads its byte stream itself instead of
+# through the read termination. '^' completion markers are split out wherever
+# they fall, everything else up to a carriage return is a position or status
+# reply, except "V" status which is one character (R, B, J or b) without a
+# carriage return. Completions and replies each go to the oldest command
+# waiting for one, so a program can run while positions are queried. Without
+# a reader thread the stream is read while a command waits. A '^' that nothing
+# waits for, e.g. after "K" or a timed out command, is dropped: a command that
+# times out stops waiting, and whatever has arrived is read before a command
+# is sent so the next command does not take it. Other attributes (timeout,
+# close, ...) are passed through to the resource.
+#
+class ControllerProtocol(object):
+
+    # Attributes kept on the wrapper, everything else goes to the resource
+    _own = ("resource", "text", "completions", "replies", "unsolicited",
+            "lock", "closed", "reader", "log")
+
+    # --------------------------------------------------------------------------
+    # Initialize protocol object
+    #
+    def __init__(self, resource, thread=MOTOR_READER_THREAD):
+        object.__setattr__(self, "resource", resource)
+        object.__setattr__(self, "text", "")  # Reply received so far
+        object.__setattr__(self, "completions", deque())  # Waiting for '^'
+        object.__setattr__(self, "replies", deque())  # Waiting for a reply
+        object.__setattr__(self, "unsolicited", 0)  # Nothing was waiting
+        object.__setattr__(self, "lock", threading.Lock())
+        object.__setattr__(self, "closed", False)
+        object.__setattr__(self, "reader", None)
+        object.__setattr__(self, "log", get_logger(__name__))
+        if thread:
+            self.reader = threading.Thread(target=self.read_loop,
+                                           name="Motor controller reader")
+            self.reader.daemon = True
+            self.reader.start()
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Attribute passthrough
+    #
+    def __getattr__(self, name):
+        return getattr(self.resource, name)
+
+    def __setattr__(self, name, value):
+        if name in self._own:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.resource, name, value)
+
+    def __bool__(self):
+        return bool(self.resource)
+
+    __nonzero__ = __bool__
+
+    def __str__(self):
+        return str(self.resource)
+
+    #
+    # End attribute passthrough
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Commands. write() expects nothing back, run() a '^' and request() a
+    # reply, both return the Pending. query() waits for the reply and
+    # query_status() for a single character reply.
+    #
+    def write(self, command):
+        return self.resource.write(command)
+
+    def send(self, command, queue, callback=None, single=False):
+        if self.reader is None:
+            self.drain()
+        pending = Pending(self, command, callback, single)
+        # Queued first, the reader thread may see the reply before write()
+        # returns
+        with self.lock:
+            queue.append(pending)
+        self.resource.write(command)
+        return pending
+
+    def run(self, command, callback=None):
+        return self.send(command, self.completions, callback)
+
+    def request(self, command, callback=None):
+        return self.send(command, self.replies, callback)
+
+    def query(self, command):
+        return self.request(command).wait()
+
+    def query_status(self, command):
+        return self.send(command, self.replies, single=True).wait()
+
+    #
+    # End commands
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Cancel the commands waiting for '^', after "K" kills a program
+    #
+    def cancel(self):
+        with self.lock:
+            pending = list(self.completions)
+            self.completions.clear()
+        for p in pending:
+            p.cancel()
+
+    #
+    # End cancel
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Stop waiting for a command, e.g. after a timeout
+    #
+    def discard(self, pending):
+        with self.lock:
+            for queue in (self.completions, self.replies):
+                if pending in queue:
+                    queue.remove(pending)
+        pending.cancel()
+
+    #
+    # End discard
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Split received text into frames
+    #
+    def feed(self, data):
+        for char in data:
+            if char == COMPLETION:
+                self.dispatch(self.completions, char)
+            elif char == REPLY_END:
+                text = self.text.strip()
+                self.text = ""
+                if text:
+                    self.dispatch(self.replies, text)
+            elif not self.text and self.status_pending():
+                self.dispatch(self.replies, char)
+            else:
+                self.text += char
+
+    def status_pending(self):
+        with self.lock:
+            return bool(self.replies) and self.replies[0].single
+
+    def dispatch(self, queue, reply):
+        with self.lock:
+            pending = queue.popleft() if queue else None
+        if pending is None:
+            self.unsolicited += 1
+            self.log.debug("Motor controller sent %r, nothing waiting", reply)
+        else:
+            pending.resolve(reply)
+
+    #
+    # End split frames
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Read what has arrived, at least one byte
+    #
+    def read_chunk(self):
+        count = max(1, self.resource.bytes_in_buffer)
+        self.feed(self.resource.read_bytes(count).decode("ascii", "replace"))
+
+    #
+    # End read_chunk
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Read what has arrived without waiting, without a reader thread
+    #
+    def drain(self):
+        count = self.resource.bytes_in_buffer
+        if count:
+            self.feed(self.resource.read_bytes(count).decode("ascii",
+                                                             "replace"))
+
+    #
+    # End drain
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Wait for a pending command, the resource timeout applies to each read
+    # or to the whole wait with a reader thread
+    #
+    def wait_for(self, pending):
+        if self.reader is None:
+            try:
+                while not pending.done:
+                    self.read_chunk()
+            except BaseException:
+                self.discard(pending)
+                raise
+            return
+        timeout = self.resource.timeout
+        if timeout is not None:
+            timeout = timeout / 1000.0
+        if not pending.event.wait(timeout):
+            self.discard(pending)
+            raise IOError("Motor controller: no reply to " + pending.command)
+
+    #
+    # End wait_for
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Reader thread
+    #
+    def read_loop(self):
+        while not self.closed:
+            try:
+                self.read_chunk()
+            except Exception:
+                # Read timed out with nothing sent, or the port was closed.
+                # A command waiting gives up on its own timeout.
+                if not self.closed:
+                    time.sleep(READER_RETRY)
+
+    #
+    # End reader thread
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Stop the reader and close the resource
+    #
+    def close(self):
+        self.closed = True
+        self.resource.close()
+        if self.reader is not None:
+            self.reader.join(self.resource.timeout / 1000.0
+                             if self.resource.timeout else None)
+
+    #
+    # End close
+    # --------------------------------------------------------------------------
+
+
+#
+# End ControllerProtocol
+# ==============================================================================
@@ -7,10 +7,11 @@
 
 # Local files
 from serverInfo import *
+from tracing import traced, MOTOR
+from logSetup import get_logger
+import motionModel
 # Standard libraries
 import numpy
-import logging
-from datetime import datetime
 
 
 # Installed libraries
@@ -32,22 +33,15 @@ class Motor(object):
         self.model = model
         self.increment = increment  # degrees per step
         self.advance = advance  # degrees per turn
+        # Last speed and acceleration sent, controller defaults until set
+        self.speed = 2000  # steps/second
+        self.acceleration = 1
+        # Continuous rotation: (min, max) degrees from the zero index the
+        # motor may turn (cable wrap), None if angles are absolute
+        self.wrapRange = None
+        self.tolerance = 0  # degrees, goto_angle() does not move closer
         # Set up error log
-        logging.basicConfig(level=logging.DEBUG)
-        self.log = logging.getLogger(__name__)
-        if not self.log.handlers:
-            handler = logging.FileHandler(
-                    'log_' + datetime.today().strftime('%m_%Y') + '.log')
-            handler.setLevel(LOG_LEVEL)
-            formatter = logging.Formatter(
-                    fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                    datefmt='%Y-%m-%d %H:%M:%S')
-            handler.setFormatter(formatter)
-            self.log.addHandler(handler)
-            self.log.setLevel(LOG_LEVEL)
-            self.requestsLog = logging.getLogger('pyvisa')
-            self.requestsLog.setLevel(IMPORT_LOG_LEVEL)
-            self.requestsLog.addHandler(handler)
+        self.log = get_logger(__name__)
 
     #
     # End init
@@ -56,18 +50,12 @@ class Motor(object):
     # --------------------------------------------------------------------------
     # Send a command that requires the receipt of a "^" before proceeding
     #
+    @traced(MOTOR, command=True)
     def send_complex_command(self, command):
-        self.log.debug("Sending " + command + " to motor " + str(self.portNum))
+        self.log.debug("Sending %s to motor %d", command, self.portNum)
 
-        # Change read termination character to '^'
-        self.mc.read_termination = '^'
-        # Send command and wait for "^" character
-        self.mc.query(command)
-        # Change read termination character back to carriage return
-        self.mc.read_termination = '\r'
-
-        # Clear program
-        self.mc.write("C")
+        # Clear the program, send command and wait for "^" character
+        self.mc.run("C," + command).wait()
 
     #
     # End send_complex_command
@@ -76,8 +64,9 @@ class Motor(object):
     # --------------------------------------------------------------------------
     # Send a simple operation command (run immediately when received)
     #
+    @traced(MOTOR, command=True)
     def send_simple_command(self, command):
-        self.log.debug("Sending " + command + " to motor " + str(self.portNum))
+        self.log.debug("Sending %s to motor %d", command, self.portNum)
         self.mc.write(command)
 
     #
@@ -88,8 +77,9 @@ class Motor(object):
     # Send a command to get the location of one or more motors
     # Receives motor index from the controller
     #
+    @traced(MOTOR, command=True)
     def send_location_command(self, command):
-        self.log.debug("Sending " + command + " to motor " + str(self.portNum))
+        self.log.debug("Sending %s to motor %d", command, self.portNum)
 
         # Read location and convert index to angle
         location = float(self.mc.query(command)) * (-self.increment)
@@ -103,10 +93,11 @@ class Motor(object):
     # --------------------------------------------------------------------------
     # Verify controller status
     #
+    @traced(MOTOR)
     def verify_status(self):
         self.log.debug("V")
-        # Read status
-        status = self.mc.query("V")
+        # Read status, a single character without a carriage return
+        status = self.mc.query_status("V")
         return status
 
     #
@@ -183,6 +174,7 @@ class Motor(object):
 
         command = "S" + str(self.portNum) + "M" + str(int(speed))
         self.send_simple_command(command)
+        self.speed = int(speed)
 
     #
     # End set_speed
@@ -197,6 +189,7 @@ class Motor(object):
 
         command = "A" + str(self.portNum) + "M" + str(int(acceleration))
         self.send_simple_command(command)
+        self.acceleration = int(acceleration)
 
     #
     # End set_acceleration
@@ -224,6 +217,47 @@ class Motor(object):
     # End goto_zero
     # --------------------------------------------------------------------------
 
+    # --------------------------------------------------------------------------
+    # Position of an angle closest to a position, within the wrap range
+    #
+    # With a wrap range, target + n * 360 degrees is the same angle. Of these
+    # the closest is chosen that keeps the motor, and a scan of span degrees
+    # from it, within the range. Without a wrap range, or if the span does not
+    # fit, the target is taken as absolute.
+    #
+    def nearest_angle(self, target, position, span=0):
+        if self.wrapRange is None:
+            return target
+        low, high = self.wrapRange
+        first = int(numpy.ceil((low - target) / 360.0))
+        last = int(numpy.floor((high - span - target) / 360.0))
+        candidates = [target + 360 * n for n in range(first, last + 1)]
+        if not candidates:
+            return target
+        return min(candidates, key=lambda c: abs(c - position))
+
+    #
+    # End nearest_angle
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Move motor to an angle from where it is, by the shorter way around for a
+    # motor with a wrap range. Returns the position in degrees.
+    #
+    def goto_angle(self, target, span=0):
+        position = self.get_position()
+        goal = self.nearest_angle(target, position, span)
+        if abs(goal - position) <= self.tolerance:
+            self.log.debug("Motor %d at %.3f, no move to %.3f", self.portNum,
+                           position, goal)
+            return position
+        self.rot_deg(goal - position)
+        return goal
+
+    #
+    # End goto_angle
+    # --------------------------------------------------------------------------
+
     # --------------------------------------------------------------------------
     # Move motor to positive limit switch
     #
@@ -274,6 +308,30 @@ class Motor(object):
     # End rot_steps
     # --------------------------------------------------------------------------
 
+    # --------------------------------------------------------------------------
+    # Predicted time to rotate the specified number of degrees (seconds)
+    #
+    def move_time(self, degrees):
+        steps = numpy.round(degrees / self.increment)
+        if steps == 0:
+            return 0.0
+        return MOVE_OVERHEAD + motionModel.move_time(steps, self.speed,
+                                                     self.acceleration)
+
+    #
+    # End move_time
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Scan program stepping this motor by the specified number of degrees
+    #
+    def scan_program(self, degrees):
+        return ScanProgram(self, degrees)
+
+    #
+    # End scan_program
+    # --------------------------------------------------------------------------
+
     # --------------------------------------------------------------------------
     # String representation of motor class
     #
@@ -291,6 +349,227 @@ class Motor(object):
 # ==============================================================================
 
 
+# ==============================================================================
+# Scan program
+#
+# An index move of one motor stored on the controller once and run by "R" for
+# each step. The controller keeps the program until it is cleared, so a step
+# is one "R" and a wait for the "^" completion marker instead of uploading the
+# move every time. Use as a context manager. Position is tracked from the
+# steps moved.
+#
+class ScanProgram(object):
+
+    # --------------------------------------------------------------------------
+    # Initialize program object
+    #
+    def __init__(self, motor, degrees):
+        self.motor = motor
+        self.mc = motor.mc
+        self.steps = self.to_steps(degrees)  # Steps per run
+        self.index = 0  # Motor index in steps, read when loaded
+        self.loaded = False
+        self.running = False  # Triggered program started, not finished
+        self.completion = None  # Pending "^" of the running triggered pass
+        self.triggered = False  # Triggered program stored instead of the step
+        self.passes = 0  # Triggered passes not run yet
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Degrees to controller steps, as rot_deg()
+    #
+    def to_steps(self, degrees):
+        steps = -int(numpy.round(degrees / self.motor.increment))
+        if abs(steps) > 16777215:
+            raise ValueError()
+        return steps
+
+    #
+    # End to_steps
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Current position in degrees
+    #
+    @property
+    def position(self):
+        return self.index * (-self.motor.increment)
+
+    #
+    # End position
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Upload the program
+    #
+    @traced(MOTOR)
+    def load(self):
+        if not self.loaded:
+            # Start position, the steps moved are added to it
+            self.index = int(round(self.motor.get_position()
+                                   / (-self.motor.increment)))
+        command = "C"
+        # "I<m>M0" would run to the limit switch, a zero step is not stored
+        if self.steps != 0:
+            command += ",I" + str(self.motor.portNum) + "M" + str(self.steps) \
+                       + ","
+        self.log_command(command)
+        self.mc.write(command)  # Stored, not run
+        self.loaded = True
+        self.triggered = False
+
+    #
+    # End load
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Run the program once and wait for completion, returns the position.
+    # A different step size or a triggered program reloads the program.
+    #
+    @traced(MOTOR)
+    def step(self, degrees=None):
+        steps = self.steps if degrees is None else self.to_steps(degrees)
+        if (steps != self.steps) or self.triggered:
+            self.steps = steps
+            self.load()
+        if self.steps != 0:
+            self.log_command("R")
+            self.mc.run("R").wait()
+            self.index += self.steps
+        return self.position
+
+    #
+    # End step
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Start a hardware triggered scan of count measurements
+    #
+    # Each pass pulses the analyzer's external trigger, waits for the analyzer
+    # to signal the end of the sweep, then steps and settles while the host
+    # reads the data. The analyzer has one trace buffer, so the next pass is
+    # only run by advance(), after the host has read the sweep. The last
+    # measurement is not followed by a step. The host calls advance() after
+    # reading each sweep but the last and finish() at the end.
+    #
+    @traced(MOTOR)
+    def start_triggered(self, count, settle):
+        self.passes = int(count)
+        if self.passes > 1:
+            tokens = [VXM_TRIGGER_OUT, VXM_WAIT_READY]
+            if self.steps != 0:
+                tokens.append("I" + str(self.motor.portNum) + "M"
+                              + str(self.steps))
+            tokens.append("P" + str(int(numpy.ceil(settle * 10))))  # 1/10 s
+            command = "C," + ",".join(tokens) + ","
+            self.log_command(command)
+            self.mc.write(command)  # Stored, run by each pass
+        self.triggered = True
+        self.run_pass()
+
+    #
+    # End start_triggered
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Run the next pass of the triggered scan, the last one only measures
+    #
+    def run_pass(self):
+        self.passes -= 1
+        if self.passes > 0:
+            command = "R"
+        else:
+            command = "C," + VXM_TRIGGER_OUT + "," + VXM_WAIT_READY + ",R"
+        self.log_command(command)
+        self.completion = self.mc.run(command)
+        self.running = True
+
+    #
+    # End run_pass
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Wait for the step of the last pass and trigger the next sweep, call
+    # after the data of the last sweep was read. Returns the position.
+    #
+    @traced(MOTOR)
+    def advance(self):
+        self.completion.wait()
+        self.index += self.steps
+        self.run_pass()
+        return self.position
+
+    #
+    # End advance
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Wait for the last pass of the triggered scan to complete
+    #
+    @traced(MOTOR)
+    def finish(self):
+        if self.running:
+            self.completion.wait()
+            self.running = False
+
+    #
+    # End finish
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Clear the program
+    #
+    def unload(self):
+        if self.running:
+            # Stop a triggered program left running by an error
+            self.log_command("K")
+            self.mc.write("K")
+            self.mc.cancel()
+            self.running = False
+        if self.loaded:
+            self.log_command("C")
+            self.mc.write("C")
+            self.loaded = False
+
+    #
+    # End unload
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Context manager
+    #
+    def __enter__(self):
+        self.load()
+        return self
+
+    def __exit__(self, *exc):
+        self.unload()
+        return False
+
+    #
+    # End context manager
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Log a command sent
+    #
+    def log_command(self, command):
+        self.motor.log.debug("Sending %s to motor %d", command,
+                             self.motor.portNum)
+
+    #
+    # End log_command
+    # --------------------------------------------------------------------------
+
+
+#
+# End ScanProgram
+# ==============================================================================
+
+
 # ==============================================================================
 # B5990 Motor subclass
 #
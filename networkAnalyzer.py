@@ -7,17 +7,45 @@
 
 # Local files
 from functions import *
+from tracing import traced, ANALYZER
+from transport import InstrumentedResource
+from resourceRegistry import open_instrument
+from logSetup import get_logger
 # Standard libraries
-import logging
-from datetime import datetime
 import time
 import re
-# installed libraries
-import visa
 
+# Installed libraries
 
+TRIGGER_DELAY = 1  # seconds, trigger() waits this long before *OPC?
 
-# Installed libraries
+
+# ==============================================================================
+# Acquisition profile
+#
+# What the analyzer does around the sweeps besides measuring. "standard"
+# redraws and autoscales the front panel after every sweep and checks the
+# error queue after each stage. "fast" runs headless: display updates are off
+# for the run, there is no autoscale, and errors are only read at the end of
+# the routine. The routines turn the display back on when they close the
+# analyzer.
+#
+class AcquisitionProfile(object):
+
+    def __init__(self, name, display=True, auto_scale=True, error_polls=True):
+        self.name = name
+        self.display = display  # Update the display after each sweep
+        self.autoScale = auto_scale  # Autoscale the trace after each sweep
+        self.errorPolls = error_polls  # Check the error queue between stages
+
+
+ACQUISITION_PROFILES = dict((p.name, p) for p in (
+    AcquisitionProfile("standard"),
+    AcquisitionProfile("fast", display=False, auto_scale=False,
+                       error_polls=False)))
+#
+# End AcquisitionProfile
+# ==============================================================================
 
 
 # ==============================================================================
@@ -28,28 +56,24 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Initialize analyzer object
     #
-    def __init__(self):
+    def __init__(self, resource=None, if_bandwidth=IF_BANDWIDTH,
+                 profile=ACQUISITION_PROFILE):
         # Set up error log
-        logging.basicConfig(level=logging.DEBUG)
-        self.log = logging.getLogger(__name__)
-        if not self.log.handlers:
-            handler = logging.FileHandler(
-                    'log_' + datetime.today().strftime('%m_%Y') + '.log')
-            handler.setLevel(LOG_LEVEL)
-            formatter = logging.Formatter(
-                    fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                    datefmt='%Y-%m-%d %H:%M:%S')
-            handler.setFormatter(formatter)
-            self.log.addHandler(handler)
-            self.log.setLevel(LOG_LEVEL)
-            self.requestsLog = logging.getLogger('pyvisa')
-            self.requestsLog.setLevel(IMPORT_LOG_LEVEL)
-            self.requestsLog.addHandler(handler)
-
-        # Connect to instrument
-        self.vi = self.open()
+        self.log = get_logger(__name__)
+        self.ifBandwidth = if_bandwidth  # Hz, set by setup()
+        if profile not in ACQUISITION_PROFILES:
+            raise ValueError("Unknown acquisition profile: " + str(profile))
+        self.profile = ACQUISITION_PROFILES[profile]
+
+        # Connect to instrument, or use an already open resource (e.g. a
+        # simulated analyzer), counted in the I/O metrics either way
+        if resource and not isinstance(resource, InstrumentedResource):
+            resource = InstrumentedResource(resource, "analyzer")
+        self.vi = resource or self.open()
         if not self.vi:
             raise IOError("Failed to open connection to network analyzer")
+        # Identify the instrument and firmware in the I/O metrics
+        self.vi.info["idn"] = self.vi.query("*IDN?").strip()
 
     #
     # End init
@@ -59,17 +83,16 @@ class NetworkAnalyzer(object):
     # Open instrument
     #
     def open(self):
+        import visa
         rm = visa.ResourceManager()  # Create resource manager object
-        resource = None
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # Enumerate resources and open GPIB instrument
+        # Open the cached address, enumerate GPIB devices if it fails
         #
-        self.log.info("Searching for GPIB devices")
-        for r in rm.list_resources():
-            if "GPIB" in r:
-                resource = rm.open_resource(r)
-                resource.timeout = 60000
-                break
+        vi, idn = open_instrument(self.log, rm, "analyzer")
+        if vi is None:
+            return None
+        resource = InstrumentedResource(vi, "analyzer")
+        resource.timeout = 60000
         return resource
 
     #
@@ -93,6 +116,8 @@ class NetworkAnalyzer(object):
     def setup(self, channel, trace):
         ch = channel
         tr = trace
+        if not self.profile.display:
+            self.enable_display(False)  # Headless run
         self.display_channel()  # Display channel
         # Undefined header error below
         self.log.info("setting channel")
@@ -103,13 +128,14 @@ class NetworkAnalyzer(object):
         self.sweep_mode(ch)  # Set sweep mode to stepped
         self.toggle_output(True)  # Turn on stimulus output
         self.set_auto_sweep(ch, True)  # Turn on auto sweep time
-        self.set_band(1, 1000)  # Set IF bandwidth
+        self.set_band(1, self.ifBandwidth)  # Set IF bandwidth
         self.set_cont(ch, True)  # Set continuous initiation mode
         self.set_trig()  # Set trigger source to bus
         # Undefined header error for set_meas_format
         self.log.info("setting measurement format")
         self.set_meas_format(ch)  # Set measurement data format
-        self.get_errors()
+        if self.profile.errorPolls:
+            self.get_errors()
         self.set_trans_format()  # Set data transfer format to ASCII
         self.set_delay(ch, 0)  # Set 0 sweep delay time
         self.store_type()  # Set store type
@@ -118,21 +144,49 @@ class NetworkAnalyzer(object):
     # End setup
     # --------------------------------------------------------------------------
 
+    # --------------------------------------------------------------------------
+    # Show the last sweep, as far as the acquisition profile allows
+    #
+    def show_sweep(self, channel=1, trace=1):
+        if self.profile.display:
+            self.update_display()
+        if self.profile.autoScale:
+            self.auto_scale(channel, trace)
+
+    #
+    # End show_sweep
+    # --------------------------------------------------------------------------
+
     # --------------------------------------------------------------------------
     # Trigger measurement
     #
+    @traced(ANALYZER)
     def trigger(self):
         self.vi.write(":TRIG:SING")
-        time.sleep(1)
+        time.sleep(TRIGGER_DELAY)
         return self.wait()
 
     #
     # End trigger
     # --------------------------------------------------------------------------
 
+    # --------------------------------------------------------------------------
+    # Trigger a short sweep and wait for it, without the fixed delay of
+    # trigger()
+    #
+    @traced(ANALYZER)
+    def sweep_once(self):
+        self.vi.write(":TRIG:SING")
+        return self.wait()
+
+    #
+    # End sweep_once
+    # --------------------------------------------------------------------------
+
     # --------------------------------------------------------------------------
     # Wait for measurement to be complete
     #
+    @traced(ANALYZER)
     def wait(self):
         return self.vi.query("*OPC?")
 
@@ -143,6 +197,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Load instrument state
     #
+    @traced(ANALYZER)
     def load_state(self):
         command = 'MMEM:LOAD:STAT "STAT03.STA"'
         self.vi.write(command)
@@ -155,6 +210,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Set store type
     #
+    @traced(ANALYZER)
     def store_type(self):
         self.vi.write(":MMEM:STOR:SALL OFF")
         self.vi.write(":MMEM:STOR:STYP CDST")
@@ -167,6 +223,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Save instrument state to file
     #
+    @traced(ANALYZER)
     def save_state(self):
         self.vi.write(':MMEM:STOR "STAT03.STA"')
         time.sleep(2)  # Wait 2 seconds after sending command
@@ -178,6 +235,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Auto scale display
     #
+    @traced(ANALYZER)
     def auto_scale(self, channel=1, trace=1):
         command = ':DISP:WIND' + str(channel) + ':TRAC' + str(trace) + ':Y:AUTO'
         self.vi.write(command)
@@ -189,6 +247,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Perform S11 Calibration
     #
+    @traced(ANALYZER)
     def calibrate_s11(self, channel=1, port=2):
         command = ":SENS" + str(channel) + ":CORR:COLL:ECAL:SOLT1 " + str(port)
         self.vi.write(command)
@@ -202,6 +261,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Display desired channel
     #
+    @traced(ANALYZER)
     def display_channel(self):
         command = ":DISP:SPL D1"
         self.vi.write(command)
@@ -213,6 +273,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Enable/disable display update
     #
+    @traced(ANALYZER)
     def enable_display(self, enable=True):
         command = ":DISP:ENAB"
         if enable:
@@ -228,6 +289,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Get calibration coefficients
     #
+    @traced(ANALYZER)
     def get_calib_coef(self, channel=1):
         command = ":SENS" + str(channel) + ":CORR:COEF?"
         return self.vi.query(command)
@@ -239,6 +301,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Get corrected data array
     #
+    @traced(ANALYZER)
     def get_corr_data(self, channel=1):
         command = ':CALC' + str(channel) + ':DATA:SDAT?'
         return format_string(self.vi.query(command))
@@ -247,9 +310,23 @@ class NetworkAnalyzer(object):
     # End get_corr_data
     # --------------------------------------------------------------------
 
+    # --------------------------------------------------------------------------
+    # Get corrected data as a complex array
+    #
+    @traced(ANALYZER)
+    def get_corr_values(self, channel=1):
+        command = ':CALC' + str(channel) + ':DATA:SDAT?'
+        values = np.array(self.vi.query(command).split(','), dtype=float)
+        return values[0::2] + 1j * values[1::2]
+
+    #
+    # End get_corr_values
+    # --------------------------------------------------------------------------
+
     # --------------------------------------------------------------------------
     # Get corrected S-parameter data array
     #
+    @traced(ANALYZER)
     def get_corr_s_data(self, a=2, b=1):
         command = ':SENS:DATA:CORR? S' + str(a) + str(b)
         return format_string(self.vi.query(command))
@@ -261,6 +338,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Get content of the error queue
     #
+    @traced(ANALYZER)
     def get_errors(self):
         command = ":SYST:ERR?"
         nums = []
@@ -295,6 +373,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Get formatted data array
     #
+    @traced(ANALYZER)
     def get_form_data(self, channel=1):
         self.set_meas_format(channel)
         command = ":CALC" + str(channel) + ":DATA:FDAT?"
@@ -307,6 +386,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Get raw data array
     #
+    @traced(ANALYZER)
     def get_raw_data(self, a=2, b=1):
         command = ':SENS:DATA:RAWD? S' + str(a) + str(b)
         return format_string(self.vi.query(command))
@@ -317,6 +397,7 @@ class NetworkAnalyzer(object):
 
     # --------------------------------------------------------------------------
     # Get x-axis data
+    @traced(ANALYZER)
     def get_x(self, channel=1):
         command = ':CALC' + str(channel) + ':DATA:XAX?'
         return format_freq(self.vi.query(command))
@@ -325,9 +406,21 @@ class NetworkAnalyzer(object):
     # End get_x
     # --------------------------------------------------------------------------
 
+    # --------------------------------------------------------------------------
+    # Get sweep time (seconds)
+    #
+    @traced(ANALYZER)
+    def get_sweep_time(self, channel=1):
+        return float(self.vi.query(':SENS' + str(channel) + ':SWE:TIME?'))
+
+    #
+    # End get_sweep_time
+    # --------------------------------------------------------------------------
+
     # --------------------------------------------------------------------------
     # Enables or disables auto sweep time
     #
+    @traced(ANALYZER)
     def set_auto_sweep(self, channel=1, status=True):
         command = ":SENS" + str(channel) + ":SWE:TIME:AUTO"
         if status:
@@ -343,6 +436,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Set the IF bandwidth of the selected channel
     #
+    @traced(ANALYZER)
     def set_band(self, channel=1, band=1000):
         command = ":SENS" + str(channel) + ":BAND"
         self.vi.write(command + " " + str(band))
@@ -355,6 +449,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Set sweep center frequency
     #
+    @traced(ANALYZER)
     def set_center(self, channel, center):
         command = ":SENS" + str(channel) + ":FREQ:CENT"
         self.vi.write(command + " " + str(center))
@@ -367,8 +462,9 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Set the active channel
     #
+    @traced(ANALYZER)
     def set_channel(self, channel=1):
-        command = ":DISP:WIND" + str(channel) + "ACT"
+        command = ":DISP:WIND" + str(channel) + ":ACT"
         self.vi.write(command)
 
     #
@@ -378,6 +474,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Set continuous initiation mode for the selected channel
     #
+    @traced(ANALYZER)
     def set_cont(self, channel=1, status=True):
         command = ":INIT" + str(channel) + ":CONT"
         if status:
@@ -394,6 +491,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Enable or disable data correction
     #
+    @traced(ANALYZER)
     def set_data_correction(self, channel=1, en=True):
         if en:
             state = ' ON'
@@ -410,6 +508,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Set sweep delay time
     #
+    @traced(ANALYZER)
     def set_delay(self, channel, delay=0):
         command = ":SENS" + str(channel) + ":SWE:DEL"
         self.vi.write(command + " " + str(delay))
@@ -422,6 +521,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Set data measurement format
     #
+    @traced(ANALYZER)
     def set_meas_format(self, channel=1):
         # command = ':CALC' + str(channel) + ':SEL:FORM'
         command = ':CALC' + str(channel) + ':FORM'
@@ -435,6 +535,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Select measurement parameter
     #
+    @traced(ANALYZER)
     def set_measurement(self, channel=1, trace=1, a=1, b=1):
         command = ":CALC" + str(channel) + ":PAR" + str(trace) + ":DEF"
         self.vi.write(command + " S" + str(a) + str(b))
@@ -447,6 +548,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Set the number of traces
     #
+    @traced(ANALYZER)
     def set_num_traces(self, channel=1, traces=1):
         command = ":CALC" + str(channel) + ":PAR:COUN"
         self.vi.write(command + " " + str(int(traces)))
@@ -459,6 +561,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Set the number of points
     #
+    @traced(ANALYZER)
     def set_points(self, channel, points):
         command = ":SENS" + str(channel) + ":SWE:POIN"
         self.vi.write(command + " " + str(int(points)))
@@ -468,9 +571,44 @@ class NetworkAnalyzer(object):
     # End set_points
     # --------------------------------------------------------------------------
 
+    # --------------------------------------------------------------------------
+    # Set segment sweep
+    #
+    # Uploads the segment table (list of Segment) and switches the channel to
+    # segment sweep. The IF bandwidth and power columns are only sent when a
+    # segment sets them, other segments then get the channel setting. Returns
+    # the total number of points.
+    #
+    @traced(ANALYZER)
+    def set_segments(self, channel, segments):
+        ch = str(channel)
+        ifbw = any(s.ifbw is not None for s in segments)
+        power = any(s.power is not None for s in segments)
+        if power:
+            channel_power = float(self.vi.query(":SOUR" + ch + ":POW?"))
+
+        # <buf 5>,<start/stop>,<ifbw>,<power>,<delay>,<time>,<segments>
+        table = [5, 0, int(ifbw), int(power), 0, 0, len(segments)]
+        for s in segments:
+            table += [s.start, s.stop, int(s.points)]
+            if ifbw:
+                table.append(self.ifBandwidth if s.ifbw is None else s.ifbw)
+            if power:
+                table.append(channel_power if s.power is None else s.power)
+        self.vi.write(":SENS" + ch + ":SEGM:DATA "
+                      + ",".join("%.11g" % v if isinstance(v, float) else str(v)
+                                 for v in table))
+        self.sweep_type(channel, "SEGM")
+        return self.vi.query(":SENS" + ch + ":SEGM:SWE:POIN?")
+
+    #
+    # End set_segments
+    # --------------------------------------------------------------------------
+
     # --------------------------------------------------------------------------
     # Set sweep span
     #
+    @traced(ANALYZER)
     def set_span(self, channel, span):
         command = ":SENS" + str(channel) + ":FREQ:SPAN"
         self.vi.write(command + " " + str(span))
@@ -483,6 +621,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Set sweep start frequency
     #
+    @traced(ANALYZER)
     def set_start(self, channel, start):
         command = ":SENS" + str(channel) + ":FREQ:STAR"
         self.vi.write(command + " " + str(start))
@@ -495,6 +634,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Set sweep stop frequency
     #
+    @traced(ANALYZER)
     def set_stop(self, channel, stop):
         command = ":SENS" + str(channel) + ":FREQ:STOP"
         self.vi.write(command + " " + str(stop))
@@ -507,6 +647,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Set the active trace
     #
+    @traced(ANALYZER)
     def set_trace(self, channel, trace):
         command = ":CALC" + str(channel) + ":PAR" + str(trace) + ":SEL"
         self.vi.write(command)
@@ -518,6 +659,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Set data transfer format to ASCII
     #
+    @traced(ANALYZER)
     def set_trans_format(self):
         self.vi.write(':FORM:DATA ASC')
         return self.vi.query(':FORM:DATA?')
@@ -529,6 +671,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Set trigger source to bus
     #
+    @traced(ANALYZER)
     def set_trig(self):
         command = ":TRIG:SOUR"
         self.vi.write(command + " BUS")
@@ -538,9 +681,70 @@ class NetworkAnalyzer(object):
     # End set_trig
     # --------------------------------------------------------------------------
 
+    # --------------------------------------------------------------------------
+    # Set up a second channel for quick S21 probe sweeps. Only the active
+    # channel is swept on a trigger until end_probe().
+    #
+    @traced(ANALYZER)
+    def setup_probe(self, channel, start, stop, points, band):
+        self.vi.write(":DISP:SPL D12")  # Windows for channels 1 and 2
+        self.vi.write(":TRIG:SEQ:SCOP ACT")
+        self.set_start(channel, start)
+        self.set_stop(channel, stop)
+        self.set_points(channel, points)
+        self.set_band(channel, band)
+        self.set_measurement(channel, 1, 2, 1)
+        self.set_cont(channel, True)
+
+    @traced(ANALYZER)
+    def end_probe(self):
+        self.vi.write(":TRIG:SEQ:SCOP ALL")
+        self.vi.write(":DISP:SPL D1")
+
+    #
+    # End probe channel
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Set trigger source to external, pulse the trigger output after each sweep
+    # and latch sweep ends in the operation status event register
+    #
+    @traced(ANALYZER)
+    def set_external_trigger(self):
+        self.vi.write(":TRIG:SOUR EXT")
+        self.vi.write(":TRIG:OUTP:STAT ON")
+        self.vi.write(":TRIG:OUTP:POS AFT")
+        # Measuring bit (16) going low sets the event bit
+        self.vi.write(":STAT:OPER:PTR 0")
+        self.vi.write(":STAT:OPER:NTR 16")
+        self.vi.query(":STAT:OPER?")  # Clear old events
+        return self.vi.query(":TRIG:SOUR?")
+
+    #
+    # End set_external_trigger
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Wait for an externally triggered sweep to end
+    #
+    @traced(ANALYZER)
+    def wait_sweep_end(self, timeout=SWEEP_END_TIMEOUT, poll=0.005):
+        t0 = time.time()
+        while not int(float(self.vi.query(":STAT:OPER?"))) & 16:
+            if time.time() - t0 > timeout:
+                raise IOError("No triggered sweep ended within "
+                              + str(timeout) + " s, check the trigger "
+                              "wiring")
+            time.sleep(poll)
+
+    #
+    # End wait_sweep_end
+    # --------------------------------------------------------------------------
+
     # --------------------------------------------------------------------------
     # Set sweep mode
     #
+    @traced(ANALYZER)
     def sweep_mode(self, channel=1):
         command = ":SENS" + str(channel) + ":SWE:GEN"
         self.vi.write(command + " STEP")
@@ -553,9 +757,10 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Set sweep type
     #
-    def sweep_type(self, channel=1):
+    @traced(ANALYZER)
+    def sweep_type(self, channel=1, sweep="LIN"):
         command = ":SENS" + str(channel) + ":SWE:TYPE"
-        self.vi.write(command + " LIN")
+        self.vi.write(command + " " + sweep)
         return self.vi.query(command + "?")
 
     #
@@ -565,6 +770,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Enable/disable stimulus output
     #
+    @traced(ANALYZER)
     def toggle_output(self, status=True):
         if status:
             self.vi.write(":OUTP ON")
@@ -579,6 +785,7 @@ class NetworkAnalyzer(object):
     # --------------------------------------------------------------------------
     # Update display one time
     #
+    @traced(ANALYZER)
     def update_display(self):
         command = ":DISP:UPD"
         self.vi.write(command)
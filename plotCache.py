@@ -0,0 +1,155 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         plotCache.py
+# Author(s):    Matthew Kesselring
+#               Mitchell Costa
+# Date:         October 2026
+################################################################################
+
+# Local files
+from serverInfo import *
+# Standard libraries
+import hashlib
+import shutil
+
+# Installed libraries
+
+
+# ==============================================================================
+# Content-addressed plot cache
+#
+# Rendered plots are stored as <key>.<format> where the key is a hash of the
+# source data file contents and the plot parameters. Hits refresh the file's
+# modification time, and the least recently used files are removed once the
+# cache grows past its size limit.
+#
+class PlotCache(object):
+
+    # Source file hashes, keyed by (path, size, mtime)
+    _file_hashes = {}
+
+    # --------------------------------------------------------------------------
+    # Initialize cache object
+    #
+    def __init__(self, path=None, max_size=PLOT_CACHE_SIZE):
+        self.path = path or PLOT_CACHE_PATH
+        self.max_size = max_size
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Hash the contents of a source data file
+    #
+    @classmethod
+    def file_hash(cls, filename):
+        st = os.stat(filename)
+        stamp = (os.path.abspath(filename), st.st_size, st.st_mtime)
+        digest = cls._file_hashes.get(stamp)
+        if digest is None:
+            sha = hashlib.sha1()
+            with open(filename, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    sha.update(block)
+            digest = sha.hexdigest()
+            cls._file_hashes[stamp] = digest
+        return digest
+
+    #
+    # End file_hash
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Cache key for a plot of the given source files and parameters
+    #
+    def key(self, source_files, **params):
+        sha = hashlib.sha1()
+        for filename in source_files:
+            sha.update(self.file_hash(filename).encode())
+        for name in sorted(params):
+            sha.update(("%s=%r;" % (name, params[name])).encode())
+        return sha.hexdigest()
+
+    #
+    # End key
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Path of a cache entry
+    #
+    def entry(self, key, fmt="png"):
+        return os.path.join(self.path, key + "." + fmt)
+
+    #
+    # End entry
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Look up a cached plot, returns its path or None
+    #
+    def get(self, key, fmt="png"):
+        filename = self.entry(key, fmt)
+        try:
+            # Mark as recently used
+            os.utime(filename, None)
+        except OSError:
+            return None
+        return filename
+
+    #
+    # End get
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Store a rendered plot, returns the cache entry path. The cache directory
+    # is created by the first store.
+    #
+    def put(self, key, source, fmt="png"):
+        # Plot batch workers may store at the same time
+        os.makedirs(self.path, exist_ok=True)
+        filename = self.entry(key, fmt)
+        # Copy under a temporary name so readers never see a partial file
+        tmp = filename + ".tmp" + str(os.getpid())
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, filename)
+        self.evict()
+        return filename
+
+    #
+    # End put
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Remove least recently used entries until the cache fits its size limit
+    #
+    def evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.path):
+            filename = os.path.join(self.path, name)
+            try:
+                st = os.stat(filename)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, filename))
+            total += st.st_size
+
+        entries.sort()
+        for mtime, size, filename in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(filename)
+                total -= size
+            except OSError:
+                pass
+
+    #
+    # End evict
+    # --------------------------------------------------------------------------
+
+
+#
+# End PlotCache
+# ==============================================================================
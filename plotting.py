@@ -5,28 +5,47 @@
 # Date:         May 2019
 ################################################################################
 
-from tkinter import *
 from functions import *
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
+from dataset import Dataset
+from plotCache import PlotCache
+from logSetup import get_logger
 import numpy as np
 import math
-import smithplot
-import logging
-from smithplot import SmithAxes
+import shutil
+import multiprocessing
+
+#matplotlib and smithplot are loaded by load_matplotlib() when the first plot is drawn,
+#so cache hits and scripts that only import this module never load them
+plt = None
+ticker = None
 
 
-#def Plotting(S11filename,S21filename,frequencyInput,chartType):
-def Plotting(fstart,fstop,numpts,rstart,rincr,rstop,experiment_id,user_id,frequencyInput,chartType1,chartType2,chartType3,quickLook=None):
 # ==============================================================================
-# Housekeeping steps
+# Load matplotlib with a non-interactive backend
 #
-#Create string for the plot type from the input args chartType1,chartType2,chartType3
-    logging.basicConfig(filename="logfilename.log", level=logging.INFO)
-    skipS21 = 0
-    chartType=''
+def load_matplotlib(smith=False):
+    global plt, ticker
+    if plt is None:
+        import matplotlib
+        matplotlib.use('Agg')   #plots are only saved to file, never shown, so no GUI toolkit is needed
+        import matplotlib.pyplot as plt
+        import matplotlib.ticker as ticker
+    if smith:
+        import smithplot    #registers the 'smith' projection, only the rpr chart needs it
+    return plt
+#
+# End load matplotlib
+# ==============================================================================
+
+S21_CHARTS = ('pmp', 'ppr', 'pmr')      #chart types drawn from the S21 data at one frequency
+S11_CHARTS = ('rmr', 'rpr', 'maxGain', 's11')   #chart types drawn from the S11 data over all frequencies
+PLOT_CACHE_VERSION = 1     #part of every cache key, increase when the drawing code changes so cached plots are redrawn
+
 
+# ==============================================================================
+# Build chart type string from the chartType1,chartType2,chartType3 flags
+#
+def chart_type(chartType1,chartType2,chartType3):
     if(chartType1)==1:
         chartType = 'p'
     else:
@@ -42,274 +61,418 @@ def Plotting(fstart,fstop,numpts,rstart,rincr,rstop,experiment_id,user_id,freque
     else:
         chartType = chartType+'r'
 
-    #Special Case plots for the calibration process
-    if(quickLook=='maxGain'):
-        S21filename = 'S21.csv'
-        S11filename = 'S21.csv'
-        plotfilename = 'Gain.png'
-        chartType = 'maxGain'
-        csvPath = TMP_PATH+'\\'
-        savePath = TMP_PATH+'\\PNG\\'
-        skipS21 = 1
+    return chartType
+#
+# End chart type
+# ==============================================================================
 
-    elif(quickLook=='s11'):
-        S21filename = 'S21.csv'
-        S11filename = 'S11.csv'
-        plotfilename = 'S11.png'
-        chartType = 's11'
-        csvPath = TMP_PATH+'\\'
-        savePath = TMP_PATH+'\\PNG\\'
-        skipS21 = 1
 
-    else:
-        #create the filename and path for the S21 and S11 data
-        S21filename = '\\data_S21.csv'
-        S11filename = '\\data_S11.csv'
-        printfreq = frequencyInput/1e9 if ((frequencyInput/1e9)%1)!=0 else int(frequencyInput/1e9)
-        plotfilename = chartType+'-'+str(printfreq)+'.png'
-        csvPath = RESULTS_PATH+'\\'+str(user_id)+'\\'+str(experiment_id)+'\\'
-        savePath = TMP_PATH+'\\'
-    textFilePath = TMP_PATH +'\\'
+# ==============================================================================
+# Plot file name for a chart type at the requested frequency (Hz)
+#
+def plot_filename(chartType,frequencyInput,plotFormat='png'):
+    printfreq = frequencyInput/1e9 if ((frequencyInput/1e9)%1)!=0 else int(frequencyInput/1e9)
+    return chartType+'-'+str(printfreq)+'.'+plotFormat
+#
+# End plot file name
+# ==============================================================================
 
-    #Check to see if the PNG folder is there. If not, this creates it
-    #PNG_PATH = os.path.join(DATA_PATH, "PNG")
-    #if not os.path.isfolder(PNG_PATH):
-    #   os.mkdir(PNG_PATH)
 
 # ==============================================================================
-# Begin S21 data manipulation
+# Plot renderer
 #
-    if (skipS21==0):    #Skip S21 process if Special Case plot
-        df2 = S21orCFcsv_to_dataframe(csvPath + S21filename)  #load the s21 csv file into dataframe
-        df2.iloc[:,0] = df2.iloc[:,0].astype(int)
-        df2 = df2.sort_values(df2.columns[0])
-        anglesRAW = df2.iloc[:,0].as_matrix()   #Pull the angle data from the first column of the dataframe
-        angles = np.asarray([[float(i) for i in anglesRAW]])  #interpret the angles as floats and create a 2D array of the angle data so it can be concatinated later on
-
-        s21FrequencyRAW = np.asarray(list(df2))     #Get the column headers (frequency) of the dataframe
-        s21FrequencyRAW[0] = 0                      #Set the 'Angle' column header to 0 TMPorarily so the rest of the column headers can be formatted
-        s21FrequencyFixed2 = [float(i) for i in s21FrequencyRAW]    #Interpret the headers as floats to get rid of the leading '+' and the scientific notation at the end
-        s21Headers = [int(i) for i in s21FrequencyFixed2]       #convert the floats to ints to get rid of decimals
+# Loads the S21/S11 files once and keeps one figure per chart type. The first
+# plot of a chart type builds the figure, later plots only update the line data,
+# title, and axis limits before saving.
+#
+class PlotRenderer(object):
+    dpiScale = 200 #set the resolution of the plots
+    figsize = (12, 9)
+    limits = {'pmp': (-40, 0), 'ppr': (-200, 200)}    #fixed axis limits, the rest scale with the data
 
-       #If the frequency input is 0, set it to some arbitrary frequency value from the test
-        if(frequencyInput==0):
-            frequencyInput=s21Headers[2]
+    def __init__(self,S21path=None,S11path=None):
+        self.S21path = S21path
+        self.S11path = S11path
+        self._s21 = None
+        self._s11 = None
+        self.figures = {}   #chart type -> (figure, axes, line)
 
-        frequencyInput = find_nearest(s21Headers, frequencyInput)
+    # --------------------------------------------------------------------------
+    # Datasets, loaded on first use
+    #
+    @property
+    def s21(self):
+        if self._s21 is None:
+            self._s21 = Dataset.from_s21_csv(self.S21path)  #load the s21 csv file, rows sorted by angle
+        return self._s21
 
-        s21Headers[0] = 'Angle'  # put 'Angle' column header back in the header list
-        # Update Column Headers with corrected names
-        df2.columns = s21Headers
+    @property
+    def s11(self):
+        if self._s11 is None:
+            self._s11 = Dataset.from_s11_csv(self.S11path)  #load the s11 csv file
+        return self._s11
+    #
+    # End datasets
+    # --------------------------------------------------------------------------
 
-        #Extract s21 values at the user entered frequency from the array
-        numpy_data_vals = np.asarray(df2[[frequencyInput]])
-        angles = angles.transpose()         #Transpose the angle array so it can be concatenated
-        numpy_data = np.concatenate((angles, numpy_data_vals), 1) #concatenate the angle array with the S21 values from the user selected frequency
-        Angle_Deg = numpy_data[:,0]         #extract the angle data from the array for plotting
-        Val = numpy_data[:,1]               #extract the s21 data
-        Angle = Angle_Deg * 2 * math.pi / 360       #convert degrees to rads for plotting
+    # --------------------------------------------------------------------------
+    # Cache key for a chart, from the data file it is drawn from and its settings
+    #
+    def cache_key(self,cache,chartType,frequencyInput,plotFormat='png'):
+        if chartType in S21_CHARTS:
+            source = self.S21path
+        else:
+            source = self.S11path
+            frequencyInput = None   #S11 charts are the same at every frequency
+        return cache.key([source], chartType=chartType, frequency=frequencyInput, dpi=self.dpiScale,
+                         figsize=self.figsize, limits=self.limits.get(chartType), format=plotFormat,
+                         version=PLOT_CACHE_VERSION)
+    #
+    # End cache key
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # S21 values at the nearest measured frequency
+    #
+    def s21_slice(self,chartType,frequencyInput):
+        s21 = self.s21
+        Angle_Deg = s21.angles.astype(int).astype(float)   #whole-degree angle data for plotting
+
+       #If the frequency input is 0, set it to some arbitrary frequency value from the test
+        if(frequencyInput==0):
+            frequencyInput=s21.freq[1]
 
-        #The following for statement gets rid of any spaces within S21 data and replaces all the 'i's with 'j's so the 'complex' data type in python can interpret the values
-        Val_Fixed = [];
-        for s in Val:
-            Val_Fixed.append(str(s).replace(' ', ''))
-        Val_Complex = [(complex(str(s).replace('i', 'j'))) for s in Val_Fixed]
+        freqIndex = s21.freq_index(frequencyInput)     #column of the frequency nearest the user entered frequency
+        frequencyInput = int(s21.freq[freqIndex])
 
-        Mag = [20 * math.log10(abs(complex(s.replace('i', 'j')))) for s in Val_Fixed]   #calculate the magnitude from the S21 complex numbers
+        Mag = s21.mag_db[:, freqIndex]      #magnitude of the S21 values at the user selected frequency
         if chartType =='pmp':
            Maximum = np.amax(Mag)      #get the maximum magnitude to scale the plot correctly
            Mag = Mag - Maximum         #Normalize the data
-        Phase = np.angle(Val_Complex, deg=True) #Get the phase data from the complex S21 value
+        Phase = s21.phase[:, freqIndex] #Get the phase data from the complex S21 value
+        return frequencyInput, Angle_Deg, Mag, Phase
+    #
+    # End S21 slice
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Render one chart and save it to filename
+    #
+    def render(self,chartType,frequencyInput,filename):
+        load_matplotlib(chartType == 'rpr')
+        if chartType in S21_CHARTS:
+            frequencyInput, Angle_Deg, Mag, Phase = self.s21_slice(chartType, frequencyInput)
+            Angle = Angle_Deg * 2 * math.pi / 360       #convert degrees to rads for plotting
+            ghz = str(frequencyInput/1000000000)
+        elif chartType in S11_CHARTS:
+            Frequency = self.s11.freq / 1000000000       #convert 1000000000 to 1.0 GHz
+            S11Mag = self.s11.mag_db             #magnitude of the s11 data
+        else:
+            raise ValueError("Unknown chart type " + str(chartType))
+
+        known = chartType in self.figures
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # PMP = S21 Magnitude Polar Plot
+        #
+        if chartType =='pmp':
+            if not known:
+                fig_plot = plt.figure(figsize=self.figsize)
+                ax = fig_plot.add_subplot(111, projection='polar')
+                line, = ax.plot(Angle, Mag)
+                plt.rcParams['grid.linestyle'] = ':'
+                ax.grid(linestyle='dashed')
+                ax.set_theta_direction(-1)
+                major_Xticks = np.arange(0 * math.pi / 180, 360 * math.pi / 180, 30 * math.pi / 180)
+                ax.set_ylabel('(dB)',fontsize=14, rotation='horizontal')
+                ax.set_xlabel('Angle (Degrees)',fontsize=14, rotation ='horizontal')
+                ax.set_xticks(major_Xticks)
+                plt.setp(ax.get_xticklabels(), rotation='horizontal', fontsize=13)
+                ax.set_theta_zero_location("N")
+                ax.yaxis.set_label_coords(-0.019, 0.35)
+                ax.set_rlabel_position(-106)  # get radial labels away from plotted line
+                self.figures[chartType] = (fig_plot, ax, line)
+            fig_plot, ax, line = self.figures[chartType]
+            line.set_data(Angle, Mag)
+            ax.set_title('S21 Gain Antenna Pattern @ '+ ghz +' Ghz', fontsize=18)
+            major_Yticks = np.arange(math.ceil((np.amax(Mag)-20)/5)*5, math.ceil(((np.amax(Mag))/5)), 10)
+            ax.set_yticks(major_Yticks, minor=True)
+            ax.set_ylim(*self.limits['pmp'])
+            plt.setp(ax.get_yticklabels(), rotation='horizontal', fontsize=11)
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # PPR = S21 Phase Rectangluar Plot
+        #
+        elif chartType =='ppr':
+            if not known:
+                fig_plot2 = plt.figure(figsize=self.figsize)
+                ax2 = fig_plot2.add_subplot(1, 1, 1)
+                line, = ax2.plot(Angle_Deg, Phase)
+                major_Yticks = [-90,-150,-120,-90,-60,-30,0,30,60,90,120,150,90]
+                ax2.set_yticks(major_Yticks, minor=False)
+                ax2.set_xlabel('Rotation Angle (Degrees)',fontsize=14)
+                ax2.set_ylabel('Phase (Degrees)',fontsize=14)
+                ax2.grid(True)
+                plt.setp(ax2.get_yticklabels(), fontsize=13)
+                plt.setp(ax2.get_xticklabels(), fontsize=13)
+                self.figures[chartType] = (fig_plot2, ax2, line)
+            fig_plot2, ax2, line = self.figures[chartType]
+            line.set_data(Angle_Deg, Phase)
+            ax2.set_title('S21 Phase Antenna Pattern @ '+ ghz +' Ghz',fontsize=18)
+            ax2.axis(list(self.limits['ppr']) + [(np.amin(Phase)-10), (np.amax(Phase)+10)])
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # PMR = S21 Magnitude Rectangular Plot
+        #
+        elif chartType =='pmr':
+            if not known:
+                fig_plot5 = plt.figure(figsize=self.figsize)
+                ax5 = fig_plot5.add_subplot(111)
+                line, = ax5.plot(Angle*180/math.pi, Mag)
+                ax5.set_xlabel('Angle (Degrees)',fontsize=14)
+                ax5.set_ylabel('Gain (dBi)',fontsize=14)
+                plt.setp(ax5.get_yticklabels(), fontsize=13)
+                plt.setp(ax5.get_xticklabels(), fontsize=13)
+                ax5.grid(True)
+                self.figures[chartType] = (fig_plot5, ax5, line)
+            fig_plot5, ax5, line = self.figures[chartType]
+            line.set_data(Angle*180/math.pi, Mag)
+            ax5.set_title('S21 Gain Antenna Pattern @ '+ ghz +' Ghz',fontsize=18)
+            ax5.relim()
+            ax5.autoscale_view()
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # RMR = S11 Magnitude Rectangular Plot
+        # maxGain = S21 Magnitude @ 0 degrees Rectangular Plot
+        # s11 = S11 Magnitude Rectangular Plot
+        #
+        elif chartType in ('rmr', 'maxGain', 's11'):
+            if not known:
+                fig_plot3 = plt.figure(figsize=self.figsize)
+                ax3 = fig_plot3.add_subplot(1, 1, 1)
+                ax3.xaxis.set_major_locator(ticker.MultipleLocator(0.5))
+                line, = ax3.plot(Frequency, S11Mag)
+                ax3.set_xlabel('Frequency (GHz)',fontsize=14)
+                ax3.set_ylabel('Gain (dB)' if chartType == 'maxGain' else 'S11 (dB)',fontsize=14)
+                ax3.grid(True)
+                self.figures[chartType] = (fig_plot3, ax3, line)
+            fig_plot3, ax3, line = self.figures[chartType]
+            line.set_data(Frequency, S11Mag)
+            if chartType == 'rmr':
+                ax3.set_title('S11 Antenna Pattern @ '+ str(np.amin(Frequency)) +'-'+ str(np.amax(Frequency)) + ' Ghz', fontsize=18)
+            elif chartType == 'maxGain':
+                ax3.set_title('Test Antenna Gain',fontsize=18)
+            else:
+                ax3.set_title('S11',fontsize=18)
+            ax3.axis([np.amin(Frequency), np.amax(Frequency), np.amin(S11Mag)-2, np.amax(S11Mag)+2])
+            plt.setp(ax3.get_yticklabels(), fontsize=13)
+            plt.setp(ax3.get_xticklabels(), fontsize=13)
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # RPR = S11 Smith Plot (S11 data does not change, so the figure is reused as is)
+        #
+        elif chartType =='rpr':
+            if not known:
+                fig_plot4 = plt.figure(figsize=self.figsize)
+                ax4 = fig_plot4.add_subplot(111, projection = 'smith')
+                ax4.set_title('S11 Antenna Pattern From '+ str(np.amin(Frequency)) +'-'+ str(np.amax(Frequency)) + ' Ghz',fontsize=18)
+                line, = ax4.plot(self.s11.data)
+                self.figures[chartType] = (fig_plot4, ax4, line)
+
+        self.figures[chartType][0].savefig(filename,dpi=self.dpiScale)
+        return filename
+    #
+    # End render
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Close all figures
+    #
+    def close(self):
+        for fig_plot, ax, line in self.figures.values():
+            plt.close(fig_plot)
+        self.figures = {}
+    #
+    # End close
+    # --------------------------------------------------------------------------
 #
-# End S21 data manipulation
+# End plot renderer
 # ==============================================================================
 
+
 # ==============================================================================
-# Begin S11 data manipulation
+# Copy a cached plot, returns False if it was evicted in the meantime
 #
-    df4 = S11csv_to_dataframe(csvPath + S11filename)  #load the s11 csv file into a dataframe
-    S11_data = df4.as_matrix()              #convert dataframe to numpy array
-    FrequencyRAW, S11_Val = S11_data        #Split the array into two seperate arrays containing the frequency data and the s11 data
+def copy_cached(cached,filename):
+    try:
+        shutil.copyfile(cached, filename)
+        return True
+    except (IOError, OSError):
+        return False
+#
+# End copy cached plot
+# ==============================================================================
 
-    #Convert Frequency Values from Scientific Notation to Integers
-    FrequencyFixed2 = [float(i) for i in FrequencyRAW]      #Get rid of the scientific notation in the frequency data
-    Frequency = [int(i)/1000000000 for i in FrequencyFixed2]           #Get rid of the trailing decimal point in the frequency data, convert 1000000000 to 1.0 GHz
 
-    S11Val_Fixed = [s.replace(' ', '') for s in S11_Val]    #Strip any spaces out of the s11 data
-    S11Val_Complex = [(complex(s.replace('i', 'j'))) for s in S11Val_Fixed] #replace i with j in the complex S11 complex number
+#def Plotting(S11filename,S21filename,frequencyInput,chartType):
+def Plotting(fstart,fstop,numpts,rstart,rincr,rstop,experiment_id,user_id,frequencyInput,chartType1,chartType2,chartType3,quickLook=None,plotFormat='png'):
+# ==============================================================================
+# Housekeeping steps
+#
+#Create string for the plot type from the input args chartType1,chartType2,chartType3
+    chartType = chart_type(chartType1,chartType2,chartType3)
+    writeTextFile = True
 
-    S11Mag = [20 * math.log10(abs(complex(s.replace('i', 'j')))) for s in S11Val_Fixed] #calculate the magnitude from the s11 data
-    Min = np.amin(S11Mag)           #extract the minimum magnitude to scale the plot correctly
-    S11Phase = np.angle(S11Val_Complex, deg=True)   #convert the phase from rads to degrees
+    #Special Case plots for the calibration process
+    if(quickLook=='maxGain'):
+        S21filename = 'S21.csv'
+        S11filename = 'S21.csv'
+        plotfilename = 'Gain.'+plotFormat
+        chartType = 'maxGain'
+        csvPath = TMP_PATH
+        savePath = os.path.join(TMP_PATH, 'PNG')
+        writeTextFile = False
 
-#
-# End S21 data manipulation
-# ==============================================================================
+    elif(quickLook=='s11'):
+        S21filename = 'S21.csv'
+        S11filename = 'S11.csv'
+        plotfilename = 'S11.'+plotFormat
+        chartType = 's11'
+        csvPath = TMP_PATH
+        savePath = os.path.join(TMP_PATH, 'PNG')
+        writeTextFile = False
+
+    else:
+        #create the filename and path for the S21 and S11 data
+        S21filename = 'data_S21.csv'
+        S11filename = 'data_S11.csv'
+        plotfilename = plot_filename(chartType,frequencyInput,plotFormat)
+        csvPath = os.path.join(RESULTS_PATH, str(user_id), str(experiment_id))
+        savePath = TMP_PATH
+    textFilePath = TMP_PATH
+
+    #Check to see if the PNG folder is there. If not, this creates it
+    #PNG_PATH = os.path.join(DATA_PATH, "PNG")
+    #if not os.path.isfolder(PNG_PATH):
+    #   os.mkdir(PNG_PATH)
 
 # ==============================================================================
 # Begin plotting Sequence
 #
-    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    # PMP = S21 Magnitude Polar Plot
-    #
-    dpiScale = 200 #set the resolution of the plots
-    if chartType =='pmp':
-        fig_plot = plt.figure(figsize=(12, 9))
-        ax = plt.subplot(111, projection='polar')
-        ax.plot(Angle, Mag)
-        title='S21 Gain Antenna Pattern @ '+ str(frequencyInput/1000000000)+' Ghz'
-        plt.title(title, fontsize=18)
-        plt.rcParams['grid.linestyle'] = ':'
-        plt.axis()
-        plt.grid(linestyle='dashed')
-        ax.set_theta_direction(-1)
-        major_Yticks = np.arange(math.ceil((np.amax(Mag)-20)/5)*5, math.ceil(((np.amax(Mag))/5)), 10)
-        ax.set_yticks(major_Yticks, minor=TRUE)
-        major_Xticks = np.arange(0 * math.pi / 180, 360 * math.pi / 180, 30 * math.pi / 180)
-        plt.setp(ax.get_yticklabels(), rotation='horizontal', fontsize=11)
-        plt.setp(ax.get_xticklabels(), rotation='horizontal', fontsize=13)
-        plt.ylabel('(dB)',fontsize=14, rotation='horizontal')
-        plt.xlabel('Angle (Degrees)',fontsize=14, rotation ='horizontal')
-        ax.set_xticks(major_Xticks)
-        ax.set_theta_zero_location("N")
-        ax.yaxis.set_label_coords(-0.019, 0.35)
-        ax.set_ylim(-40, 0)
-        ax.set_rlabel_position(-106)  # get radial labels away from plotted line
-        #plt.show()
-        fig_plot.savefig(savePath+plotfilename,dpi=dpiScale)
-        file = open(textFilePath+"plotfilename.txt","w") #write filename of plot to text file
-        file.write(plotfilename)
-        file.close()
-    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    # PPR = S21 Phase Rectangluar Plot
-    #
-    elif chartType =='ppr':
-        fig_plot2 = plt.figure(figsize=(12, 9))
-        ax2 = plt.subplot(1, 1, 1)
-        ax2.set_title('S21 Phase Antenna Pattern @ '+ str(frequencyInput/1000000000)+' Ghz',fontsize=18)
-        plt.plot(Angle_Deg, Phase)
-        major_Yticks = [-90,-150,-120,-90,-60,-30,0,30,60,90,120,150,90]
-        ax2.set_yticks(major_Yticks, minor=FALSE)
-        plt.axis([-200, 200, (np.amin(Phase)-10), (np.amax(Phase)+10)])
-        plt.xlabel('Rotation Angle (Degrees)',fontsize=14)
-        plt.ylabel('Phase (Degrees)',fontsize=14)
-        plt.grid(True)
-        plt.setp(ax2.get_yticklabels(), fontsize=13)
-        plt.setp(ax2.get_xticklabels(), fontsize=13)
-        #plt.show()
-        fig_plot2.savefig(savePath+plotfilename,dpi=dpiScale)
-        file = open(textFilePath+"plotfilename.txt","w") #write filename of plot to text file
-        file.write(plotfilename)
-        file.close()
-    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    # RMR = S11 Magnitude Rectangular Plot
-    #
-    elif chartType =='rmr':
-        fig_plot3 = plt.figure(figsize=(12, 9))
-        ax3 = plt.subplot(1, 1, 1)
-        ax3.set_title('S11 Antenna Pattern @ '+ str(np.amin(Frequency)) +'-'+ str(np.amax(Frequency)) + ' Ghz', fontsize=18)
-        ax3.xaxis.set_major_locator(ticker.MultipleLocator(0.5))
-        plt.plot(Frequency, S11Mag)
-        plt.axis([np.amin(Frequency), np.amax(Frequency), np.amin(S11Mag)-2, np.amax(S11Mag)+2])
-        plt.xlabel('Frequency (GHz)',fontsize=14)
-        plt.ylabel('S11 (dB)',fontsize=14)
-        plt.setp(ax3.get_yticklabels(), fontsize=13)
-        plt.setp(ax3.get_xticklabels(), fontsize=13)
-        #ax3.set_title("S11")
-        plt.grid(True)
-        #plt.show()
-        fig_plot3.savefig(savePath+plotfilename, dpi=dpiScale)
-        file = open(textFilePath+"plotfilename.txt","w") #write filename of plot to text file
-        file.write(plotfilename)
-        file.close()
-    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    # RPR = S11 Smith Plot
-    #
-    elif chartType =='rpr':
-        fig_plot4 = plt.figure(figsize=(12, 9))
-        ax4 = plt.subplot(111, projection = 'smith')
-        ax4.set_title('S11 Antenna Pattern From '+ str(np.amin(Frequency)) +'-'+ str(np.amax(Frequency)) + ' Ghz',fontsize=18)
-        ax4.plot(S11Val_Complex)
-        #plt.show()
-        fig_plot4.savefig(savePath+plotfilename, dpi=dpiScale)
-        file = open(textFilePath+"plotfilename.txt","w") #write filename of plot to text file
-        file.write(plotfilename)
-        file.close()
-    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    # PMR = S21 Magnitude Rectangular Plot
-    #
-    elif chartType =='pmr':
-        fig_plot5 = plt.figure(figsize=(12, 9))
-        ax5 = plt.subplot(111)
-        ax5.set_title('S21 Gain Antenna Pattern @ '+ str(frequencyInput/1000000000)+' Ghz',fontsize=18)
-        ax5.plot(Angle*180/math.pi, Mag)
-        plt.xlabel('Angle (Degrees)',fontsize=14)
-        plt.ylabel('Gain (dBi)',fontsize=14)
-        plt.setp(ax5.get_yticklabels(), fontsize=13)
-        plt.setp(ax5.get_xticklabels(), fontsize=13)
-        plt.grid(True)
-        #plt.show()
-        fig_plot5.savefig(savePath+plotfilename,dpi=dpiScale)
-        file = open(textFilePath+"plotfilename.txt","w") #write filename of plot to text file
+    if chartType not in S21_CHARTS + S11_CHARTS:
+        return None     #no plot for this combination of chart type flags
+    renderer = PlotRenderer(os.path.join(csvPath, S21filename), os.path.join(csvPath, S11filename))
+    cache = PlotCache()
+    key = renderer.cache_key(cache, chartType, frequencyInput, plotFormat)
+    cached = cache.get(key, plotFormat)
+    if cached and copy_cached(cached, os.path.join(savePath, plotfilename)):
+        pass    #same plot already rendered, skip loading and drawing
+    else:
+        renderer.render(chartType, frequencyInput, os.path.join(savePath, plotfilename))
+        renderer.close()
+        cached = cache.put(key, os.path.join(savePath, plotfilename), plotFormat)
+    if writeTextFile:
+        file = open(os.path.join(textFilePath, "plotfilename.txt"),"w") #write filename of plot to text file
         file.write(plotfilename)
         file.close()
-    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    # maxGain = S21 Magnitude @ 0 degrees Rectangular Plot
-    #
-    elif chartType =='maxGain':
-        fig_plot6 = plt.figure(figsize=(12, 9))
-        ax6 = plt.subplot(1, 1, 1)
-        ax6.set_title('Test Antenna Gain',fontsize=18)
-        ax6.xaxis.set_major_locator(ticker.MultipleLocator(0.5))
-        plt.plot(Frequency, S11Mag)
-        plt.axis([np.amin(Frequency), np.amax(Frequency), np.amin(S11Mag)-2, np.amax(S11Mag)+2])
-        plt.xlabel('Frequency (GHz)',fontsize=14)
-        plt.ylabel('Gain (dB)',fontsize=14)
-        plt.setp(ax6.get_yticklabels(), fontsize=13)
-        plt.setp(ax6.get_xticklabels(), fontsize=13)
-        plt.grid(True)
-        #plt.show()
-        fig_plot6.savefig(savePath+plotfilename,dpi=dpiScale)
-
-    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    # s11 = S11 Magnitude Rectangular Plot
-    #
-    elif chartType =='s11':
-        fig_plot7 = plt.figure(figsize=(12, 9))
-        ax7 = plt.subplot(1, 1, 1)
-        ax7.set_title('S11',fontsize=18)
-        ax7.xaxis.set_major_locator(ticker.MultipleLocator(0.5))
-        plt.plot(Frequency, S11Mag)
-        plt.axis([np.amin(Frequency), np.amax(Frequency), np.amin(S11Mag)-2, np.amax(S11Mag)+2])
-        plt.xlabel('Frequency (GHz)',fontsize=14)
-        plt.ylabel('S11 (dB)',fontsize=14)
-        plt.setp(ax7.get_yticklabels(), fontsize=13)
-        plt.setp(ax7.get_xticklabels(), fontsize=13)
-        plt.grid(True)
-        #plt.show()
-        fig_plot7.savefig(savePath+plotfilename,dpi=dpiScale)
+    return cached
 
     # ==============================================================================
     # Begin exit Sequence
     #
 
+
+# ==============================================================================
+# Batch plotting
+#
+# Renders a list of (chart type, frequency in Hz) jobs for one experiment. The
+# data files are loaded once per process and each chart type's figure is reused
+# for every frequency. With processes > 1 the jobs are split across a process
+# pool and each worker keeps its own renderer.
+#
+_worker_renderer = None
+
+def _init_worker(S21path,S11path):
+    global _worker_renderer
+    _worker_renderer = PlotRenderer(S21path, S11path)
+
+def _render_job(job):
+    chartType, frequencyInput, filename = job
+    return _worker_renderer.render(chartType, frequencyInput, filename)
+
+def PlotBatch(experiment_id,user_id,jobs,processes=1,plotFormat='png'):
+    csvPath = os.path.join(RESULTS_PATH, str(user_id), str(experiment_id))
+    savePath = TMP_PATH
+    S21path = os.path.join(csvPath, 'data_S21.csv')
+    S11path = os.path.join(csvPath, 'data_S11.csv')
+
+    #S11 charts do not depend on frequency, so render them once and copy the file
+    renderJobs = []
+    copies = []
+    firstS11 = {}
+    plotfilenames = []
+    cache = PlotCache()
+    keyRenderer = PlotRenderer(S21path, S11path)
+    keys = {}
+    for chartType, frequencyInput in jobs:
+        if chartType not in S21_CHARTS + S11_CHARTS:
+            raise ValueError("Unknown chart type " + str(chartType))
+        filename = os.path.join(savePath, plot_filename(chartType, frequencyInput, plotFormat))
+        key = keyRenderer.cache_key(cache, chartType, frequencyInput, plotFormat)
+        cached = cache.get(key, plotFormat)
+        if cached and copy_cached(cached, filename):
+            plotfilenames.append(os.path.basename(filename))
+            continue
+        keys[filename] = key
+        if chartType in firstS11:
+            copies.append((firstS11[chartType], filename))
+            continue
+        if chartType in S11_CHARTS:
+            firstS11[chartType] = filename
+        renderJobs.append((chartType, frequencyInput, filename))
+
+    #Group jobs by chart type so each worker reuses its figures
+    renderJobs.sort(key=lambda job: job[0])
+    processes = min(processes, len(renderJobs))
+    if processes > 1:
+        pool = multiprocessing.Pool(processes, _init_worker, (S21path, S11path))
+        try:
+            chunk = int(math.ceil(len(renderJobs) / float(processes)))
+            pool.map(_render_job, renderJobs, chunk)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        renderer = PlotRenderer(S21path, S11path)
+        for chartType, frequencyInput, filename in renderJobs:
+            renderer.render(chartType, frequencyInput, filename)
+        renderer.close()
+
+    for chartType, frequencyInput, filename in renderJobs:
+        cache.put(keys[filename], filename, plotFormat)
+    for source, filename in copies:
+        shutil.copyfile(source, filename)
+
+    plotfilenames += [os.path.basename(job[2]) for job in renderJobs] + [os.path.basename(c[1]) for c in copies]
+    file = open(os.path.join(savePath, "plotfilenames.txt"),"w") #write filenames of plots to text file, one per line
+    file.write('\n'.join(plotfilenames))
+    file.close()
+    return plotfilenames
+#
+# End batch plotting
+# ==============================================================================
+
+
 if __name__ == "__main__":
-    logging.basicConfig(level=logging.DEBUG)
-    log = logging.getLogger("plotting")  # Get local logger
-    # Create and format handler to write to file "log_[MONTH]_[YEAR].log"
-    handler = logging.FileHandler('plotlog.log')
-    handler.setLevel(LOG_LEVEL)
-    formatter = logging.Formatter(
-            fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S')
-    handler.setFormatter(formatter)
-    # Add handler to logger and specify properties
-    log.addHandler(handler)
-    log.setLevel(logging.INFO)
+    log = get_logger("plotting")  # Get local logger
     try:
         args = sys.argv
         log.info(args)
-        Plotting(args[1], args[2], args[3], args[4], args[5], args[6], args[7], args[8], int(float(args[9])*1e9), int(args[10]), int(args[11]), int(args[12]))
+        if args[1] == 'batch':
+            #plotting.py batch experiment_id user_id chartTypes frequenciesGHz [processes]
+            #chart types and frequencies are comma separated, e.g. pmp,ppr 2.4,5.8
+            chartTypes = args[4].split(',')
+            frequencies = [int(float(f)*1e9) for f in args[5].split(',')]
+            processes = int(args[6]) if len(args) > 6 else 1
+            jobs = [(c, f) for c in chartTypes for f in frequencies]
+            log.info(PlotBatch(args[2], args[3], jobs, processes))
+        else:
+            Plotting(args[1], args[2], args[3], args[4], args[5], args[6], args[7], args[8], int(float(args[9])*1e9), int(args[10]), int(args[11]), int(args[12]))
         status = 0
     except BaseException as e:
         log.exception(e)
@@ -0,0 +1,218 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         polarization.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from functions import *
+from logSetup import get_logger
+# Standard libraries
+import sys
+
+# Installed libraries
+import numpy as np
+
+# File name suffixes for each computed dataset layer
+LAYER_SUFFIXES = {"ar": "_AR.csv",  # Axial ratio (dB)
+                  "tilt": "_TILT.csv",  # Ellipse tilt angle (degrees)
+                  "xpd": "_XPD.csv"}  # Co/cross-pol discrimination (dB)
+
+
+# ==============================================================================
+# Probe angle relative to the test antenna
+#
+def probe_angle(tpolar, cpolar):
+    # The test antenna field is measured along the chamber antenna's
+    # polarization as seen from the test antenna's own frame
+    return cpolar - tpolar
+
+
+#
+# End probe angle
+# ==============================================================================
+
+
+# ==============================================================================
+# Load polarization datasets onto a common angle x frequency grid
+#
+def load_datasets(filenames):
+    angles = None
+    freq = None
+    data = []
+    for filename in filenames:
+        a, f, d = S21csv_to_matrix(filename)
+        if angles is None:
+            angles, freq = a, f
+        elif (a.shape != angles.shape) or (f.shape != freq.shape) \
+                or not np.allclose(a, angles) or not np.allclose(f, freq):
+            raise ValueError("Dataset " + str(filename) + " is not on the "
+                             + "same angle x frequency grid as "
+                             + str(filenames[0]))
+        data.append(d)
+
+    # Stack into (polarization, angle, frequency)
+    return angles, freq, np.stack(data)
+
+
+#
+# End load datasets
+# ==============================================================================
+
+
+# ==============================================================================
+# Solve for orthogonal field components
+#
+def field_components(data, psi):
+    # Each dataset measures Ex*cos(psi) + Ey*sin(psi). Two datasets give an
+    # exact solution, more are combined in a least squares sense.
+    psi = np.radians(np.asarray(psi, dtype=float))
+    basis = np.stack((np.cos(psi), np.sin(psi)), axis=1)
+    if (len(psi) != len(data)) or (np.linalg.matrix_rank(basis) < 2):
+        raise ValueError("Need at least two datasets with non-parallel "
+                         + "polarizations")
+
+    # (2, P) x (P, angle, frequency) -> (2, angle, frequency)
+    ex, ey = np.tensordot(np.linalg.pinv(basis), data, axes=1)
+    return ex, ey
+
+
+#
+# End field components
+# ==============================================================================
+
+
+# ==============================================================================
+# Compute axial ratio, tilt angle, and cross-pol discrimination
+#
+def polarization_ellipse(ex, ey, reference=0):
+    # Stokes parameters
+    ex_pow = np.abs(ex) ** 2
+    ey_pow = np.abs(ey) ** 2
+    cross = np.conj(ex) * ey
+    s0 = ex_pow + ey_pow
+    s1 = ex_pow - ey_pow
+    s2 = 2 * cross.real
+    s3 = 2 * cross.imag
+
+    # Circular component magnitudes
+    right = np.sqrt(np.clip((s0 + s3) / 2, 0, None))
+    left = np.sqrt(np.clip((s0 - s3) / 2, 0, None))
+
+    # Co-pol along the reference angle, cross-pol orthogonal to it
+    ref = np.radians(reference)
+    co = ex * np.cos(ref) + ey * np.sin(ref)
+    xp = -ex * np.sin(ref) + ey * np.cos(ref)
+
+    # Linear polarization has infinite axial ratio/discrimination
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ar = 20 * np.log10((right + left) / np.abs(right - left))
+        xpd = 20 * np.log10(np.abs(co) / np.abs(xp))
+    tilt = np.degrees(np.arctan2(s2, s1)) / 2
+
+    return {"ar": ar, "tilt": tilt, "xpd": xpd}
+
+
+#
+# End polarization ellipse
+# ==============================================================================
+
+
+# ==============================================================================
+# Compute polarization layers from S21 files and write them to CSV
+#
+def polarization_layers(filenames, psi, output_base=None):
+    angles, freq, data = load_datasets(filenames)
+    ex, ey = field_components(data, psi)
+    layers = polarization_ellipse(ex, ey, reference=psi[0])
+
+    # Name output files after the first dataset by default
+    if output_base is None:
+        output_base = os.path.splitext(filenames[0])[0]
+
+    files = {}
+    for name, values in layers.items():
+        files[name] = matrix_to_csv(output_base + LAYER_SUFFIXES[name],
+                                    angles, freq, values)
+    return files
+
+
+#
+# End polarization layers
+# ==============================================================================
+
+
+# ==============================================================================
+# Main function
+#
+def polarization(args):
+    rv = 0  # Initialize return value
+
+    # --------------------------------------------------------------------------
+    # Set up log file
+    #
+    # Queued handlers write "log_[MONTH]_[YEAR].log" off the test thread
+    log = get_logger("polarization")  # Get local logger
+    #
+    # End log setup
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Parse CL arguments: output base, then (file, tpolar, cpolar) triples
+    #
+    try:
+        output_base = args[0]
+        if (len(args) < 7) or ((len(args) - 1) % 3 != 0):
+            raise IndexError()
+        filenames = args[1::3]
+        psi = [probe_angle(float(t), float(c))
+               for t, c in zip(args[2::3], args[3::3])]
+    except ValueError:
+        log.exception(
+                "ERROR: Could not parse command line arguments " + str(args))
+        return 1
+    except IndexError:
+        log.exception(
+                "ERROR: Invalid number of command line arguments. Expected "
+                "output name and at least two (file, tpolar, cpolar) sets, "
+                "received " + str(len(args)))
+        return 1
+    #
+    # End parse CL arguments
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Compute layers
+    #
+    try:
+        files = polarization_layers(filenames, psi, output_base)
+        for name in sorted(files):
+            log.info("Polarization layer " + name + " written to file: "
+                     + files[name])
+    except BaseException:
+        log.exception("Error from polarization:")
+        rv = 1
+    #
+    # End compute layers
+    # --------------------------------------------------------------------------
+
+    return rv  # Return 1 if error, 0 else
+
+
+#
+# End main function
+# ==============================================================================
+
+
+# ==============================================================================
+# Enter from command line
+#
+if __name__ == "__main__":
+    argv = sys.argv  # Store command line arguments
+    argv.pop(0)  # Remove file name
+    # Call main function and pass return status to system
+    sys.exit(polarization(argv))
+#
+# End enter from command line
+# ==============================================================================
@@ -7,10 +7,12 @@
 
 # Local files
 from functions import *
+from configStore import open_config_store
+from transport import write_job_metrics
+from jobRecords import JobRecord
+from logSetup import get_logger
 # Standard libraries
 import sys
-import logging
-from datetime import datetime
 
 # Installed libraries
 
@@ -18,8 +20,7 @@ from datetime import datetime
 motorSet = []  # Motor controller, contains motor objects
 mc = None
 
-db = None
-mycursor = None
+db = None  # Config option store
 
 
 # ==============================================================================
@@ -35,7 +36,7 @@ def sweep(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar):
     motorSet[STAND_ROTATION].goto_zero()
     # if spos: # Stand translation
     #     motorSet[S_TRANSLATION].rot_deg(STAND_OFFSET)
-    set_polarization(log, motorSet, tpolar, cpolar, mycursor)
+    set_polarization(log, motorSet, tpolar, cpolar, db)
     #
     # End reset motor positions
     # --------------------------------------------------------------------------
@@ -44,20 +45,9 @@ def sweep(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar):
     # Update database
     #
     if db.is_connected():
-        rowcount = mycursor.rowcount
-
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # Antenna polarization
-        #
         log.info("Updating tpolar and cpolar in sql database")
-        update_config_db(log, mycursor, tpolar, "'antenna_polarization'")
-        update_config_db(log, mycursor, cpolar, "'chamber_polarization'")
-
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # Commit changes
-        log.info("Committing changes")
-        db.commit()
-        if rowcount == mycursor.rowcount:
+        if not db.set_options({"antenna_polarization": tpolar,
+                               "chamber_polarization": cpolar}):
             log.warning("Failed to store updated antenna polarization data")
             print("Failed to record new polarization positions")
         else:
@@ -82,23 +72,8 @@ def polarization_rotation(args):
     # --------------------------------------------------------------------------
     # Set up log file
     #
-    logging.basicConfig(level=logging.DEBUG)
-    log = logging.getLogger("polarizationRotation")  # Get local logger
-    # Create and format handler to write to file "log_[MONTH]_[YEAR].log"
-    handler = logging.FileHandler(
-            'log_' + datetime.today().strftime('%m_%Y') + '.log')
-    handler.setLevel(LOG_LEVEL)
-    formatter = logging.Formatter(
-            fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S')
-    handler.setFormatter(formatter)
-    # Add handler to logger and specify properties
-    log.addHandler(handler)
-    log.setLevel(LOG_LEVEL)
-    # Get logger for pyvisa module and set level to log warnings and errors
-    sql_log = logging.getLogger('mysql.connector')
-    sql_log.setLevel(IMPORT_LOG_LEVEL)
-    sql_log.addHandler(handler)
+    # Queued handlers write "log_[MONTH]_[YEAR].log" off the test thread
+    log = get_logger("polarizationRotation")  # Get local logger
     log.info("")
     log.info("")
     #
@@ -140,6 +115,16 @@ def polarization_rotation(args):
     # End validate parameters
     # --------------------------------------------------------------------------
 
+    # --------------------------------------------------------------------------
+    # Start job record
+    #
+    job = JobRecord("polarizationRotation", fstart=f1, fstop=f2, points=nums,
+                    rstart=rstart, rstep=angle, rstop=rstop, tpolar=tpolar,
+                    cpolar=cpolar)
+    #
+    # End start job record
+    # --------------------------------------------------------------------------
+
     # --------------------------------------------------------------------------
     # Attempt test
     #
@@ -157,9 +142,9 @@ def polarization_rotation(args):
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         # Connect to database
         #
-        global db, mycursor
+        global db
         log.info("Attempting connection to database")
-        db, mycursor = db_init()
+        db = open_config_store(log)
         if db.is_connected():
             log.info("Successfully connected to database")
         else:
@@ -189,6 +174,7 @@ def polarization_rotation(args):
         print(e)
         log.exception('Error from runTest.main():')
         # Set return value to 1 (error)
+        job.fail()
         rv = 1
     #
     # End handle exceptions/errors
@@ -216,6 +202,19 @@ def polarization_rotation(args):
                 log.info("Closing database connection")
                 db.close()
 
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Write job record
+        #
+        job.finish(log, rv)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Write instrument I/O metrics
+        #
+        try:
+            write_job_metrics(log, "polarizationRotation")
+        except BaseException:
+            log.exception("Failed to write instrument I/O metrics")
+
         return rv  # Return 1 if error, 0 else
     #
     # End close instruments and return
@@ -5,38 +5,32 @@
 # Date:         May 2019
 ################################################################################
 
-from tkinter import *
 from functions import *
+from dataset import Dataset
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 import math
 import cmath
-import scipy.interpolate
-import matplotlib.ticker as ticker
 from decimal import *
 Cal_Test_filename = 's21Calibration.csv'
 
-def CalCalFactor():
+def CalCalFactor(tmpPath=None,dataPath=None):
+    tmpPath = tmpPath or TMP_PATH    #directories can be overridden, e.g. by processingBenchmark.py
+    dataPath = dataPath or DATA_PATH
+    import scipy.interpolate
+    from plotting import load_matplotlib
+    plt = load_matplotlib()
     Cal_Test_filename = 's21Calibration.csv'
-    No_of_points=801
     constant = 43.5
 
-    df1 = S11csv_to_dataframe(TMP_PATH + '\\' +Cal_Test_filename)  #load the Cal_Test_ csv file into a dataframe
-    Cal_Test_data = df1.as_matrix()              #convert dataframe to numpy array
-    FrequencyRAW, Cal_Test_Val = Cal_Test_data        #Split the array into two seperate arrays containing the frequency data and the Cal_Test_ data
+    calTest = Dataset.from_s11_csv(os.path.join(tmpPath, Cal_Test_filename))  #load the Cal_Test_ csv file
+    Frequency = calTest.freq / 1000000000           #convert 1000000000 to 1.0 GHz
 
-    #Convert Frequency Values from Scientific Notation to Integers
-    FrequencyFixed2 = [float(i) for i in FrequencyRAW]      #Get rid of the scientific notation in the frequency data
-    Frequency = [(float(i)/1000000000) for i in FrequencyFixed2]           #Get rid of the trailing decimal point in the frequency data
-    Cal_Test_Val_Fixed = [str(s).replace(' ', '') for s in Cal_Test_Val]    #Strip any spaces out of the Cal_Test_ data
-    Cal_Test_Val_Complex = [(complex(s.replace('i', 'j'))) for s in Cal_Test_Val_Fixed] #replace i with j in the complex Cal_Test_ complex number
-
-    Cal_Test_Mag = [20 * math.log10(abs(complex(s.replace('i', 'j')))) for s in Cal_Test_Val_Fixed] #calculate the magnitude from the Cal_Test_ data
-    Cal_Test_Phase = np.angle(Cal_Test_Val_Complex, deg=True)   #convert the phase from rads to degrees
+    Cal_Test_Mag = calTest.mag_db   #calculate the magnitude from the Cal_Test_ data
+    Cal_Test_Phase = calTest.phase   #phase in degrees
 
     freq1 = Frequency[0]
-    freq2 = Frequency[No_of_points-1]
+    freq2 = Frequency[-1]
 
     if ((freq1>=1.7)&(freq2<=2.6)):
         std_freq= [1.7000,1.7500,1.8000,1.8500,1.9000,1.9500,2.0000,2.0500,2.1000,2.1500,2.2000,2.2500,2.3000,2.3500,2.4000,2.4500 ,2.5000,2.5500,2.6000]
@@ -45,9 +39,8 @@ def CalCalFactor():
         std_freq=[0.3,0.4,0.5,0.6,0.7,0.8,0.9,1,1.25,1.5,1.75,2,2.5,3,3.5,4,4.5,5,5.5,6,6.5]
         std_Gain = [-40,-30,-20,-10,1.5,6.5,6.9,7.2,8.5,9.5,10.1,8.5,9.8,10.1,11.2,10.1,10.9,10.4,11.6,11.6,11.2]
 
-    step  = (freq2-freq1)/(No_of_points-1)
     pchip_Std_Gain = scipy.interpolate.PchipInterpolator(std_freq,std_Gain)
-    xi = np.arange(freq1,freq2+step,0.006875)
+    xi = Frequency      #standard gain at the measured frequencies, the axis is not uniform for segment sweeps
     interpMag = pchip_Std_Gain(xi)
 
     CalFactor = interpMag-Cal_Test_Mag;
@@ -68,18 +61,20 @@ def CalCalFactor():
     plt.ylabel('S21 Calibration Factor')
     plt.grid(True)
     plotfilename = 'GainCalibration.png'
-    fig_plot1.savefig(TMP_PATH+'/PNG/'+plotfilename)
+    fig_plot1.savefig(os.path.join(tmpPath, 'PNG', plotfilename))
+    plt.close(fig_plot1)     #free the figure, pyplot keeps every open figure alive
     CFFilename = ('CalFactor')                     #correct filename
-    calFactorDataframe.to_csv(DATA_PATH+'\\'+CFFilename+'.csv', sep=',', encoding='utf-8', index=False)   #Write to CSV
+    calFactorDataframe.to_csv(os.path.join(dataPath, CFFilename+'.csv'), sep=',', encoding='utf-8', index=False)   #Write to CSV
     return(1)
 
-def S21Normalize(S21filename,maxGain=False):
+def S21Normalize(S21filename,maxGain=False,dataPath=None):
+    dataPath = dataPath or DATA_PATH
     startColumn = 0 if maxGain else 1
     #Get the angle data
     print('BEGIN S21 NORM')
     calFactorFilename = ('CalFactor.csv')
-    dfS21 = S21orCFcsv_to_dataframe(DATA_PATH + '\\' + S21filename)  #load the s21 csv file into dataframe
-    dfCF  = S21orCFcsv_to_dataframe(DATA_PATH + '\\' + calFactorFilename)  #load the s21 csv file into dataframe
+    dfS21 = S21orCFcsv_to_dataframe(os.path.join(dataPath, S21filename))  #load the s21 csv file into dataframe
+    dfCF  = S21orCFcsv_to_dataframe(os.path.join(dataPath, calFactorFilename))  #load the s21 csv file into dataframe
 
     #Format the S21 Dataframe, Extract Angle Data
     s21FrequencyRAW = np.asarray(list(dfS21))     #Get the column headers (frequency) of the dataframe
@@ -93,6 +88,12 @@ def S21Normalize(S21filename,maxGain=False):
 
     #Format the CalFactor Dataframe
     dfCF.columns = dfCF.columns.astype(str)
+    #Cal factor is interpolated at each S21 frequency, so a segment sweep (non-uniform frequencies) can use a cal factor measured on a different grid
+    cfFrequency = np.asarray([float(i) for i in dfCF.columns])
+    cfValue = np.asarray(dfCF.iloc[0], dtype=float)
+    s21Frequency = np.asarray(s21FrequencyFixed2[startColumn:])
+    if len(s21Frequency) and ((s21Frequency.min() < cfFrequency.min()) or (s21Frequency.max() > cfFrequency.max())):
+        print('WARNING: S21 frequencies outside the cal factor range, using the nearest cal factor')
 
     Columns = (dfS21.shape[1])    #get the number of columns
     Rows = (dfS21.shape[0])       #get the number of rows
@@ -121,8 +122,7 @@ def S21Normalize(S21filename,maxGain=False):
             s = (s).replace(']', '')
             S21_Complex = np.append(S21_Complex,complex(s))
 
-        dfCF.index = ['Value']
-        constant = dfCF.loc['Value',currentFrequency]
+        constant = np.interp(float(currentFrequency), cfFrequency, cfValue)
         constantF = 10**(constant/20);
 
         newS21 = [i*constantF for i in S21_Complex]
@@ -133,5 +133,5 @@ def S21Normalize(S21filename,maxGain=False):
 
         dfS21.iloc[:,y] = newColumn
 
-    dfS21.to_csv(DATA_PATH + '\\' + S21filename, sep=',', encoding='utf-8', index=False)   #Write to CSV
+    dfS21.to_csv(os.path.join(dataPath, S21filename), sep=',', encoding='utf-8', index=False)   #Write to CSV
     return S21filename+'.csv'
@@ -0,0 +1,328 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         processingBenchmark.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from functions import *
+from dataset import Dataset
+# Standard libraries
+import sys
+import glob
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from datetime import datetime
+from statistics import median
+
+# Installed libraries
+
+# Measurements shipped with the repo
+BENCH_DATA_PATH = os.path.join(SRC_PATH, "data")
+
+# Dataset drawn by the plot benchmarks (S11 and S21 files with this stamp)
+PLOT_DATASET = "20190410110151"
+
+# Regressions smaller than this are timer noise, not reported (seconds)
+MIN_DELTA_S = 0.0005
+
+
+# ==============================================================================
+# Bundled data files matching a pattern
+#
+def data_files(pattern):
+    return sorted(glob.glob(os.path.join(BENCH_DATA_PATH, pattern)))
+
+
+#
+# End data files
+# ==============================================================================
+
+
+# ==============================================================================
+# Analyzer style data string (":CALC:DATA:SDAT?") for a row of complex values
+#
+def raw_trace(values):
+    return ",".join("%+.11E,%+.11E" % (v.real, v.imag) for v in values) + "\n"
+
+
+#
+# End raw trace
+# ==============================================================================
+
+
+# ==============================================================================
+# Time a call and record its peak traced memory
+#
+# setup() runs before each call and its return value is passed to func, so
+# copying input files or building objects is not timed. teardown() gets the
+# same value after each call.
+#
+def measure(func, repeats, setup=None, teardown=None):
+    def once(timed):
+        arg = setup() if setup else None
+        try:
+            if timed:
+                t0 = time.perf_counter()
+                func(arg)
+                return time.perf_counter() - t0
+            tracemalloc.start()
+            try:
+                func(arg)
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        finally:
+            if teardown:
+                teardown(arg)
+
+    # First call loads lazily imported modules and warms file caches
+    once(True)
+    times = sorted(once(True) for i in range(repeats))
+    # Separate call, tracemalloc slows allocation heavy code down
+    peak = once(False)
+    return {"median_s": median(times), "min_s": times[0], "runs": repeats,
+            "peak_kib": peak / 1024.0}
+
+
+#
+# End measure
+# ==============================================================================
+
+
+# ==============================================================================
+# Benchmark cases, (name, func, setup, teardown)
+#
+def benchmark_cases(work):
+    from process import S21Normalize, CalCalFactor
+    from plotting import PlotRenderer, S21_CHARTS, S11_CHARTS
+    cases = []
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # CSV loaders
+    #
+    for f in data_files("*_s11.csv") + [os.path.join(BENCH_DATA_PATH,
+                                                     "s21Calibration.csv")]:
+        cases.append(("S11csv_to_dataframe:" + os.path.basename(f),
+                      lambda arg, f=f: S11csv_to_dataframe(f), None, None))
+    for f in data_files("*_s21*.csv") + [os.path.join(BENCH_DATA_PATH,
+                                                      "CalFactor.csv")]:
+        cases.append(("S21orCFcsv_to_dataframe:" + os.path.basename(f),
+                      lambda arg, f=f: S21orCFcsv_to_dataframe(f), None, None))
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # Analyzer string formatting, one sweep of each S21 file
+    #
+    for f in data_files("*_s21.csv"):
+        raw = raw_trace(Dataset.from_s21_csv(f).data[0])
+        cases.append(("format_string:" + os.path.basename(f),
+                      lambda arg, raw=raw: format_string(raw), None, None))
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # Normalization and calibration, on copies in the work directory
+    #
+    shutil.copy(os.path.join(BENCH_DATA_PATH, "CalFactor.csv"), work)
+    for f in data_files("*_s21.csv"):
+        name = os.path.basename(f)
+        cases.append(("S21Normalize:" + name,
+                      lambda arg, name=name: S21Normalize(name,
+                                                          dataPath=work),
+                      lambda f=f: shutil.copy(f, work), None))
+
+    cal = os.path.join(work, "cal")
+    os.makedirs(os.path.join(cal, "PNG"))
+    shutil.copy(os.path.join(BENCH_DATA_PATH, "s21Calibration.csv"), cal)
+    cases.append(("CalCalFactor:s21Calibration.csv",
+                  lambda arg: CalCalFactor(tmpPath=cal, dataPath=cal),
+                  None, None))
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # Plot types, each on a new renderer (first plot builds the figure)
+    #
+    s21 = os.path.join(BENCH_DATA_PATH, PLOT_DATASET + "_s21.csv")
+    s11 = os.path.join(BENCH_DATA_PATH, PLOT_DATASET + "_s11.csv")
+
+    def new_renderer():
+        renderer = PlotRenderer(s21, s11)
+        # Data loading is timed by the loader cases
+        renderer.s21
+        renderer.s11
+        return renderer
+
+    for chart in S21_CHARTS + S11_CHARTS:
+        filename = os.path.join(work, chart + ".png")
+        cases.append(("Plotting:" + chart,
+                      lambda renderer, chart=chart, filename=filename:
+                      renderer.render(chart, 2e9, filename),
+                      new_renderer, lambda renderer: renderer.close()))
+    return cases
+
+
+#
+# End benchmark cases
+# ==============================================================================
+
+
+# ==============================================================================
+# Current git commit, None outside a work tree
+#
+def git_commit():
+    try:
+        out = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                      cwd=SRC_PATH, stderr=subprocess.DEVNULL)
+        return out.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+#
+# End git commit
+# ==============================================================================
+
+
+# ==============================================================================
+# Run the benchmark cases, returns the report
+#
+def run_benchmarks(repeats=5, match=None):
+    import numpy
+    import pandas
+    report = {"created": datetime.today().isoformat(" ", "seconds"),
+              "commit": git_commit(), "python": platform.python_version(),
+              "numpy": numpy.__version__, "pandas": pandas.__version__,
+              "repeats": repeats, "results": {}}
+
+    work = tempfile.mkdtemp(prefix="procbench")
+    try:
+        for name, func, setup, teardown in benchmark_cases(work):
+            if match and match not in name:
+                continue
+            try:
+                result = measure(func, repeats, setup, teardown)
+                print("%-50s %10.2f ms %10.0f KiB" % (
+                    name, result["median_s"] * 1e3, result["peak_kib"]))
+            except Exception as e:
+                # e.g. plotting without matplotlib, keep the other cases
+                result = {"error": type(e).__name__ + ": " + str(e)}
+                print("%-50s %s" % (name, result["error"]))
+            report["results"][name] = result
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return report
+
+
+#
+# End run benchmarks
+# ==============================================================================
+
+
+# ==============================================================================
+# Compare two reports, returns the regressed case names
+#
+def compare_reports(base, new, tolerance=0.1):
+    regressions = []
+    print("%-50s %10s %10s %8s %8s" % ("case", "base ms", "new ms", "time",
+                                       "memory"))
+    for name in sorted(set(base["results"]) | set(new["results"])):
+        b = base["results"].get(name, {})
+        n = new["results"].get(name, {})
+        if "median_s" not in b or "median_s" not in n:
+            print("%-50s %s" % (name, "missing in base" if "median_s" in n
+                                else "missing in new"))
+            continue
+        time_ratio = n["median_s"] / max(b["median_s"], 1e-9)
+        mem_ratio = n["peak_kib"] / max(b["peak_kib"], 1e-9)
+        slower = ((time_ratio > 1 + tolerance)
+                  and (n["median_s"] - b["median_s"] > MIN_DELTA_S))
+        bigger = mem_ratio > 1 + tolerance
+        flag = "  <- " + " and ".join(
+                [w for w, f in (("slower", slower), ("more memory", bigger))
+                 if f]) if (slower or bigger) else ""
+        print("%-50s %10.2f %10.2f %7.2fx %7.2fx%s" % (
+            name, b["median_s"] * 1e3, n["median_s"] * 1e3, time_ratio,
+            mem_ratio, flag))
+        if slower or bigger:
+            regressions.append(name)
+    return regressions
+
+
+#
+# End compare reports
+# ==============================================================================
+
+
+# ==============================================================================
+# Main function
+#
+def processingBenchmark(args):
+    parser = argparse.ArgumentParser(
+            prog="processingBenchmark.py",
+            description="Time data processing on the bundled data files")
+    commands = parser.add_subparsers(dest="command")
+
+    run = commands.add_parser("run", help="run benchmarks, write a report")
+    run.add_argument("--repeats", type=int, default=5)
+    run.add_argument("--match", help="only cases containing this text")
+    run.add_argument("--output", help="report file (default "
+                                      "processing_<commit>.json)")
+
+    compare = commands.add_parser("compare", help="compare two reports")
+    compare.add_argument("base")
+    compare.add_argument("new")
+    compare.add_argument("--tolerance", type=float, default=0.1,
+                         help="allowed slowdown/growth fraction")
+
+    opts = parser.parse_args(args)
+
+    # --------------------------------------------------------------------------
+    # Compare reports, non-zero return status on regression
+    #
+    if opts.command == "compare":
+        with open(opts.base) as f:
+            base = json.load(f)
+        with open(opts.new) as f:
+            new = json.load(f)
+        print("base " + str(base.get("commit")) + " (" + base["created"]
+              + "), new " + str(new.get("commit")) + " (" + new["created"]
+              + ")")
+        regressions = compare_reports(base, new, opts.tolerance)
+        print(str(len(regressions)) + " regression(s)")
+        return 1 if regressions else 0
+
+    # --------------------------------------------------------------------------
+    # Run benchmarks
+    #
+    if opts.command != "run":
+        parser.print_help()
+        return 1
+
+    report = run_benchmarks(opts.repeats, opts.match)
+    output = opts.output or ("processing_" + (report["commit"] or "local")
+                             + ".json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=1, sort_keys=True)
+    print("Report written to file: " + output)
+    return 0
+
+
+#
+# End main function
+# ==============================================================================
+
+
+# ==============================================================================
+# Enter from command line
+#
+if __name__ == "__main__":
+    argv = sys.argv  # Store command line arguments
+    argv.pop(0)  # Remove file name
+    # Call main function and pass return status to system
+    sys.exit(processingBenchmark(argv))
+#
+# End enter from command line
+# ==============================================================================
@@ -0,0 +1,180 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         resourceRegistry.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from serverInfo import *
+# Standard libraries
+import re
+import json
+from datetime import datetime
+
+# Installed libraries
+
+
+# ==============================================================================
+# Instrument probes, return the fingerprint or None if it is not the
+# instrument
+#
+def probe_analyzer(resource):
+    idn = resource.query("*IDN?").strip()
+    return idn if ANALYZER_IDN_MATCH in idn else None
+
+
+def configure_vxm(resource):
+    resource.write_termination = '\r'
+    resource.read_termination = '\r'
+
+
+def probe_vxm(resource):
+    # The VXM has no *IDN?, it is recognized by its position reply
+    resource.write("F")  # On-line mode, echo off
+    reply = resource.query("X").strip()
+    return "VXM" if re.match(r"^[-+]?\d+$", reply) else None
+
+
+#
+# End instrument probes
+# ==============================================================================
+
+# Address prefixes searched when enumerating, set up before the probe, probe,
+# address tried before enumerating
+INSTRUMENTS = {
+    "analyzer": {"interfaces": ("GPIB",), "configure": None,
+                 "probe": probe_analyzer, "default": None},
+    "motor controller": {"interfaces": ("ASRL", "COM"),
+                         "configure": configure_vxm, "probe": probe_vxm,
+                         "default": MOTOR_CONTROLLER_ADDRESS}}
+
+
+# ==============================================================================
+# Load the registry, {name: {"address", "fingerprint", "updated"}}
+#
+def load_registry(filename=RESOURCE_REGISTRY_FILE):
+    try:
+        with open(filename) as f:
+            registry = json.load(f)
+        if isinstance(registry, dict):
+            return registry
+    except (IOError, OSError, ValueError):
+        pass
+    return {}
+
+
+#
+# End load registry
+# ==============================================================================
+
+
+# ==============================================================================
+# Save the registry
+#
+def save_registry(registry, filename=RESOURCE_REGISTRY_FILE):
+    try:
+        tmp = filename + ".tmp" + str(os.getpid())
+        with open(tmp, "w") as f:
+            json.dump(registry, f, indent=1, sort_keys=True)
+        os.replace(tmp, filename)
+    except (IOError, OSError):
+        pass  # Registry is optional, enumerate again next time
+
+
+#
+# End save registry
+# ==============================================================================
+
+
+# ==============================================================================
+# Open an address and probe it, returns (resource, fingerprint) or
+# (None, None)
+#
+def try_address(log, rm, address, spec):
+    try:
+        resource = rm.open_resource(address)
+    except Exception:
+        log.debug("Could not open %s", address)
+        return None, None
+
+    fingerprint = None
+    try:
+        if spec["configure"]:
+            spec["configure"](resource)
+        # Short timeout, a wrong device may never answer
+        timeout = resource.timeout
+        resource.timeout = min(timeout or PROBE_TIMEOUT, PROBE_TIMEOUT)
+        fingerprint = spec["probe"](resource)
+        resource.timeout = timeout
+    except Exception:
+        log.debug("No reply from %s", address)
+
+    if fingerprint is None:
+        resource.close()
+        return None, None
+    return resource, fingerprint
+
+
+#
+# End try address
+# ==============================================================================
+
+
+# ==============================================================================
+# Open an instrument, returns (resource, fingerprint) or (None, None)
+#
+# The cached address (then the configured default) is opened directly and
+# only if it does not answer with the right fingerprint are the resources
+# enumerated. The address found is written back to the registry.
+#
+def open_instrument(log, rm, name, filename=RESOURCE_REGISTRY_FILE):
+    spec = INSTRUMENTS[name]
+    registry = load_registry(filename)
+    entry = registry.get(name) or {}
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # Known addresses
+    #
+    known = []
+    for address in (entry.get("address"), spec["default"]):
+        if address and (address not in known):
+            known.append(address)
+    resource = None
+    for address in known:
+        resource, fingerprint = try_address(log, rm, address, spec)
+        if resource is not None:
+            break
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # Enumerate
+    #
+    if resource is None:
+        log.info("Searching for " + name + " resources")
+        for address in rm.list_resources():
+            if (address in known) \
+                    or not address.upper().startswith(spec["interfaces"]):
+                continue
+            resource, fingerprint = try_address(log, rm, address, spec)
+            if resource is not None:
+                break
+    if resource is None:
+        log.warning("No " + name + " found")
+        return None, None
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # Remember the address
+    #
+    if (entry.get("address") != address) \
+            or (entry.get("fingerprint") != fingerprint):
+        log.info("Found " + name + " at " + address + ": " + fingerprint)
+        registry[name] = {"address": address, "fingerprint": fingerprint,
+                          "updated": datetime.today().isoformat(" ",
+                                                                "seconds")}
+        save_registry(registry, filename)
+    return resource, fingerprint
+
+
+#
+# End open instrument
+# ==============================================================================
@@ -8,11 +8,12 @@
 # Local files
 from networkAnalyzer import NetworkAnalyzer
 from functions import *
-from plotting import Plotting
+from configStore import open_config_store
+from transport import write_job_metrics
+from jobRecords import JobRecord
+from logSetup import get_logger
 # Standard libraries
 import sys
-import logging
-from datetime import datetime
 import numpy
 
 # Installed libraries
@@ -21,8 +22,7 @@ import numpy
 motorSet = []  # Motor controller, contains motor objects
 mc = None
 
-db = None
-mycursor = None
+db = None  # Config option store
 
 analyzer = None
 
@@ -46,8 +46,7 @@ def sweep_s11(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar):
     # --------------------------------------------------------------------------
     # Reset motor positions
     #
-    motorSet[STAND_ROTATION].goto_zero()
-    set_polarization(log, motorSet, tpolar, cpolar, mycursor)
+    set_polarization(log, motorSet, tpolar, cpolar, db)
     #
     # End reset motor positions
     # --------------------------------------------------------------------------
@@ -56,7 +55,7 @@ def sweep_s11(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar):
     # Move test antenna to start degree position
     #
     log.info("Start Position: " + str(rstart))
-    motorSet[M1].rot_deg(rstart)
+    motorSet[STAND_ROTATION].goto_angle(rstart)
     log.info("Motor setup complete")
     #
     # End move test antenna to start position
@@ -76,7 +75,6 @@ def sweep_s11(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar):
     channel = 1
     trace = 1
     analyzer.setup(channel, trace)
-    # analyzer.enable_display(False)
 
     # Set start frequency
     start = float(analyzer.set_start(channel, f1))
@@ -117,15 +115,17 @@ def sweep_s11(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar):
 
     # --------------------------------------------------------------------------
     # Check for network analyzer errors
-    log.info("Checking network analyzer error queue")
-    err_nums, err_msgs = analyzer.get_errors()
-    if len(err_nums) > 0:
-        msg = "Error in setting network analyzer parameters"
-        print(msg)
-        log.warning(msg)
-    else:
-        # No errors
-        log.info("No network analyzer errors detected")
+    # Intermediate check, skipped by the fast acquisition profile
+    if analyzer.profile.errorPolls:
+        log.info("Checking network analyzer error queue")
+        err_nums, err_msgs = analyzer.get_errors()
+        if len(err_nums) > 0:
+            msg = "Error in setting network analyzer parameters"
+            print(msg)
+            log.warning(msg)
+        else:
+            # No errors
+            log.info("No network analyzer errors detected")
     #
     # --------------------------------------------------------------------------
 
@@ -139,8 +139,7 @@ def sweep_s11(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar):
     print("Number of Points: " + str(nums))
     analyzer.set_measurement(channel, trace, 2, 2)
     analyzer.trigger()
-    analyzer.update_display()
-    analyzer.auto_scale(channel, trace)
+    analyzer.show_sweep(channel, trace)
     s11Freq = analyzer.get_x(channel)
     s11Data = analyzer.get_corr_data(channel)
     # s11Data = analyzer.get_form_data(channel)
@@ -170,7 +169,7 @@ def sweep_s11(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar):
     # --------------------------------------------------------------------------
     # Reset motor positions
     #
-    motorSet[STAND_ROTATION].goto_zero()
+    motorSet[STAND_ROTATION].goto_angle(0)
     #
     # End reset motor positions
     # --------------------------------------------------------------------------
@@ -188,28 +187,13 @@ def sweep_s11(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar):
     if db.is_connected():
         fstart = f1 / 1e9
         fstop = f2 / 1e9
-        rowcount = mycursor.rowcount
-
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # Antenna polarization
-        #
-        log.info("Updating tpolar and cpolar in sql database")
-        update_config_db(log, mycursor, 0, "'antenna_polarization'")
-        update_config_db(log, mycursor, 0, "'chamber_polarization'")
-
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # Network analyzer parameters
-        #
-        log.info("Updating fstart, fstop, and nums in sql database")
-        update_config_db(log, mycursor, fstart, "'frequency_start'")
-        update_config_db(log, mycursor, fstop, "'frequency_stop'")
-        update_config_db(log, mycursor, nums, "'num_steps'")
-
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # Commit changes
-        log.info("Committing changes")
-        db.commit()
-        if rowcount == mycursor.rowcount:
+        log.info("Updating tpolar, cpolar, fstart, fstop, and nums in sql "
+                 "database")
+        if not db.set_options({"antenna_polarization": 0,
+                               "chamber_polarization": 0,
+                               "frequency_start": fstart,
+                               "frequency_stop": fstop,
+                               "num_steps": nums}):
             log.warning("Failed to store updated antenna polarization data")
 
     #
@@ -219,6 +203,7 @@ def sweep_s11(log, f1, f2, nums, rstart, angle, rstop, tpolar, cpolar):
     # --------------------------------------------------------------------------
     # Call plotting function and write zip file
     #
+    from plotting import Plotting
     Plotting(f1, f2, nums, rstart, angle, rstop, 0, 0, 0, 0, 0, 0, "s11")
     # create_zip(file_name, [s11_filename])
     #
@@ -240,26 +225,8 @@ def s11(args):
     # --------------------------------------------------------------------------
     # Set up log file
     #
-    logging.basicConfig(level=logging.DEBUG)
-    log = logging.getLogger("S11")  # Get local logger
-    # Create and format handler to write to file "log_[MONTH]_[YEAR].log"
-    handler = logging.FileHandler(
-            'log_' + datetime.today().strftime('%m_%Y') + '.log')
-    handler.setLevel(LOG_LEVEL)
-    formatter = logging.Formatter(
-            fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S')
-    handler.setFormatter(formatter)
-    # Add handler to logger and specify properties
-    log.addHandler(handler)
-    log.setLevel(LOG_LEVEL)
-    # Get logger for pyvisa module and set level to log warnings and errors
-    visa_log = logging.getLogger('pyvisa')
-    visa_log.setLevel(IMPORT_LOG_LEVEL)
-    visa_log.addHandler(handler)
-    sql_log = logging.getLogger('mysql.connector')
-    sql_log.setLevel(IMPORT_LOG_LEVEL)
-    sql_log.addHandler(handler)
+    # Queued handlers write "log_[MONTH]_[YEAR].log" off the test thread
+    log = get_logger("S11")  # Get local logger
     log.info("")
     log.info("")
     #
@@ -302,6 +269,15 @@ def s11(args):
     # End validate parameters
     # --------------------------------------------------------------------------
 
+    # --------------------------------------------------------------------------
+    # Start job record
+    #
+    job = JobRecord("s11", fstart=f1, fstop=f2, points=nums, rstart=rstart,
+                    rstep=angle, rstop=rstop, tpolar=tpolar, cpolar=cpolar)
+    #
+    # End start job record
+    # --------------------------------------------------------------------------
+
     # --------------------------------------------------------------------------
     # Attempt test
     #
@@ -327,9 +303,9 @@ def s11(args):
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         # Connect to database
         #
-        global db, mycursor
+        global db
         log.info("Attempting connection to database")
-        db, mycursor = db_init()
+        db = open_config_store(log)
         if db.is_connected():
             log.info("Successfully connected to database")
         else:
@@ -360,6 +336,7 @@ def s11(args):
         print(e)
         log.exception('Error from runTest.main():')
         # Set return value to 1 (error)
+        job.fail()
         rv = 1
     #
     # End handle exceptions/errors
@@ -395,6 +372,19 @@ def s11(args):
                 log.info("Closing database connection")
                 db.close()
 
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Write job record
+        #
+        job.finish(log, rv)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Write instrument I/O metrics
+        #
+        try:
+            write_job_metrics(log, "s11")
+        except BaseException:
+            log.exception("Failed to write instrument I/O metrics")
+
         return rv  # Return 1 if error, 0 else
     #
     # End close instruments and return
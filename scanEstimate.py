@@ -0,0 +1,322 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         scanEstimate.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from functions import *
+from settle import SettlePolicy
+import motors
+# Standard libraries
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Installed libraries
+
+# Fixed waits of the pattern routine (seconds)
+TRIGGER_MIN_S = 1.0  # NetworkAnalyzer.trigger() sleeps this long
+ANALYZER_SETUP_S = 2.0  # Load state and channel set up
+
+# Corrected data read, "%+.11E,%+.11E," per point on GPIB
+TRANSFER_BYTES_PER_POINT = 36
+GPIB_BYTES_PER_S = 300e3
+GPIB_COMMAND_S = 0.002
+
+
+# ==============================================================================
+# Number of angle steps of a pattern scan, a 0-360 scan does not measure 360
+#
+def scan_steps(rstart, angle, rstop):
+    ant_no = int(np.floor((rstop - rstart) / angle) + 1)
+    if (rstop == 360) and (rstart == 0):
+        ant_no = ant_no - 1
+    return ant_no
+
+
+#
+# End scan steps
+# ==============================================================================
+
+
+# ==============================================================================
+# Predicted sweep and data read times (seconds), used when nothing has been
+# measured yet
+#
+def sweep_time(nums, if_bandwidth=IF_BANDWIDTH, segments=None):
+    # About one IF period per point
+    if segments:
+        return sum(s.points / float(s.ifbw or if_bandwidth)
+                   for s in segments)
+    return nums / float(if_bandwidth)
+
+
+def transfer_time(nums):
+    return GPIB_COMMAND_S + nums * TRANSFER_BYTES_PER_POINT / GPIB_BYTES_PER_S
+
+
+#
+# End predicted sweep and data read times
+# ==============================================================================
+
+
+# ==============================================================================
+# Stand move of Motor.goto_angle() from a position, returns the position after
+# it and the move time (seconds)
+#
+def angle_move(motor, target, position, span=0):
+    goal = motor.nearest_angle(target, position, span)
+    if abs(goal - position) <= motor.tolerance:
+        return position, 0.0
+    return goal, motor.move_time(goal - position)
+
+
+#
+# End angle move
+# ==============================================================================
+
+
+# ==============================================================================
+# Expected duration of antennaMeasurement.sweep() (seconds)
+#
+# Motor moves come from each motor's motion model. The stand starts at
+# position degrees, the other motors at zero. Pass the sweep time reported by
+# the analyzer and a measured data read time when they are known. Processing
+# after the scan (normalization, zip, catalog) is not included. Returns the
+# time of each part and the total.
+#
+def estimate_sweep(motorSet, f1, f2, nums, rstart, angle, rstop, tpolar=0,
+                   cpolar=0, spos=True, segments=None,
+                   if_bandwidth=IF_BANDWIDTH, sweep_s=None, transfer_s=None,
+                   hardware_trigger=False, position=0,
+                   settle_mode=SETTLE_MODE):
+    stand = motorSet[STAND_ROTATION]
+    ant_no = scan_steps(rstart, angle, rstop)
+    if segments:
+        nums = sum(s.points for s in segments)
+    if sweep_s is None:
+        sweep_s = sweep_time(nums, if_bandwidth, segments)
+    if transfer_s is None:
+        transfer_s = transfer_time(nums)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # Motors to the start positions and back, the stand the shorter way
+    #
+    start, positioning = angle_move(stand, rstart, position, rstop - rstart)
+    positioning += motorSet[T_POLARIZATION].move_time(tpolar) \
+        + motorSet[C_POLARIZATION].move_time(cpolar)
+    reset = angle_move(stand, 0, start + rstop - rstart)[1]
+    if spos:
+        positioning += motorSet[S_TRANSLATION].move_time(STAND_OFFSET)
+        reset += motorSet[S_TRANSLATION].move_time(-STAND_OFFSET)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # Angle steps, the last rotation covers the rest of the range
+    #
+    settle = SettlePolicy(None, stand, mode=settle_mode)
+    move = stand.move_time(angle) + settle.delay(angle)
+    if hardware_trigger:
+        # The controller steps while the data is read
+        measure = sweep_s + transfer_s
+        step = sweep_s + max(transfer_s, move)
+    else:
+        measure = max(TRIGGER_MIN_S, sweep_s) + transfer_s
+        step = measure + move
+    last = rstop - rstart - (ant_no - 1) * angle
+    scan = (ant_no - 1) * step + measure + stand.move_time(last) \
+        + settle.delay(last)
+
+    # S11 sweep reads the frequencies too
+    s11 = measure + transfer_time(nums)
+    total = positioning + ANALYZER_SETUP_S + s11 + scan + reset
+    return {"angle_steps": ant_no, "sweep_s": sweep_s,
+            "transfer_s": transfer_s, "step_s": step,
+            "positioning_s": positioning, "setup_s": ANALYZER_SETUP_S,
+            "s11_s": s11, "scan_s": scan, "reset_s": reset, "total_s": total}
+
+
+#
+# End estimate sweep
+# ==============================================================================
+
+
+# ==============================================================================
+# Motor set with the speeds of motors_init(), for estimates without a
+# controller
+#
+def model_motors():
+    motorSet = [motors.B4836(None, 1), motors.B4836(None, 2),
+                motors.B5990(None, 3), motors.B4836(None, 4)]
+    for m in motorSet:
+        m.acceleration = MOTOR_ACCELERATION
+    motorSet[STAND_ROTATION].speed = STAND_SPEED
+    motorSet[STAND_ROTATION].wrapRange = (STAND_WRAP_MIN, STAND_WRAP_MAX)
+    motorSet[STAND_ROTATION].tolerance = STAND_ANGLE_TOLERANCE
+    motorSet[S_TRANSLATION].speed = TRANSLATION_SPEED
+    for m in (motorSet[T_POLARIZATION], motorSet[C_POLARIZATION]):
+        m.speed = POLARIZATION_SPEED
+    return motorSet
+
+
+#
+# End model motors
+# ==============================================================================
+
+
+# ==============================================================================
+# Live ETA of a running scan
+#
+# Starts from the estimate and follows the measured time per angle step once
+# steps complete. Each update rewrites ETA_FILE, progress is logged every
+# tenth of the scan. Use as a context manager, the file is removed on exit.
+#
+class ScanEta(object):
+
+    # --------------------------------------------------------------------------
+    # Initialize ETA object, marks the scan start
+    #
+    def __init__(self, log, estimate, filename=None):
+        self.log = log
+        self.estimate = estimate
+        self.filename = filename or ETA_FILE
+        self.steps = estimate["angle_steps"]
+        self.done = 0
+        self.reported = 0  # Tenths of the scan logged
+        self.t0 = time.time()
+        log.info("Estimated scan time %.0f s (%.2f s per angle step, "
+                 "%d steps)", estimate["scan_s"], estimate["step_s"],
+                 self.steps)
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Seconds left until the motors are back at zero
+    #
+    def remaining(self):
+        if self.done:
+            per_step = (time.time() - self.t0) / self.done
+        else:
+            per_step = self.estimate["step_s"]
+        return (self.steps - self.done) * per_step + self.estimate["reset_s"]
+
+    #
+    # End remaining
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Angle steps done, returns the seconds left
+    #
+    def update(self, done):
+        self.done = done
+        remaining = self.remaining()
+        eta = datetime.today() + timedelta(seconds=remaining)
+        text = "Step %d of %d, %.0f s remaining, done at %s" % (
+            done, self.steps, remaining, eta.strftime("%H:%M:%S"))
+        if done * 10 // self.steps > self.reported:
+            self.reported = done * 10 // self.steps
+            self.log.info(text)
+        self.write(text + "\n")
+        return remaining
+
+    #
+    # End update
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Rewrite the ETA file, the file is optional
+    #
+    def write(self, text):
+        try:
+            tmp = self.filename + ".tmp" + str(os.getpid())
+            with open(tmp, "w") as f:
+                f.write(text)
+            os.replace(tmp, self.filename)
+        except (IOError, OSError):
+            pass
+
+    #
+    # End write
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Remove the ETA file at the end of the scan
+    #
+    def close(self):
+        try:
+            os.remove(self.filename)
+        except OSError:
+            pass
+
+    #
+    # End close
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Context manager, closes on exit
+    #
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    #
+    # End context manager
+    # --------------------------------------------------------------------------
+
+
+#
+# End ScanEta
+# ==============================================================================
+
+
+# ==============================================================================
+# Main function, prints the estimate for antennaMeasurement arguments
+#
+def scanEstimate(args):
+    try:
+        f1 = float(args[0]) * 1e9
+        f2 = float(args[1]) * 1e9
+        nums = int(args[2])
+        rstart = float(args[3])
+        angle = float(args[4])
+        rstop = float(args[5])
+        tpolar = float(args[6]) if len(args) > 6 else 0
+        cpolar = float(args[7]) if len(args) > 7 else 0
+        segments = parse_segments(args[8]) if len(args) > 8 else None
+    except (IndexError, ValueError):
+        print("Usage: scanEstimate.py fstart fstop nums rstart rstep rstop "
+              "[tpolar cpolar [segments]]")
+        return 1
+
+    estimate = estimate_sweep(model_motors(), f1, f2, nums, rstart, angle,
+                              rstop, tpolar, cpolar, segments=segments)
+    for name in ("positioning_s", "setup_s", "s11_s", "scan_s", "reset_s",
+                 "total_s"):
+        print("%-14s %10.1f" % (name, estimate[name]))
+    print("%-14s %10.3f (%d steps)" % ("step_s", estimate["step_s"],
+                                       estimate["angle_steps"]))
+    return 0
+
+
+#
+# End main function
+# ==============================================================================
+
+
+# ==============================================================================
+# Enter from command line
+#
+if __name__ == "__main__":
+    argv = sys.argv  # Store command line arguments
+    argv.pop(0)  # Remove file name
+    # Call main function and pass return status to system
+    sys.exit(scanEstimate(argv))
+#
+# End enter from command line
+# ==============================================================================
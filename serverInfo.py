@@ -14,7 +14,10 @@ import os
 # Installed libraries
 
 # Database constants
+CONFIG_BACKEND = "mysql"  # "mysql" (lab server) or "sqlite" (local file)
 DB = "update_config"
+DB_POOL_NAME = "preal"
+DB_POOL_SIZE = 2  # Connections kept open per process
 
 # Server path
 SERVER_PATH = "REDACTED_FOR_PRIVACY"
@@ -25,6 +28,12 @@ DB_CONFIG_FILE = os.path.join(SERVER_PATH, "REDACTED_FOR_PRIVACY")
 # Temp directory
 TMP_PATH = os.path.join(SERVER_PATH, "REDACTED_FOR_PRIVACY")
 
+# Parsed DB config, reused until DB_CONFIG_FILE changes
+DB_CONFIG_CACHE = os.path.join(TMP_PATH, "db_config_cache.json")
+
+# Local config_options database used by the "sqlite" backend
+CONFIG_SQLITE_FILE = os.path.join(TMP_PATH, "config_options.sqlite")
+
 # Source directory
 SRC_PATH = os.path.dirname(os.path.realpath(__file__))
 
@@ -35,16 +44,82 @@ DATA_PATH = TMP_PATH if os.path.isdir(TMP_PATH) else "REDACTED_FOR_PRIVACY"
 #   data and plots
 RESULTS_PATH = os.path.join(SERVER_PATH, "REDACTED_FOR_PRIVACY")
 
+# Rendered plot cache, shared by all experiments in the results directory
+PLOT_CACHE_PATH = os.path.join(RESULTS_PATH, "plot_cache")
+PLOT_CACHE_SIZE = 512 * 1024 * 1024  # bytes, least recently used evicted
+
+# Index of measured experiments, written at the end of each sweep
+CATALOG_FILE = os.path.join(RESULTS_PATH, "catalog.sqlite")
+
+# Tracing, records timed spans for each test phase and instrument call
+TRACE_ENABLED = False
+TRACE_PATH = os.path.join(TMP_PATH, "traces")  # Chrome trace JSON files
+
+# Structured job records (JSON lines) and utilization exporter output
+JOB_RECORDS_PATH = os.path.join(TMP_PATH, "jobs")
+UTILIZATION_PATH = os.path.join(TMP_PATH, "utilization")
+
+# Last known instrument addresses and fingerprints, enumeration is the fallback
+RESOURCE_REGISTRY_FILE = os.path.join(TMP_PATH, "resource_registry.json")
+ANALYZER_IDN_MATCH = "E5071C"  # *IDN? reply must contain this
+MOTOR_CONTROLLER_ADDRESS = "Com3"  # Tried first when nothing is cached
+PROBE_TIMEOUT = 2000  # ms, per candidate address
+# Motor controller replies are read by a background thread, completion
+# callbacks then run as the '^' arrives instead of when a command waits
+MOTOR_READER_THREAD = False
+
+# Instrument I/O counters and latency histograms, one JSON file per job
+METRICS_PATH = os.path.join(TMP_PATH, "metrics")
+
+# Estimated completion time of the running scan, rewritten after each step
+ETA_FILE = os.path.join(TMP_PATH, "ETA.txt")
+
 # Logging constants
 LOG_LEVEL = logging.INFO
 IMPORT_LOG_LEVEL = logging.WARNING
 
+# Network analyzer constants
+IF_BANDWIDTH = 1000  # Hz
+ACQUISITION_PROFILE = "standard"  # "standard" or "fast" (headless)
+
+# Adaptive IF bandwidth: widest bandwidth per segment meeting a noise target
+ADAPTIVE_IFBW = False  # Default for the sweep routines
+ADAPTIVE_NOISE_FLOOR = -80  # dB, target trace noise (S21 relative to 1)
+ADAPTIVE_IFBW_MIN = 100  # Hz
+ADAPTIVE_IFBW_MAX = 100000  # Hz, also used for the noise pre-sweep
+ADAPTIVE_PRESWEEPS = 3  # Repeated sweeps for the noise estimate
+
 # Motor controller constants
 STAND_SPEED = 1500 # steps/second
 POLARIZATION_SPEED = 2500 # steps/second
 TRANSLATION_SPEED = 5000 # steps/second
 MOTOR_ACCELERATION = 1 # Proportional to steps/(second^2)
 STAND_OFFSET = -650 # degrees
+# Stand travel from the zero index the cable wrap allows (degrees), widen on
+# purpose only
+STAND_WRAP_MIN = 0
+STAND_WRAP_MAX = 360
+STAND_ANGLE_TOLERANCE = 0 # degrees, closer than this to a start angle no move
+
+# Settle after each stand step: "fixed" (SETTLE_TIME), "scaled" with the step
+# size and acceleration, or "measured" until quick S21 probe sweeps agree
+SETTLE_MODE = "fixed" # The scaled constants are not calibrated on the stand
+SETTLE_TIME = 0.25 # seconds, fixed mode
+SETTLE_MIN = 0.05 # seconds, scaled mode, approx.
+SETTLE_PER_DEGREE = 0.01 # seconds per degree at acceleration 1, approx.
+SETTLE_MAX = 1.0 # seconds, scaled and measured modes
+SETTLE_PROBE_POINTS = 21 # measured mode probe sweep
+SETTLE_PROBE_IFBW = 1000 # Hz
+SETTLE_THRESHOLD = 0.05 # dB, change of the probe sweep's mean magnitude
+ACCELERATION_SCALE = 4000 # steps/(second^2) per unit of acceleration, approx.
+MOVE_OVERHEAD = 0.05 # seconds per index move (command and '^' reply)
+
+# Hardware trigger: VXM output 1 -> analyzer EXT TRIG IN, analyzer TRIG OUT
+# (pulse after each sweep) -> VXM input 1. Program codes must match the wiring.
+HARDWARE_TRIGGER = False  # Default for the pattern routine
+VXM_TRIGGER_OUT = "U8"  # Pulse output 1
+VXM_WAIT_READY = "U0"  # Wait for input 1
+SWEEP_END_TIMEOUT = 60  # seconds without a triggered sweep before giving up
 M1 = 0
 M2 = 1
 M3 = 2
@@ -0,0 +1,145 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         settle.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from functions import *
+# Standard libraries
+import time
+
+# Installed libraries
+
+SETTLE_MODES = ("fixed", "scaled", "measured")
+PROBE_CHANNEL = 2  # Analyzer channel of the measured mode probe sweeps
+
+
+# ==============================================================================
+# Settle policy
+#
+# How long to wait after a stand step before the sweep. "fixed" waits
+# SETTLE_TIME. "scaled" waits longer for larger steps and harder
+# acceleration, up to SETTLE_MAX. "measured" repeats quick low-point S21
+# sweeps on a probe channel until the mean magnitude of two in a row agrees
+# within SETTLE_THRESHOLD dB, the full sweep then runs on the measurement
+# channel. Until start_probe() is called, and with a hardware-triggered scan,
+# measured waits as scaled.
+#
+class SettlePolicy(object):
+
+    # --------------------------------------------------------------------------
+    # Initialize policy object
+    #
+    def __init__(self, log, motor, analyzer=None, mode=SETTLE_MODE):
+        if mode not in SETTLE_MODES:
+            raise ValueError("Unknown settle mode: " + str(mode))
+        self.log = log
+        self.motor = motor
+        self.analyzer = analyzer
+        self.mode = mode
+        self.channel = None  # Measurement channel while probing
+        self.probes = 0
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Wait after a step of the specified number of degrees (seconds), the
+    # estimate for the measured mode
+    #
+    def delay(self, degrees):
+        if self.mode == "fixed":
+            return SETTLE_TIME
+        return min(SETTLE_MAX, SETTLE_MIN + SETTLE_PER_DEGREE * abs(degrees)
+                   * self.motor.acceleration)
+
+    #
+    # End delay
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Set up the probe channel over the measured band, measured mode only
+    #
+    def start_probe(self, channel, f1, f2):
+        if self.mode != "measured":
+            return
+        if self.analyzer is None:
+            raise ValueError("Measured settle mode needs the analyzer")
+        self.analyzer.setup_probe(PROBE_CHANNEL, f1, f2, SETTLE_PROBE_POINTS,
+                                  SETTLE_PROBE_IFBW)
+        self.analyzer.set_channel(channel)
+        self.channel = channel
+
+    def end_probe(self):
+        if self.channel is not None:
+            self.analyzer.end_probe()
+            self.channel = None
+
+    #
+    # End probe channel
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # One probe sweep, complex S21
+    #
+    def probe(self):
+        self.analyzer.sweep_once()
+        self.probes += 1
+        return self.analyzer.get_corr_values(PROBE_CHANNEL)
+
+    #
+    # End probe
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Wait for the stand to settle after a step, returns the seconds waited
+    #
+    def wait(self, degrees):
+        if self.channel is None:
+            seconds = self.delay(degrees)
+            time.sleep(seconds)
+            return seconds
+
+        t0 = time.time()
+        self.analyzer.set_channel(PROBE_CHANNEL)
+        previous = self.probe()
+        while True:
+            current = self.probe()
+            # Mean magnitude over the band, averages the receiver noise down
+            change = 20 * np.log10(max(np.mean(np.abs(current)), 1e-15)
+                                   / max(np.mean(np.abs(previous)), 1e-15))
+            if abs(change) <= SETTLE_THRESHOLD:
+                break
+            if time.time() - t0 >= SETTLE_MAX:
+                self.log.warning("Stand not settled after %.2f s, "
+                                 "measuring anyway", time.time() - t0)
+                break
+            previous = current
+        self.analyzer.set_channel(self.channel)
+        return time.time() - t0
+
+    #
+    # End wait
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Context manager, ends probing on exit
+    #
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.end_probe()
+        return False
+
+    #
+    # End context manager
+    # --------------------------------------------------------------------------
+
+
+#
+# End SettlePolicy
+# ==============================================================================
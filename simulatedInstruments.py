@@ -0,0 +1,747 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         simulatedInstruments.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from serverInfo import *
+from transport import scpi_mnemonic
+from motionModel import move_time
+# Standard libraries
+import re
+import math
+import time
+import cmath
+import random
+from collections import ChainMap
+
+# Installed libraries
+
+# E5071C limits
+ANALYZER_FREQ_MIN = 300e3  # Hz
+ANALYZER_FREQ_MAX = 20e9  # Hz
+ANALYZER_POINTS_MAX = 1601
+ANALYZER_IDN = "Agilent Technologies,E5071C,SIM00001,A.11.20"
+ANALYZER_NOISE_FLOOR = -123  # dB at 10 Hz IF bandwidth, rises 6 dB to 20 GHz
+
+# Command subsystems numbered by channel, ":SENS2:FREQ:STAR" sets channel 2
+CHANNEL_SUBSYSTEMS = ("SENS", "CALC", "INIT")
+
+# Data queries and the S-parameter they return
+DATA_QUERIES = ("CALC:DATA:SDAT?", "CALC:DATA:FDAT?", "SENS:DATA:CORR?",
+                "SENS:DATA:RAWD?")
+
+# VXM program tokens: index moves, speed, acceleration, outputs and waits,
+# pauses, loops, and single letters
+VXM_TOKEN_RE = re.compile(r"IA?\dM-?\d+|[SA]\dM\d+|[UPL]\d+|[A-Z]")
+
+# VXM position query for each motor
+VXM_POSITION = {"X": 1, "Y": 2, "Z": 3, "T": 4}
+VXM_LIMIT_STEPS = 400000  # Limit switch position, either direction
+
+
+# ==============================================================================
+# Virtual clock
+#
+# Real elapsed time plus simulated waits. Instrument latencies and the test
+# routines' sleeps advance the clock without blocking, so Python, file and
+# processing time are measured as they are and instrument time is predicted.
+# Replaces the time module in the simulated modules: sleep(), time(),
+# perf_counter() and monotonic() are virtual, anything else is passed through.
+#
+class VirtualClock(object):
+
+    # --------------------------------------------------------------------------
+    # Initialize clock object
+    #
+    def __init__(self):
+        self.offset = 0.0  # Simulated seconds so far
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Time functions
+    #
+    def now(self):
+        return time.perf_counter() + self.offset
+
+    perf_counter = now
+    monotonic = now
+
+    def time(self):
+        return time.time() + self.offset
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.offset += seconds
+
+    def sleep_until(self, t):
+        self.sleep(t - self.now())
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+    #
+    # End time functions
+    # --------------------------------------------------------------------------
+
+
+#
+# End VirtualClock
+# ==============================================================================
+
+
+# ==============================================================================
+# Latency model
+#
+# Defaults approximate the lab setup: E5071C on GPIB, VXM on a 9600 baud
+# serial port. Any value can be overridden by keyword, e.g.
+# LatencyModel(gpib_bytes_per_s=1e6).
+#
+class LatencyModel(object):
+
+    gpib_command_s = 0.002  # Per write/query round trip
+    gpib_bytes_per_s = 300e3  # ASCII transfer rate
+    sweep_overhead_s = 0.015  # Per sweep (retrace, band switching)
+    segment_overhead_s = 0.001  # Per segment of a segment sweep
+    point_overhead_s = 30e-6  # Per point, on top of 1 / IF bandwidth
+    load_state_s = 0.5  # MMEM:LOAD:STAT
+    ecal_s = 8.0  # Electronic calibration
+    display_update_s = 0.015  # Front panel redraw (DISP:UPD, Y:AUTO, sweeps)
+    serial_baud = 9600
+    vxm_command_s = 0.005  # Controller parsing a command
+    move_overhead_s = 0.05  # Start/stop of each index move
+
+    # --------------------------------------------------------------------------
+    # Initialize model object
+    #
+    def __init__(self, **overrides):
+        for name, value in overrides.items():
+            if not hasattr(LatencyModel, name):
+                raise ValueError("Unknown latency parameter: " + name)
+            setattr(self, name, float(value))
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Derived latencies (seconds)
+    #
+    def gpib(self, size):
+        return self.gpib_command_s + size / self.gpib_bytes_per_s
+
+    def serial(self, size):
+        # 8N1, 10 bits per character
+        return size * 10.0 / self.serial_baud
+
+    def sweep(self, points, if_bandwidth):
+        return self.sweep_overhead_s + points * (self.point_overhead_s
+                                                 + 1.0 / if_bandwidth)
+
+    def segment_sweep(self, segments):
+        # segments: (points, IF bandwidth) of each segment
+        return self.sweep_overhead_s + sum(
+                self.segment_overhead_s
+                + points * (self.point_overhead_s + 1.0 / if_bandwidth)
+                for points, if_bandwidth in segments)
+
+    def move(self, steps, speed, acceleration):
+        return self.move_overhead_s + move_time(steps, speed, acceleration)
+
+    def as_dict(self):
+        return dict((name, getattr(self, name)) for name in dir(LatencyModel)
+                    if not name.startswith("_")
+                    and not callable(getattr(LatencyModel, name)))
+
+    #
+    # End derived latencies
+    # --------------------------------------------------------------------------
+
+
+#
+# End LatencyModel
+# ==============================================================================
+
+
+# ==============================================================================
+# Simulated network analyzer
+#
+# Stands in for the pyvisa resource of the E5071C. Settings written with
+# "<header> <value>" are stored by command mnemonic and returned by
+# "<header>?". A ":TRIG:SING" starts a sweep and "*OPC?" waits for it to end.
+# Data is a smooth pattern of the stand angle, read from angle() if given.
+# ":SENS:SWE:TYPE SEGM" sweeps the table uploaded with ":SENS:SEGM:DATA".
+# Receiver noise follows the IF bandwidth of each point. While the display is
+# enabled each sweep also redraws the front panel. With ":TRIG:SOUR EXT" sweeps
+# are started by external_trigger() and their ends are latched in
+# ":STAT:OPER?". There is one trace buffer, data is read from the last sweep
+# started even if it is still running. Channels have their own sweep
+# settings, ":TRIG:SEQ:SCOP ACT" sweeps only the channel activated with
+# ":DISP:WIND<n>:ACT".
+#
+class SimulatedAnalyzer(object):
+
+    # --------------------------------------------------------------------------
+    # Initialize analyzer object
+    #
+    def __init__(self, clock, latency=None, angle=None):
+        self.clock = clock
+        self.latency = latency or LatencyModel()
+        self.angle = angle  # Stand angle in degrees, None for boresight
+        self.timeout = 2000
+        self.read_termination = "\n"
+        self.write_termination = "\n"
+        self.shared = {"TRIG:SOUR": "INT", "TRIG:SEQ:SCOP": "ALL"}
+        self.channels = {}  # Channel settings, "segments" holds the table
+        self.channel = 1  # Channel of the command being executed
+        self.active = 1  # Active channel (":DISP:WIND<n>:ACT")
+        self.random = random.Random(0)  # Receiver noise, repeatable
+        self.sweep_end = 0.0  # Clock time the last sweep completes
+        self.sweep_angle = 0.0  # Stand angle during the last sweep
+        # Externally triggered (start time, end time, stand angle)
+        self.scheduled = []
+        self.sweeps = 0
+        self.errors = []  # (number, message) in the error queue
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Settings of the addressed channel, over the shared settings
+    #
+    @property
+    def settings(self):
+        if self.channel not in self.channels:
+            self.channels[self.channel] = {
+                "SENS:FREQ:STAR": 300e3, "SENS:FREQ:STOP": 8.5e9,
+                "SENS:SWE:POIN": 201, "SENS:BAND": 70e3,
+                "CALC:PAR:DEF": "S21",
+                "segments": []}  # (start, stop, points, IF bandwidth)
+        return ChainMap(self.channels[self.channel], self.shared)
+
+    @property
+    def segments(self):
+        return self.settings["segments"]
+
+    #
+    # End settings
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Sweep settings
+    #
+    def segmented(self):
+        return str(self.settings.get("SENS:SWE:TYPE", "LIN")).upper() \
+            .startswith("SEGM")
+
+    def points(self):
+        if self.segmented():
+            return sum(s[2] for s in self.segments)
+        return int(self.settings["SENS:SWE:POIN"])
+
+    def sweep_points(self):
+        # (frequency, IF bandwidth) of each point
+        if self.segmented():
+            segments = self.segments
+        else:
+            segments = [(float(self.settings["SENS:FREQ:STAR"]),
+                         float(self.settings["SENS:FREQ:STOP"]),
+                         self.points(), float(self.settings["SENS:BAND"]))]
+        points = []
+        for start, stop, n, ifbw in segments:
+            points += [(start + (stop - start) * i / max(1, n - 1), ifbw)
+                       for i in range(n)]
+        return points
+
+    def frequencies(self):
+        return [f for f, ifbw in self.sweep_points()]
+
+    def sweep_time(self):
+        if self.segmented():
+            return self.latency.segment_sweep([s[2:] for s in self.segments])
+        return self.latency.sweep(self.points(),
+                                  float(self.settings["SENS:BAND"]))
+
+    #
+    # End sweep settings
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Measured values, complex S-parameter per frequency
+    #
+    def measurement(self):
+        parameter = str(self.settings["CALC:PAR:DEF"]).upper()
+        theta = math.radians(self.sweep_angle)
+        values = []
+        for f, ifbw in self.sweep_points():
+            delay = cmath.exp(-2j * math.pi * f * 5e-9)
+            if parameter in ("S11", "S22"):
+                # Matched antenna, about -15 dB return loss
+                value = 0.18 * delay
+            else:
+                # Main lobe at 0 degrees, 35 dB path loss
+                gain_db = -35 - 12 * (1 - math.cos(theta)) * (f / 6e9)
+                value = 10 ** (gain_db / 20) * delay
+            # Noise power proportional to the IF bandwidth, split between the
+            # real and imaginary parts
+            noise_db = (ANALYZER_NOISE_FLOOR + 10 * math.log10(ifbw / 10.0)
+                        + 6 * f / ANALYZER_FREQ_MAX)
+            sigma = math.sqrt(10 ** (noise_db / 10) / 2)
+            values.append(value + complex(self.random.gauss(0, sigma),
+                                          self.random.gauss(0, sigma)))
+        return values
+
+    #
+    # End measured values
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Store a setting, clamped to the instrument limits
+    #
+    def set(self, mnemonic, value):
+        if mnemonic in ("SENS:FREQ:STAR", "SENS:FREQ:STOP"):
+            value = min(ANALYZER_FREQ_MAX, max(ANALYZER_FREQ_MIN,
+                                               float(value)))
+        elif mnemonic == "SENS:SWE:POIN":
+            value = min(ANALYZER_POINTS_MAX, max(2, int(float(value))))
+        elif mnemonic == "SENS:BAND":
+            value = float(value)
+        if mnemonic.split(":")[0] in CHANNEL_SUBSYSTEMS:
+            self.settings[mnemonic] = value
+        else:
+            self.shared[mnemonic] = value
+
+    #
+    # End set
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Store the segment table, ":SENS:SEGM:DATA" values
+    #
+    def set_segments(self, value):
+        values = [float(v) for v in value.split(",")]
+        flags = [int(v) for v in values[1:6]]  # stimulus, ifbw, power, ...
+        width = 3 + sum(flags[1:])
+        segments = []
+        for k in range(int(values[6])):
+            row = values[7 + k * width:7 + (k + 1) * width]
+            start, stop = row[0], row[1]
+            if flags[0]:
+                # Center and span
+                start, stop = row[0] - row[1] / 2, row[0] + row[1] / 2
+            ifbw = row[3] if flags[1] else float(self.settings["SENS:BAND"])
+            segments.append((max(ANALYZER_FREQ_MIN, start),
+                             min(ANALYZER_FREQ_MAX, stop), int(row[2]), ifbw))
+        if sum(s[2] for s in segments) > ANALYZER_POINTS_MAX:
+            self.errors.append((-222, "Data out of range"))
+            return
+        self.settings["segments"] = segments
+
+    #
+    # End set segments
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Time to sweep the triggered channels, the active one or all
+    #
+    def trigger_time(self):
+        addressed = self.channel
+        if str(self.shared["TRIG:SEQ:SCOP"]).upper().startswith("ACT"):
+            swept = [self.active]
+        else:
+            swept = sorted(set(self.channels) | set([1]))
+        duration = 0.0
+        for self.channel in swept:
+            duration += self.sweep_time()
+        self.channel = addressed
+        if str(self.shared.get("DISP:ENAB", "ON")).upper() \
+                not in ("OFF", "0"):
+            duration += self.latency.display_update_s
+        return duration
+
+    #
+    # End trigger time
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Trigger input pulse at clock time t, returns the time the sweep ends or
+    # None if the trigger source is not external
+    #
+    def external_trigger(self, t):
+        if str(self.shared["TRIG:SOUR"]).upper()[:3] != "EXT":
+            return None
+        start = max(t, self.sweep_end)
+        angle = self.angle(start) if self.angle else 0.0
+        self.sweep_end = start + self.trigger_time()
+        self.scheduled.append((start, self.sweep_end, angle))
+        self.sweeps += 1
+        return self.sweep_end
+
+    def completed(self):
+        # Externally triggered sweeps ended by now, removed from the schedule
+        now = self.clock.now()
+        done = [s for s in self.scheduled if s[1] <= now]
+        self.scheduled = self.scheduled[len(done):]
+        if done:
+            self.sweep_angle = done[-1][2]
+        return done
+
+    def started(self):
+        # Stand angle of the data in the trace buffer, a sweep running now
+        # has overwritten the last one ended
+        now = self.clock.now()
+        for start, end, angle in self.scheduled:
+            if start <= now:
+                self.sweep_angle = angle
+
+    #
+    # End external trigger
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Execute a command, returns the reply for queries
+    #
+    def execute(self, command):
+        header, _, value = command.strip().partition(" ")
+        mnemonic = scpi_mnemonic(header)
+        value = value.strip().strip('"')
+        m = re.match(r":?[A-Z]+(\d+)", header.upper())
+        number = int(m.group(1)) if m else 1
+        if mnemonic.split(":")[0] in CHANNEL_SUBSYSTEMS:
+            self.channel = number
+
+        # Commands with a side effect
+        if mnemonic == "TRIG:SING":
+            self.clock.sleep_until(self.sweep_end)
+            self.sweep_angle = self.angle() if self.angle else 0.0
+            self.sweep_end = self.clock.now() + self.trigger_time()
+            self.sweeps += 1
+            return None
+        if mnemonic == "DISP:WIND:ACT":
+            m = re.match(r":?DISP\w*:WIND\w*?(\d+)", header.upper())
+            self.active = int(m.group(1)) if m else 1
+            return None
+        if mnemonic == "SENS:SEGM:DATA":
+            self.set_segments(value)
+            return None
+        if mnemonic in ("DISP:UPD", "DISP:WIND:TRAC:Y:AUTO"):
+            self.clock.sleep(self.latency.display_update_s)
+            return None
+        if mnemonic == "MMEM:LOAD:STAT":
+            self.clock.sleep(self.latency.load_state_s)
+            return None
+        if mnemonic.startswith("SENS:CORR:COLL:ECAL"):
+            self.clock.sleep(self.latency.ecal_s)
+            return None
+
+        # Queries
+        if mnemonic == "*IDN?":
+            return ANALYZER_IDN
+        if mnemonic == "*OPC?":
+            self.clock.sleep_until(self.sweep_end)
+            return "+1"
+        if mnemonic == "SYST:ERR?":
+            if self.errors:
+                return '%+d,"%s"' % self.errors.pop(0)
+            return '+0,"No error"'
+        if mnemonic == "STAT:OPER?":
+            # Event register, reading clears it
+            return "+16" if self.completed() else "+0"
+        if mnemonic in DATA_QUERIES:
+            if str(self.shared["TRIG:SOUR"]).upper()[:3] == "EXT":
+                # Data of the last sweep started, no wait
+                self.completed()
+                self.started()
+            else:
+                self.clock.sleep_until(self.sweep_end)
+            return ",".join("%+.11E,%+.11E" % (v.real, v.imag)
+                            for v in self.measurement())
+        if mnemonic == "CALC:DATA:XAX?":
+            return ",".join("%+.11E" % f for f in self.frequencies())
+        if mnemonic == "SENS:SWE:TIME?":
+            return "%+.11E" % self.sweep_time()
+        if mnemonic == "SENS:SEGM:SWE:POIN?":
+            return "%+d" % sum(s[2] for s in self.segments)
+        if mnemonic.endswith("?"):
+            reply = self.settings.get(mnemonic[:-1], "0")
+            if isinstance(reply, float):
+                return "%+.11E" % reply
+            return str(reply)
+
+        # Settings
+        if value:
+            self.set(mnemonic, value)
+        return None
+
+    #
+    # End execute
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # pyvisa resource interface
+    #
+    def write(self, command):
+        self.clock.sleep(self.latency.gpib(len(command) + 1))
+        self.execute(command)
+        return len(command) + 1, 0
+
+    def query(self, command):
+        self.clock.sleep(self.latency.gpib(len(command) + 1))
+        reply = self.execute(command)
+        if reply is None:
+            raise IOError("Simulated analyzer: no reply to " + command)
+        self.clock.sleep(self.latency.gpib(len(reply) + 1))
+        return reply
+
+    def close(self):
+        pass
+
+    #
+    # End pyvisa resource interface
+    # --------------------------------------------------------------------------
+
+
+#
+# End SimulatedAnalyzer
+# ==============================================================================
+
+
+# ==============================================================================
+# Simulated VXM motor controller
+#
+# Index commands are stored as a program and run by "R", which sends '^' when
+# the moves are done. The program is kept until "C". Replies are queued with
+# the clock time they become available and read() waits for them. Pauses,
+# a final loop, and the trigger output and ready input of a TriggerLine are
+# run as well.
+#
+class SimulatedVXM(object):
+
+    # --------------------------------------------------------------------------
+    # Initialize controller object
+    #
+    def __init__(self, clock, latency=None):
+        self.clock = clock
+        self.latency = latency or LatencyModel()
+        self.timeout = 2000
+        self.read_termination = "\r"
+        self.write_termination = "\r"
+        self.program = []
+        self.speed = dict((m, 2000) for m in range(1, 5))
+        self.acceleration = dict((m, 1) for m in range(1, 5))
+        # Moves of each motor: [(start time, end time, start, end steps)]
+        self.motion = dict((m, [(0.0, 0.0, 0, 0)]) for m in range(1, 5))
+        self.trigger_line = None  # TriggerLine wired to the I/O port
+        self.busy_until = 0.0
+        self.output = []  # (available at, text)
+        self.moves = 0
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Motor position in steps at time t (default now), programs are run ahead
+    # so t may be in the future
+    #
+    def position(self, motor, t=None):
+        t = self.clock.now() if t is None else t
+        moves = self.motion[motor]
+        t0, t1, p0, p1 = moves[0]
+        for move in moves:
+            if move[0] > t:
+                break
+            t0, t1, p0, p1 = move
+        if t >= t1:
+            return p1
+        return p0 + (p1 - p0) * (t - t0) / (t1 - t0)
+
+    #
+    # End position
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Run the stored program, commands follow each other. A final "L<n>"
+    # runs the commands before it n times in total.
+    #
+    def run(self):
+        t = max(self.clock.now(), self.busy_until)
+        program = self.program
+        for k, token in enumerate(program):
+            if token.startswith("L"):
+                program = program[:k] * max(1, int(token[1:])) \
+                          + program[k + 1:]
+                break
+        for token in program:
+            if token.startswith("P"):
+                t += int(token[1:]) / 10.0  # Tenths of a second
+                continue
+            if token == VXM_TRIGGER_OUT and self.trigger_line:
+                self.trigger_line.pulse(t)
+                continue
+            if token == VXM_WAIT_READY and self.trigger_line:
+                t = max(t, self.trigger_line.ready_at)
+                continue
+            m = re.match(r"I(A?)(\d)M(-?)(\d+)", token)
+            if not m:
+                continue
+            absolute, motor, sign, steps = m.groups()
+            motor = int(motor)
+            start = self.position(motor, t)
+            if int(steps) == 0 and not absolute:
+                # I<m>M0 / I<m>M-0, run to the limit switch
+                end = -VXM_LIMIT_STEPS if sign else VXM_LIMIT_STEPS
+            elif absolute:
+                end = int(sign + steps)
+            else:
+                end = start + int(sign + steps)
+            duration = self.latency.move(end - start, self.speed[motor],
+                                         self.acceleration[motor])
+            self.motion[motor].append((t, t + duration, start, end))
+            t += duration
+            self.moves += 1
+        self.busy_until = t
+        self.output.append((t, "^"))
+
+    #
+    # End run
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Execute a command string
+    #
+    def execute(self, command):
+        now = self.clock.now() + self.latency.vxm_command_s
+        for token in VXM_TOKEN_RE.findall(command.upper()):
+            if token == "C":
+                self.program = []
+            elif token == "R":
+                self.run()
+            elif token == "N":
+                for motor in self.motion:
+                    self.motion[motor] = [(0.0, 0.0, 0, 0)]
+            elif token == "V":
+                busy = self.busy_until > now
+                # Single character, no carriage return
+                self.output.append((now, "B" if busy else "R"))
+            elif token in VXM_POSITION:
+                steps = self.position(VXM_POSITION[token], now)
+                self.output.append((now, "%+08d\r" % int(round(steps))))
+            elif token.startswith("S"):
+                self.speed[int(token[1])] = int(token[3:])
+            elif token.startswith("A"):
+                self.acceleration[int(token[1])] = int(token[3:])
+            elif token.startswith("IA") and token.endswith("M-0"):
+                # Set absolute zero of a motor at its current position
+                motor = int(token[2])
+                self.motion[motor] = [(0.0, 0.0, 0, 0)]
+            elif token[0] in "IPUL":
+                self.program.append(token)
+            # F (on-line), Q (quit), K (kill) need no simulation
+
+    #
+    # End execute
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # pyvisa resource interface
+    #
+    def write(self, command):
+        self.clock.sleep(self.latency.serial(len(command) + 1))
+        self.execute(command)
+        return len(command) + 1, 0
+
+    def read(self):
+        term = self.read_termination or ""
+        text = ""
+        while self.output:
+            ready, chunk = self.output.pop(0)
+            self.clock.sleep_until(ready)
+            self.clock.sleep(self.latency.serial(len(chunk)))
+            text += chunk
+            if term and term in text:
+                reply, _, rest = text.partition(term)
+                if rest:
+                    self.output.insert(0, (self.clock.now(), rest))
+                return reply
+        raise IOError("Simulated VXM: read timed out waiting for "
+                      + repr(term))
+
+    def read_bytes(self, count):
+        if not self.output:
+            raise IOError("Simulated VXM: read timed out")
+        ready, chunk = self.output.pop(0)
+        self.clock.sleep_until(ready)
+        data, rest = chunk[:count], chunk[count:]
+        self.clock.sleep(self.latency.serial(len(data)))
+        if rest:
+            self.output.insert(0, (self.clock.now(), rest))
+        return data.encode("ascii")
+
+    @property
+    def bytes_in_buffer(self):
+        now = self.clock.now()
+        return sum(len(chunk) for ready, chunk in self.output if ready <= now)
+
+    def query(self, command):
+        self.write(command)
+        return self.read()
+
+    def close(self):
+        pass
+
+    #
+    # End pyvisa resource interface
+    # --------------------------------------------------------------------------
+
+
+#
+# End SimulatedVXM
+# ==============================================================================
+
+
+# ==============================================================================
+# Trigger line between the motor controller and the analyzer
+#
+# The controller's output pulse triggers a sweep and the analyzer's trigger
+# output after the sweep sets the controller's input, ready_at is the clock
+# time of that pulse.
+#
+class TriggerLine(object):
+
+    # --------------------------------------------------------------------------
+    # Initialize line object
+    #
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.ready_at = 0.0
+        self.pulses = 0
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Output pulse from the controller at clock time t
+    #
+    def pulse(self, t):
+        self.pulses += 1
+        end = self.analyzer.external_trigger(t)
+        # Not triggered, the real controller would wait for a pulse that
+        # never comes
+        self.ready_at = t if end is None else end
+
+    #
+    # End pulse
+    # --------------------------------------------------------------------------
+
+
+#
+# End TriggerLine
+# ==============================================================================
@@ -0,0 +1,94 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         startupBenchmark.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+
+# Standard libraries
+import os
+import sys
+import json
+import subprocess
+from statistics import median
+
+# Installed libraries
+
+
+# Scripts started by the web server
+ENTRY_POINTS = ["alignMotors", "polarizationRotation", "calibrateS11",
+                "calibrateS21", "s11", "maxGain", "antennaMeasurement",
+                "plotting", "process"]
+
+# Libraries that should only be loaded by the code paths that need them
+HEAVY_MODULES = ["mysql.connector", "visa", "pandas", "scipy", "matplotlib",
+                 "tkinter", "smithplot"]
+
+# Run in a fresh interpreter so each measurement is a cold import
+PROBE = ("import sys, time, json\n"
+         "t0 = time.perf_counter()\n"
+         "import %s\n"
+         "t = time.perf_counter() - t0\n"
+         "print(json.dumps([t, [m for m in %r if m in sys.modules]]))\n")
+
+
+# ==============================================================================
+# Time the import of one entry point
+#
+def time_import(module, repeats=5):
+    times = []
+    loaded = []
+    for i in range(repeats):
+        out = subprocess.check_output(
+                [sys.executable, "-c", PROBE % (module, HEAVY_MODULES)],
+                cwd=os.path.dirname(os.path.abspath(__file__)))
+        t, loaded = json.loads(out.decode().strip().splitlines()[-1])
+        times.append(t)
+    return median(times), min(times), loaded
+
+
+#
+# End time import
+# ==============================================================================
+
+
+# ==============================================================================
+# Main function
+#
+def startupBenchmark(args):
+    repeats = 5
+    if len(args) > 0:
+        repeats = int(args[0])
+    modules = args[1:] if len(args) > 1 else ENTRY_POINTS
+
+    print("%-22s %10s %10s  %s" % ("module", "median ms", "min ms",
+                                   "heavy modules loaded"))
+    for module in modules:
+        try:
+            med, best, loaded = time_import(module, repeats)
+        except subprocess.CalledProcessError:
+            print("%-22s %10s %10s  %s" % (module, "-", "-", "import failed"))
+            continue
+        print("%-22s %10.1f %10.1f  %s" % (module, med * 1e3, best * 1e3,
+                                           ", ".join(loaded) or "none"))
+    return 0
+
+
+#
+# End main function
+# ==============================================================================
+
+
+# ==============================================================================
+# Enter from command line
+#
+if __name__ == "__main__":
+    argv = sys.argv  # Store command line arguments
+    argv.pop(0)  # Remove file name
+    # Call main function and pass return status to system
+    sys.exit(startupBenchmark(argv))
+#
+# End enter from command line
+# ==============================================================================
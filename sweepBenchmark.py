@@ -0,0 +1,407 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         sweepBenchmark.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from functions import *
+from simulatedInstruments import VirtualClock, LatencyModel, \
+    SimulatedAnalyzer, SimulatedVXM, TriggerLine
+from logSetup import get_logger
+# Standard libraries
+import sys
+import glob
+import shutil
+import argparse
+import tempfile
+
+# Installed libraries
+
+# Test routines: (module, function)
+ROUTINES = {"pattern": ("antennaMeasurement", "sweep"),
+            "s11": ("s11", "sweep_s11"),
+            "maxGain": ("maxGain", "sweep_maxGain")}
+
+# Server paths redirected into the work directory, relative names
+WORK_PATHS = {"TMP_PATH": "", "DATA_PATH": "",
+              "RESULTS_PATH": "results",
+              "PLOT_CACHE_PATH": os.path.join("results", "plot_cache"),
+              "CATALOG_FILE": os.path.join("results", "catalog.sqlite"),
+              "ETA_FILE": "ETA.txt"}
+
+# Modules whose time.sleep() calls are simulated
+SLEEPING_MODULES = ("networkAnalyzer", "antennaMeasurement",
+                    "adaptiveBandwidth", "scanEstimate", "settle")
+
+# Modules loaded before the paths are redirected, including the ones the test
+# routines import lazily
+MODULES = ("functions", "networkAnalyzer", "antennaMeasurement", "s11",
+           "maxGain", "process", "plotting", "plotCache", "catalog",
+           "configStore", "tracing", "transport", "adaptiveBandwidth",
+           "scanEstimate", "settle")
+
+
+# ==============================================================================
+# Simulated chamber
+#
+# Runs a test routine against a simulated analyzer, motor controller and an
+# in-memory config store. On enter the server paths of the loaded modules are
+# pointed at a work directory and time.sleep() is replaced by the virtual
+# clock, both are restored on exit.
+#
+class SimulatedChamber(object):
+
+    # --------------------------------------------------------------------------
+    # Initialize chamber object
+    #
+    def __init__(self, log, work, latency=None, if_bandwidth=IF_BANDWIDTH,
+                 profile=ACQUISITION_PROFILE):
+        self.log = log
+        self.work = work
+        self.latency = latency or LatencyModel()
+        self.ifBandwidth = if_bandwidth
+        self.profile = profile
+        self.clock = VirtualClock()
+        self.modules = dict((name, __import__(name)) for name in MODULES)
+        self.saved = []  # (module, attribute, value) to restore
+        self.resources = []
+        self.db = None
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Replace a module attribute until exit
+    #
+    def patch(self, module, name, value):
+        self.saved.append((module, name, getattr(module, name)))
+        setattr(module, name, value)
+
+    #
+    # End patch
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Set up simulated instruments
+    #
+    def __enter__(self):
+        from transport import InstrumentedResource, vxm_mnemonic
+        from motorProtocol import ControllerProtocol
+        from configStore import SQLiteConfigStore
+        from networkAnalyzer import NetworkAnalyzer
+        from tracing import tracer
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Work directory, clock and tracer
+        #
+        for module in self.modules.values():
+            for name, path in WORK_PATHS.items():
+                if hasattr(module, name):
+                    self.patch(module, name, os.path.join(self.work, path))
+        for name in ("PNG", os.path.join("results", "plot_cache")):
+            os.makedirs(os.path.join(self.work, name), exist_ok=True)
+        for name in SLEEPING_MODULES:
+            self.patch(self.modules[name], "time", self.clock)
+        self.patch(tracer, "clock", self.clock.now)
+        self.patch(tracer, "enabled", True)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Motor controller and motors
+        #
+        self.vxm = SimulatedVXM(self.clock, self.latency)
+        self.mc = ControllerProtocol(
+                InstrumentedResource(self.vxm, "motor controller",
+                                     vxm_mnemonic, clock=self.clock.now),
+                thread=False)  # Waits read on the virtual clock
+        self.motorSet = motors_init(self.mc)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Network analyzer, measures the stand angle at each sweep, and the
+        # trigger line between it and the motor controller
+        #
+        stand = self.motorSet[STAND_ROTATION]
+        self.sim = SimulatedAnalyzer(
+                self.clock, self.latency,
+                lambda t=None: -self.vxm.position(stand.portNum, t)
+                * stand.increment)
+        self.vxm.trigger_line = TriggerLine(self.sim)
+        self.analyzer = NetworkAnalyzer(
+                InstrumentedResource(self.sim, "analyzer",
+                                     clock=self.clock.now),
+                self.ifBandwidth, self.profile)
+        self.resources = [self.mc.resource, self.analyzer.vi]
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Config options
+        #
+        self.db = SQLiteConfigStore(self.log, ":memory:")
+        return self
+
+    #
+    # End enter
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Restore patched modules
+    #
+    def __exit__(self, *exc):
+        import transport
+        if self.db:
+            self.db.close()
+        for r in self.resources:
+            if r in transport._resources:
+                transport._resources.remove(r)
+        for module, name, value in reversed(self.saved):
+            setattr(module, name, value)
+        self.saved = []
+        return False
+
+    #
+    # End exit
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Cal factor (0 dB) for the analyzer's frequency plan
+    #
+    def write_cal_factor(self, f1, f2, nums):
+        self.sim.set("SENS:FREQ:STAR", f1)
+        self.sim.set("SENS:FREQ:STOP", f2)
+        self.sim.set("SENS:SWE:POIN", nums)
+        # Headers as the test routines write them
+        freq = format_freq(",".join("%+.11E" % f
+                                    for f in self.sim.frequencies()))
+        with open(os.path.join(self.work, "CalFactor.csv"), "w") as f:
+            f.write(freq)
+            f.write(",".join(["0"] * self.sim.points()) + "\n")
+
+    #
+    # End write cal factor
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Run a test routine, returns the report
+    #
+    def run(self, routine, f1, f2, nums, rstart, angle, rstop, tpolar=0,
+            cpolar=0, segments=None, adaptive=False, hardware_trigger=False,
+            settle_mode=SETTLE_MODE):
+        from tracing import tracer
+        module_name, function = ROUTINES[routine]
+        module = self.modules[module_name]
+        for name in ("motorSet", "mc", "db", "analyzer"):
+            self.patch(module, name, getattr(self, name))
+        # Cal factor on the linear grid, segment sweeps interpolate it
+        self.write_cal_factor(f1, f2, nums)
+        kwargs = {"segments": segments} if segments else {}
+        if adaptive:
+            kwargs["adaptive"] = True
+        if hardware_trigger:
+            kwargs["hardware_trigger"] = True
+        if routine == "pattern":
+            kwargs["settle_mode"] = settle_mode
+        estimate = None
+        if routine == "pattern":
+            from scanEstimate import estimate_sweep
+            estimate = estimate_sweep(self.motorSet, f1, f2, nums, rstart,
+                                      angle, rstop, tpolar, cpolar,
+                                      segments=segments,
+                                      if_bandwidth=self.ifBandwidth,
+                                      hardware_trigger=hardware_trigger,
+                                      position=self.motorSet[
+                                          STAND_ROTATION].get_position(),
+                                      settle_mode=settle_mode)
+
+        # Count only the test routine, not the set up
+        tracer.reset()
+        self.sim.sweeps = 0
+        self.vxm.moves = 0
+        t0 = self.clock.now()
+        with tracer.span(routine):
+            getattr(module, function)(self.log, f1, f2, nums, rstart, angle,
+                                      rstop, tpolar, cpolar, **kwargs)
+        total = self.clock.now() - t0
+
+        # IF bandwidths recorded in the dataset metadata
+        ifbw = None
+        for filename in glob.glob(os.path.join(self.work, "*_meta.json")):
+            with open(filename) as f:
+                ifbw = json.load(f).get("if_bandwidth")
+
+        sweeps = self.sim.sweeps
+        return {"routine": routine,
+                "settings": {"fstart": f1, "fstop": f2,
+                             "points": self.sim.points(), "rstart": rstart,
+                             "rstep": angle, "rstop": rstop,
+                             "if_bandwidth": self.ifBandwidth,
+                             "profile": self.profile,
+                             "hardware_trigger": hardware_trigger,
+                             "settle": settle_mode,
+                             "segments": [list(s) for s in segments or []]},
+                "latency": self.latency.as_dict(),
+                "total_s": total,
+                "estimate": estimate,
+                "simulated_s": self.clock.offset,
+                "sweeps": sweeps,
+                "sweeps_per_hour": sweeps * 3600.0 / total,
+                "motor_moves": self.vxm.moves,
+                "if_bandwidth": ifbw,
+                "phases": tracer.category_totals(),
+                "spans": tracer.summary()}
+
+    #
+    # End run
+    # --------------------------------------------------------------------------
+
+
+#
+# End SimulatedChamber
+# ==============================================================================
+
+
+# ==============================================================================
+# Print a report
+#
+def print_report(report, top=10):
+    s = report["settings"]
+    print("")
+    print("%s: %g-%g GHz, %d points, IFBW %g Hz, %g:%g:%g deg, %s profile" % (
+        report["routine"], s["fstart"] / 1e9, s["fstop"] / 1e9, s["points"],
+        s["if_bandwidth"], s["rstart"], s["rstep"], s["rstop"],
+        s["profile"]))
+    if s.get("hardware_trigger"):
+        print("  sweeps triggered by the motor controller")
+    if report["routine"] == "pattern":
+        print("  %s settle" % s.get("settle"))
+    for f1, f2, points, ifbw, power in s.get("segments", []):
+        print("  segment %g-%g GHz, %d points, IFBW %s" % (
+            f1 / 1e9, f2 / 1e9, points,
+            "%g Hz" % ifbw if ifbw else "of the channel"))
+    ifbw = report.get("if_bandwidth") or {}
+    for r in ifbw.get("segments", []):
+        print("  adaptive IFBW   %g-%g GHz: %g Hz, noise %.1f dB" % (
+            r["start"] / 1e9, r["stop"] / 1e9, r["if_bandwidth"],
+            r["noise_db"]))
+    if "saved_s" in ifbw:
+        print("  sweep time      %10.3f s instead of %.3f s, %.1f s saved "
+              "per scan (pre-sweep %.1f s)" % (
+                  ifbw["sweep_time_s"], ifbw["fixed_sweep_time_s"],
+                  ifbw["saved_s"], ifbw["presweep_s"]))
+    print("  predicted time  %10.1f s (%.1f min), %.1f s simulated" % (
+        report["total_s"], report["total_s"] / 60, report["simulated_s"]))
+    if report.get("estimate"):
+        print("  estimated time  %10.1f s before the run, processing not "
+              "included" % report["estimate"]["total_s"])
+    print("  throughput      %10.1f measurements/hour (%d sweeps, %d moves)"
+          % (report["sweeps_per_hour"], report["sweeps"],
+             report["motor_moves"]))
+    for r in report["spans"]:
+        if r["name"] == "angle step":
+            print("  per angle step  %10.3f s mean, %.3f s median" % (
+                r["total"] / r["count"], r["p50"]))
+    print("  %-14s %10s %7s" % ("phase", "seconds", "share"))
+    for category, seconds in sorted(report["phases"].items(),
+                                    key=lambda item: -item[1]):
+        print("  %-14s %10.1f %6.1f%%" % (category, seconds,
+                                           100 * seconds / report["total_s"]))
+    print("  %-40s %7s %10s" % ("slowest spans", "count", "total s"))
+    for r in report["spans"][:top]:
+        print("  %-40s %7d %10.2f" % (r["name"][:40], r["count"], r["total"]))
+
+
+#
+# End print report
+# ==============================================================================
+
+
+# ==============================================================================
+# Main function
+#
+def sweepBenchmark(args):
+    parser = argparse.ArgumentParser(
+            prog="sweepBenchmark.py",
+            description="Predict chamber time of a scan configuration with "
+                        "simulated instruments")
+    parser.add_argument("routine", nargs="?", default="pattern",
+                        choices=sorted(ROUTINES) + ["all"])
+    parser.add_argument("--fstart", type=float, default=1.0, help="GHz")
+    parser.add_argument("--fstop", type=float, default=18.0, help="GHz")
+    parser.add_argument("--points", type=int, default=201)
+    parser.add_argument("--rstart", type=float, default=0.0, help="deg")
+    parser.add_argument("--step", type=float, default=5.0, help="deg")
+    parser.add_argument("--rstop", type=float, default=360.0, help="deg")
+    parser.add_argument("--tpolar", type=float, default=0.0, help="deg")
+    parser.add_argument("--cpolar", type=float, default=0.0, help="deg")
+    parser.add_argument("--ifbw", type=float, default=IF_BANDWIDTH,
+                        help="IF bandwidth (Hz)")
+    parser.add_argument("--set", action="append", default=[],
+                        metavar="NAME=VALUE",
+                        help="latency model parameter, e.g. "
+                             "gpib_bytes_per_s=1e6")
+    parser.add_argument("--segments", metavar="F1:F2:N[:IFBW[:POWER]];...",
+                        help="segment sweep (GHz), pattern routine only")
+    parser.add_argument("--profile", default=ACQUISITION_PROFILE,
+                        choices=("standard", "fast"),
+                        help="acquisition profile")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="adaptive IF bandwidth, pattern routine only")
+    parser.add_argument("--hardware-trigger", action="store_true",
+                        help="motor controller triggers the sweeps, pattern "
+                             "routine only")
+    parser.add_argument("--settle", default=SETTLE_MODE,
+                        choices=("fixed", "scaled", "measured"),
+                        help="settle mode, pattern routine only")
+    parser.add_argument("--output", help="write reports to a JSON file")
+    opts = parser.parse_args(args)
+
+    try:
+        latency = LatencyModel(**dict(s.split("=", 1) for s in opts.set))
+        segments = parse_segments(opts.segments) if opts.segments else None
+    except ValueError as e:
+        print(e)
+        return 1
+
+    log = get_logger("sweepBenchmark")
+    routines = sorted(ROUTINES) if opts.routine == "all" else [opts.routine]
+    reports = []
+    for routine in routines:
+        work = tempfile.mkdtemp(prefix="sweepbench")
+        try:
+            with SimulatedChamber(log, work, latency, opts.ifbw,
+                                  opts.profile) as chamber:
+                reports.append(chamber.run(
+                        routine, opts.fstart * 1e9, opts.fstop * 1e9,
+                        opts.points, opts.rstart, opts.step, opts.rstop,
+                        opts.tpolar, opts.cpolar,
+                        segments if routine == "pattern" else None,
+                        opts.adaptive and routine == "pattern",
+                        opts.hardware_trigger and routine == "pattern",
+                        opts.settle))
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+        print_report(reports[-1])
+
+    if opts.output:
+        with open(opts.output, "w") as f:
+            json.dump(reports, f, indent=1, sort_keys=True)
+        print("Reports written to file: " + opts.output)
+    return 0
+
+
+#
+# End main function
+# ==============================================================================
+
+
+# ==============================================================================
+# Enter from command line
+#
+if __name__ == "__main__":
+    argv = sys.argv  # Store command line arguments
+    argv.pop(0)  # Remove file name
+    # Call main function and pass return status to system
+    sys.exit(sweepBenchmark(argv))
+#
+# End enter from command line
+# ==============================================================================
@@ -0,0 +1,298 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         tracing.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from serverInfo import *
+# Standard libraries
+import math
+import time
+import json
+import threading
+import functools
+
+# Installed libraries
+
+# Span categories
+PHASE = "phase"  # Sections of a test routine
+ANALYZER = "analyzer"  # Network analyzer I/O
+MOTOR = "motor"  # Motor controller I/O
+SETTLE = "settle"  # Waiting for the stand to stop moving
+FILE = "file"  # Data file writes
+PROCESS = "process"  # Normalization, zip, catalog
+
+
+# ==============================================================================
+# Span that does nothing, returned while tracing is disabled
+#
+class NullSpan(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = NullSpan()
+#
+# End NullSpan
+# ==============================================================================
+
+
+# ==============================================================================
+# Timed span, records itself in the tracer when it exits
+#
+class Span(object):
+
+    # --------------------------------------------------------------------------
+    # Initialize span object
+    #
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = None
+        self.child_time = 0.0  # Time spent in nested spans
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Enter/exit span
+    #
+    def __enter__(self):
+        self.tracer.push(self)
+        self.start = self.tracer.clock()
+        return self
+
+    def __exit__(self, *exc):
+        end = self.tracer.clock()
+        self.tracer.pop(self, end)
+        return False
+
+    #
+    # End enter/exit
+    # --------------------------------------------------------------------------
+
+
+#
+# End Span
+# ==============================================================================
+
+
+# ==============================================================================
+# Tracer
+#
+# Collects spans as (name, category, start, duration, self time, thread, args).
+# Self time excludes nested spans so category totals do not count time twice.
+#
+class Tracer(object):
+
+    # --------------------------------------------------------------------------
+    # Initialize tracer object
+    #
+    def __init__(self, enabled=False, clock=time.perf_counter):
+        self.enabled = enabled
+        self.clock = clock  # Seconds, any monotonic origin
+        self.events = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Create a span, use as "with tracer.span(name, category):"
+    #
+    def span(self, name, category=PHASE, **args):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, category, args)
+
+    #
+    # End span
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Track nesting of open spans on this thread
+    #
+    def push(self, span):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(span)
+
+    def pop(self, span, end):
+        stack = self._local.stack
+        stack.pop()
+        duration = end - span.start
+        if stack:
+            stack[-1].child_time += duration
+        with self._lock:
+            self.events.append((span.name, span.category, span.start,
+                                duration, duration - span.child_time,
+                                threading.get_ident(), span.args))
+
+    #
+    # End push/pop
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Discard recorded spans
+    #
+    def reset(self):
+        with self._lock:
+            self.events = []
+
+    #
+    # End reset
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Chrome trace-event JSON (load in chrome://tracing or Perfetto)
+    #
+    def chrome_trace(self):
+        pid = os.getpid()
+        origin = min([e[2] for e in self.events] or [0])
+        events = []
+        for name, category, start, duration, self_time, tid, args in \
+                self.events:
+            events.append({"name": name, "cat": category, "ph": "X",
+                           "ts": (start - origin) * 1e6,
+                           "dur": duration * 1e6, "pid": pid, "tid": tid,
+                           "args": dict((k, str(v))
+                                        for k, v in args.items())})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        return filename
+
+    #
+    # End chrome trace
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Per span name statistics, sorted by total time
+    #
+    def summary(self):
+        durations = {}
+        for name, category, start, duration, self_time, tid, args in \
+                self.events:
+            durations.setdefault((category, name), []).append(duration)
+
+        rows = []
+        for (category, name), d in durations.items():
+            d.sort()
+            rows.append({"category": category, "name": name,
+                         "count": len(d), "total": sum(d),
+                         "p50": percentile(d, 50), "p95": percentile(d, 95)})
+        rows.sort(key=lambda r: r["total"], reverse=True)
+        return rows
+
+    def summary_table(self):
+        lines = ["%-10s %-40s %7s %10s %10s %10s" % (
+            "category", "span", "count", "total s", "p50 ms", "p95 ms")]
+        for r in self.summary():
+            lines.append("%-10s %-40s %7d %10.3f %10.3f %10.3f" % (
+                r["category"], r["name"][:40], r["count"], r["total"],
+                r["p50"] * 1e3, r["p95"] * 1e3))
+        return "\n".join(lines)
+
+    #
+    # End summary
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Time spent in each category, excluding nested spans
+    #
+    def category_totals(self):
+        totals = {}
+        for name, category, start, duration, self_time, tid, args in \
+                self.events:
+            totals[category] = totals.get(category, 0.0) + self_time
+        return totals
+
+    #
+    # End category totals
+    # --------------------------------------------------------------------------
+
+
+#
+# End Tracer
+# ==============================================================================
+
+
+# ==============================================================================
+# Nearest-rank percentile of a sorted list
+#
+def percentile(values, p):
+    if not values:
+        return 0.0
+    k = max(0, min(len(values) - 1,
+                   int(math.ceil(p / 100.0 * len(values))) - 1))
+    return values[k]
+
+
+#
+# End percentile
+# ==============================================================================
+
+
+# Process wide tracer
+tracer = Tracer(TRACE_ENABLED)
+
+
+# ==============================================================================
+# Method decorator, records a span per call while tracing is enabled
+#
+def traced(category, command=False):
+    def decorate(func):
+        name = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not tracer.enabled:
+                return func(self, *args, **kwargs)
+            # Optionally record the first argument, e.g. the command sent
+            span_args = {"command": args[0]} if (command and args) else {}
+            with tracer.span(name, category, **span_args):
+                return func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+#
+# End traced
+# ==============================================================================
+
+
+# ==============================================================================
+# Write the job's Chrome trace and log its summary table
+#
+def write_job_trace(log, job):
+    if not (TRACE_ENABLED and tracer.events):
+        return None
+    if not os.path.isdir(TRACE_PATH):
+        os.makedirs(TRACE_PATH)
+    filename = os.path.join(TRACE_PATH, job + "_"
+                            + time.strftime("%Y%m%d%H%M%S") + ".json")
+    tracer.write_chrome_trace(filename)
+    log.info("Trace written to file: " + filename)
+    log.info("Timing summary:\n" + tracer.summary_table())
+    return filename
+
+
+#
+# End write job trace
+# ==============================================================================
@@ -0,0 +1,262 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         transport.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from serverInfo import *
+# Standard libraries
+import re
+import time
+import json
+import math
+
+# Installed libraries
+
+# Smallest latency histogram bucket (ms), buckets double from here
+HIST_MIN_MS = 0.125
+
+# Instrumented resources opened by this process
+_resources = []
+
+
+# ==============================================================================
+# SCPI command mnemonic, e.g. ":SENS1:FREQ:STAR 1e9" -> "SENS:FREQ:STAR"
+#
+def scpi_mnemonic(command):
+    header = command.strip().split(" ", 1)[0].lstrip(":").upper()
+    # Channel/trace/port numbers do not change the command type
+    return re.sub(r"(?<=[A-Z])\d+", "", header)
+
+
+#
+# End SCPI mnemonic
+# ==============================================================================
+
+
+# ==============================================================================
+# VXM command mnemonic, e.g. "I1M-400,R" -> "I,R", "S3M2500" -> "S". A
+# leading clear is not counted, "C,I1M-400,R" -> "I,R".
+#
+def vxm_mnemonic(command):
+    command = command.strip()
+    if command.upper().startswith("C,"):
+        command = command[2:]
+    m = re.match(r"[A-Za-z]+", command)
+    mnemonic = m.group(0).upper() if m else command[:1]
+    if command.endswith(",R"):
+        mnemonic += ",R"
+    return mnemonic
+
+
+#
+# End VXM mnemonic
+# ==============================================================================
+
+
+# ==============================================================================
+# Latency histogram bucket, upper bound in ms (powers of two)
+#
+def latency_bucket(seconds):
+    ms = seconds * 1e3
+    if ms <= HIST_MIN_MS:
+        return HIST_MIN_MS
+    return HIST_MIN_MS * 2 ** int(math.ceil(math.log(ms / HIST_MIN_MS, 2)))
+
+
+#
+# End latency bucket
+# ==============================================================================
+
+
+# ==============================================================================
+# Instrumented resource
+#
+# Wraps a pyvisa resource. write/query/read calls are timed and counted per
+# command mnemonic, every other attribute (timeout, read_termination, close,
+# ...) is passed through to the wrapped resource.
+#
+class InstrumentedResource(object):
+
+    # Attributes kept on the wrapper, everything else goes to the resource
+    _own = ("resource", "name", "mnemonic", "info", "commands", "_clock")
+
+    # --------------------------------------------------------------------------
+    # Initialize wrapper object
+    #
+    def __init__(self, resource, name, mnemonic=scpi_mnemonic,
+                 clock=time.perf_counter):
+        object.__setattr__(self, "resource", resource)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "mnemonic", mnemonic)
+        object.__setattr__(self, "info", {})  # e.g. instrument IDN
+        object.__setattr__(self, "commands", {})
+        object.__setattr__(self, "_clock", clock)
+        _resources.append(self)
+
+    #
+    # End init
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Attribute passthrough
+    #
+    def __getattr__(self, name):
+        return getattr(self.resource, name)
+
+    def __setattr__(self, name, value):
+        if name in self._own:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.resource, name, value)
+
+    def __bool__(self):
+        return bool(self.resource)
+
+    __nonzero__ = __bool__
+
+    def __str__(self):
+        return str(self.resource)
+
+    #
+    # End attribute passthrough
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Record one round trip
+    #
+    def record(self, mnemonic, seconds, bytes_out=0, bytes_in=0):
+        stats = self.commands.get(mnemonic)
+        if stats is None:
+            stats = self.commands[mnemonic] = {
+                "count": 0, "bytes_out": 0, "bytes_in": 0, "total_s": 0.0,
+                "max_s": 0.0, "histogram_ms": {}}
+        stats["count"] += 1
+        stats["bytes_out"] += bytes_out
+        stats["bytes_in"] += bytes_in
+        stats["total_s"] += seconds
+        stats["max_s"] = max(stats["max_s"], seconds)
+        bucket = latency_bucket(seconds)
+        stats["histogram_ms"][bucket] = stats["histogram_ms"].get(bucket, 0) + 1
+
+    #
+    # End record
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Bytes sent for a command, including the write terminator
+    #
+    def _out_size(self, command):
+        term = getattr(self.resource, "write_termination", "") or ""
+        return len(command) + len(term)
+
+    #
+    # End out size
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Timed I/O
+    #
+    def write(self, command, *args, **kwargs):
+        t0 = self._clock()
+        rv = self.resource.write(command, *args, **kwargs)
+        self.record(self.mnemonic(command), self._clock() - t0,
+                    bytes_out=self._out_size(command))
+        return rv
+
+    def query(self, command, *args, **kwargs):
+        t0 = self._clock()
+        reply = self.resource.query(command, *args, **kwargs)
+        self.record(self.mnemonic(command), self._clock() - t0,
+                    bytes_out=self._out_size(command),
+                    bytes_in=len(reply or ""))
+        return reply
+
+    def read(self, *args, **kwargs):
+        t0 = self._clock()
+        reply = self.resource.read(*args, **kwargs)
+        self.record("read", self._clock() - t0, bytes_in=len(reply or ""))
+        return reply
+
+    def read_raw(self, *args, **kwargs):
+        t0 = self._clock()
+        reply = self.resource.read_raw(*args, **kwargs)
+        self.record("read", self._clock() - t0, bytes_in=len(reply or b""))
+        return reply
+
+    def read_bytes(self, *args, **kwargs):
+        t0 = self._clock()
+        reply = self.resource.read_bytes(*args, **kwargs)
+        self.record("read", self._clock() - t0, bytes_in=len(reply or b""))
+        return reply
+
+    #
+    # End timed I/O
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Metrics as a JSON-friendly dict
+    #
+    def metrics(self):
+        commands = {}
+        for mnemonic, stats in self.commands.items():
+            entry = dict(stats)
+            entry["mean_ms"] = stats["total_s"] / stats["count"] * 1e3
+            entry["histogram_ms"] = dict(
+                    ("%g" % k, v) for k, v in sorted(
+                            stats["histogram_ms"].items()))
+            commands[mnemonic] = entry
+        return {"info": dict(self.info), "commands": commands}
+
+    def reset(self):
+        self.commands.clear()
+
+    #
+    # End metrics
+    # --------------------------------------------------------------------------
+
+
+#
+# End InstrumentedResource
+# ==============================================================================
+
+
+# ==============================================================================
+# Write metrics of every instrumented resource for this job
+#
+def write_job_metrics(log, job):
+    resources = {}
+    for r in _resources:
+        if r.commands:
+            resources[r.name] = r.metrics()
+    if not resources:
+        return None
+
+    if not os.path.isdir(METRICS_PATH):
+        os.makedirs(METRICS_PATH)
+    filename = os.path.join(METRICS_PATH, job + "_"
+                            + time.strftime("%Y%m%d%H%M%S") + ".json")
+    with open(filename, "w") as f:
+        json.dump({"job": job, "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                   "resources": resources}, f, indent=1, sort_keys=True)
+    log.info("Instrument I/O metrics written to file: " + filename)
+
+    # Slowest command types by total time
+    rows = sorted(((stats["total_s"], name, mnemonic, stats["count"])
+                   for name, res in resources.items()
+                   for mnemonic, stats in res["commands"].items()),
+                  reverse=True)
+    for total, name, mnemonic, count in rows[:5]:
+        log.info("%s %s: %d calls, %.3f s total" % (name, mnemonic, count,
+                                                    total))
+
+    for r in _resources:
+        r.reset()
+    return filename
+
+
+#
+# End write job metrics
+# ==============================================================================
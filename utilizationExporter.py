@@ -0,0 +1,253 @@
+################################################################################
+# Project:      NCSU ECE PREAL 2.0 Senior Design Project
+# File:         utilizationExporter.py
+# Author(s):    Matthew Kesselring
+# Date:         October 2026
+################################################################################
+
+# Local files
+from serverInfo import *
+from jobRecords import read_job_records
+# Standard libraries
+import sys
+import time
+import glob
+from datetime import datetime, timedelta
+
+# Installed libraries
+
+# Chamber states and the tracer categories counted in each
+STATES = (("moving", ("motor", "settle")),
+          ("sweeping", ("analyzer",)),
+          ("processing", ("process", "file")))
+
+DAILY_COLUMNS = ("date", "jobs", "failures", "failure_rate", "angle_steps",
+                 "steps_per_hour", "busy_h", "moving_h", "sweeping_h",
+                 "processing_h", "other_h", "idle_h")
+
+
+# ==============================================================================
+# Split a record's busy time into chamber states (seconds)
+#
+def job_states(record):
+    phases = record.get("phases") or {}
+    states = {}
+    for state, categories in STATES:
+        states[state] = sum(phases.get(c, 0.0) for c in categories)
+    # Remaining time (setup, Python overhead, untraced phases)
+    states["other"] = max(0.0, record.get("duration_s", 0.0)
+                          - sum(states.values()))
+    return states
+
+
+#
+# End job states
+# ==============================================================================
+
+
+# ==============================================================================
+# Aggregate records per day
+#
+def daily_summary(records, now=None):
+    now = now or datetime.today()
+    days = {}
+    for r in records:
+        day = r["start"][:10]
+        d = days.setdefault(day, {"jobs": 0, "failures": 0, "angle_steps": 0,
+                                  "busy": 0.0, "moving": 0.0, "sweeping": 0.0,
+                                  "processing": 0.0, "other": 0.0})
+        d["jobs"] += 1
+        d["failures"] += r.get("outcome") != "ok"
+        d["angle_steps"] += r.get("angle_steps", 0)
+        d["busy"] += r.get("duration_s", 0.0)
+        for state, seconds in job_states(r).items():
+            d[state] += seconds
+
+    rows = []
+    for day in sorted(days):
+        d = days[day]
+        # Today has only been available since midnight
+        start = datetime.strptime(day, "%Y-%m-%d")
+        available = min(86400.0, max(0.0, (now - start).total_seconds()))
+        busy_h = d["busy"] / 3600
+        rows.append({"date": day, "jobs": d["jobs"],
+                     "failures": d["failures"],
+                     "failure_rate": d["failures"] / float(d["jobs"]),
+                     "angle_steps": d["angle_steps"],
+                     "steps_per_hour": (d["angle_steps"] / busy_h
+                                        if busy_h > 0 else 0.0),
+                     "busy_h": busy_h,
+                     "moving_h": d["moving"] / 3600,
+                     "sweeping_h": d["sweeping"] / 3600,
+                     "processing_h": d["processing"] / 3600,
+                     "other_h": d["other"] / 3600,
+                     "idle_h": max(0.0, available - d["busy"]) / 3600})
+    return rows
+
+
+#
+# End daily summary
+# ==============================================================================
+
+
+# ==============================================================================
+# Prometheus text exposition format
+#
+def prometheus_text(records, rows):
+    jobs = {}
+    phases = {}
+    steps = {}
+    durations = {}
+    last_end = 0.0
+    for r in records:
+        key = (r["job"], r.get("outcome", "error"))
+        jobs[key] = jobs.get(key, 0) + 1
+        steps[r["job"]] = steps.get(r["job"], 0) + r.get("angle_steps", 0)
+        count, total = durations.get(r["job"], (0, 0.0))
+        durations[r["job"]] = (count + 1, total + r.get("duration_s", 0.0))
+        for state, seconds in job_states(r).items():
+            k = (r["job"], state)
+            phases[k] = phases.get(k, 0.0) + seconds
+        try:
+            end = datetime.strptime(r["end"], "%Y-%m-%d %H:%M:%S")
+            last_end = max(last_end, time.mktime(end.timetuple()))
+        except (KeyError, ValueError):
+            pass
+
+    def label(**labels):
+        if not labels:
+            return ""
+        return "{" + ",".join('%s="%s"' % (k, str(v).replace('"', '\\"'))
+                              for k, v in sorted(labels.items())) + "}"
+
+    lines = []
+
+    def header(name, kind, help_text):
+        lines.append("# HELP " + name + " " + help_text)
+        lines.append("# TYPE " + name + " " + kind)
+
+    def sample_lines(name, samples):
+        for labels, value in samples:
+            lines.append(name + label(**labels) + " " + repr(float(value)))
+
+    def metric(name, kind, help_text, samples):
+        header(name, kind, help_text)
+        sample_lines(name, samples)
+
+    metric("preal_jobs_total", "counter", "Jobs run by type and outcome.",
+           [({"job": j, "outcome": o}, n)
+            for (j, o), n in sorted(jobs.items())])
+    # Summary without quantiles, one family for _sum and _count
+    header("preal_job_duration_seconds", "summary", "Job run time by type.")
+    sample_lines("preal_job_duration_seconds_sum",
+                 [({"job": j}, t) for j, (n, t) in sorted(durations.items())])
+    sample_lines("preal_job_duration_seconds_count",
+                 [({"job": j}, n) for j, (n, t) in sorted(durations.items())])
+    metric("preal_chamber_state_seconds_total", "counter",
+           "Job time by chamber state (moving, sweeping, processing, other).",
+           [({"job": j, "state": s}, t)
+            for (j, s), t in sorted(phases.items())])
+    metric("preal_angle_steps_total", "counter", "Stand angle steps measured.",
+           [({"job": j}, n) for j, n in sorted(steps.items())])
+    metric("preal_chamber_idle_seconds_total", "counter",
+           "Time with no job running, over the days with records.",
+           [({}, sum(row["idle_h"] for row in rows) * 3600)])
+    failures = sum(n for (j, o), n in jobs.items() if o != "ok")
+    metric("preal_job_failure_ratio", "gauge", "Failed jobs / all jobs.",
+           [({}, failures / float(max(1, sum(jobs.values()))))])
+    metric("preal_last_job_end_timestamp_seconds", "gauge",
+           "End time of the most recent job (Unix seconds).",
+           [({}, last_end)])
+    return "\n".join(lines) + "\n"
+
+
+#
+# End prometheus text
+# ==============================================================================
+
+
+# ==============================================================================
+# Write file through a temporary name so readers never see a partial file
+#
+def write_atomic(filename, text):
+    tmp = filename + ".tmp" + str(os.getpid())
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, filename)
+    return filename
+
+
+#
+# End write atomic
+# ==============================================================================
+
+
+# ==============================================================================
+# Main function
+#
+def utilization_exporter(args):
+    # --------------------------------------------------------------------------
+    # Parse CL arguments: [days], limit to records from the last N days
+    #
+    try:
+        days = int(args[0]) if len(args) > 0 else None
+    except ValueError:
+        print("Usage: utilizationExporter.py [days]")
+        return 1
+    #
+    # End parse CL arguments
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Read and aggregate records
+    #
+    files = sorted(glob.glob(os.path.join(JOB_RECORDS_PATH, "jobs_*.jsonl")))
+    records = read_job_records(files)
+    if days is not None:
+        since = (datetime.today() - timedelta(days=days)).strftime("%Y-%m-%d")
+        records = [r for r in records if r.get("start", "") >= since]
+    rows = daily_summary(records)
+    #
+    # End read and aggregate records
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Write Prometheus text file and daily summary
+    #
+    if not os.path.isdir(UTILIZATION_PATH):
+        os.makedirs(UTILIZATION_PATH)
+    prom = write_atomic(os.path.join(UTILIZATION_PATH, "preal.prom"),
+                        prometheus_text(records, rows))
+
+    lines = [",".join(DAILY_COLUMNS)]
+    for row in rows:
+        lines.append(",".join(("%.3f" % row[c]) if isinstance(row[c], float)
+                              else str(row[c]) for c in DAILY_COLUMNS))
+    summary = write_atomic(os.path.join(UTILIZATION_PATH,
+                                        "daily_summary.csv"),
+                           "\n".join(lines) + "\n")
+    print("Wrote " + prom + " and " + summary + " from "
+          + str(len(records)) + " job records")
+    #
+    # End write files
+    # --------------------------------------------------------------------------
+
+    return 0
+
+
+#
+# End main function
+# ==============================================================================
+
+
+# ==============================================================================
+# Enter from command line
+#
+if __name__ == "__main__":
+    argv = sys.argv  # Store command line arguments
+    argv.pop(0)  # Remove file name
+    # Call main function and pass return status to system
+    sys.exit(utilization_exporter(argv))
+#
+# End enter from command line
+# ==============================================================================